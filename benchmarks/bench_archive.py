@@ -0,0 +1,89 @@
+"""
+Compare saving the candidate tracks of a corpus with
+`pickle_candidates()` and in a candidate archive, and getting
+one token, and one speaker's tokens, back from each.
+
+The tokens of the test recording are analyzed once and copied
+with new file names to make the corpus. A pickle has to be
+loaded whole to get any token out of it, while the archive is
+memory mapped and only the selected tokens are read.
+
+Usage:
+    python benchmarks/bench_archive.py [n_files]
+"""
+from pathlib import Path
+import copy
+import sys
+import tempfile
+import time
+import warnings
+
+from fasttrackpy import process_audio_textgrid
+from fasttrackpy.processors.outputs import pickle_candidates,\
+                                           unpickle_candidates
+from fasttrackpy.processors.archive import write_archive, CandidateArchive
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+
+def corpus(n_files: int):
+    candidates = process_audio_textgrid(
+        audio_path = CORPUS_DIR.joinpath("KY25A_1.wav"),
+        textgrid_path = CORPUS_DIR.joinpath("KY25A_1.TextGrid")
+    )
+    tokens = []
+    for file_index in range(n_files):
+        # copies, so the pickle can't share them between files
+        for x in copy.deepcopy(candidates):
+            x.file_name = f"speaker{file_index:04}"
+            tokens.append(x)
+    return tokens
+
+def size(path: Path) -> float:
+    if path.is_dir():
+        return sum(x.stat().st_size for x in path.iterdir()) / 2**20
+    return path.stat().st_size / 2**20
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    warnings.simplefilter("ignore")
+    tokens = corpus(n_files)
+    speaker = f"speaker{n_files // 2:04}"
+    print(f"{n_files} files, {len(tokens)} tokens")
+    print(f"{'format':<10}{'write (s)':>10}{'size (MB)':>11}{'one token (s)':>15}{'one file (s)':>14}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pickle_path = Path(tmp_dir).joinpath("candidates.pkl")
+        start = time.perf_counter()
+        pickle_candidates(tokens, pickle_path)
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        unpickle_candidates(pickle_path)[len(tokens) // 2].to_df()
+        token_time = time.perf_counter() - start
+        start = time.perf_counter()
+        [
+            x.to_df() for x in unpickle_candidates(pickle_path)
+            if x.file_name == speaker
+        ]
+        file_time = time.perf_counter() - start
+        print(f"{'pickle':<10}{write_time:>10.2f}{size(pickle_path):>11.1f}{token_time:>15.3f}{file_time:>14.3f}")
+
+        archive_path = Path(tmp_dir).joinpath("candidates")
+        start = time.perf_counter()
+        write_archive(tokens, archive_path)
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        CandidateArchive(archive_path).candidates(len(tokens) // 2).to_df()
+        token_time = time.perf_counter() - start
+        start = time.perf_counter()
+        archive = CandidateArchive(archive_path)
+        [
+            archive.candidates(idx).to_df()
+            for idx in archive.select(file_name = speaker)
+        ]
+        file_time = time.perf_counter() - start
+        print(f"{'archive':<10}{write_time:>10.2f}{size(archive_path):>11.1f}{token_time:>15.3f}{file_time:>14.3f}")
+
+if __name__ == "__main__":
+    main()
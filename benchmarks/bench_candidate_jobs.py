@@ -0,0 +1,85 @@
+"""
+Compare giving the spare workers to each task's candidates with
+leaving them idle, when there are fewer tasks than workers, as
+when a directory of 2 to n_jobs-1 files is processed.
+
+Each task analyzes the whole test recording in a loky worker of
+the task pool, as the patterns do. "tasks" analyzes each task's
+max formants one after the other, and "split" splits them across
+`n_jobs // n_tasks` workers of each task's candidate pool.
+"processes" is how many processes each task's pool ran in: the
+praat engine's need to be more than one for the split to help.
+
+Usage:
+    python benchmarks/bench_candidate_jobs.py [n_tasks] [n_jobs]
+"""
+import parselmouth as pm
+from joblib import Parallel, delayed, cpu_count
+from pathlib import Path
+import os
+import sys
+import time
+import warnings
+
+from fasttrackpy.processors.formants import track_formants_batch,\
+                                            candidate_pool
+from fasttrackpy.utils.schedule import split_jobs
+
+SOUND_PATH = Path(__file__).parents[1].joinpath(
+    "tests", "test_data", "corpus", "KY25A_1.wav"
+)
+MAX_FORMANTS = [4000 + x * 3000 / 19 for x in range(20)]
+REPEATS = 3
+
+def pid(*args) -> int:
+    return os.getpid()
+
+def task(samples, sampling_frequency, engine, n_jobs) -> int:
+    warnings.simplefilter("ignore")
+    track_formants_batch(
+        samples = samples,
+        sampling_frequency = sampling_frequency,
+        max_formants = MAX_FORMANTS,
+        engine = engine,
+        n_jobs = n_jobs
+    )
+    if n_jobs < 2:
+        return 1
+    return len(set(candidate_pool(engine, n_jobs)(
+        delayed(pid)() for _ in range(4 * n_jobs)
+    )))
+
+def run(sound, engine, n_tasks, candidate_jobs) -> tuple[float, int]:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        n_processes = Parallel(n_jobs = n_tasks)(
+            delayed(task)(
+                sound.values,
+                sound.sampling_frequency,
+                engine,
+                candidate_jobs
+            )
+            for _ in range(n_tasks)
+        )
+        times.append(time.perf_counter() - start)
+    return min(times), min(n_processes)
+
+def main():
+    n_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    n_jobs = int(sys.argv[2]) if len(sys.argv) > 2 else cpu_count()
+    warnings.simplefilter("ignore")
+    sound = pm.Sound(str(SOUND_PATH))
+    n_tasks, candidate_jobs = split_jobs(n_tasks, n_jobs)
+
+    print(f"{n_tasks} tasks, {n_jobs} workers, {cpu_count()} cores")
+    print(f"{'engine':<8}{'split':<10}{'time (s)':>10}{'processes':>11}{'speedup':>9}")
+    for engine in ["praat", "numba"]:
+        base = None
+        for name, jobs in [("tasks", 1), ("split", candidate_jobs)]:
+            elapsed, n_processes = run(sound, engine, n_tasks, jobs)
+            base = base or elapsed
+            print(f"{engine:<8}{name:<10}{elapsed:>10.2f}{n_processes:>11}{base / elapsed:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compare making one data frame of all candidates of many tokens,
+as with `which = "all"`, by concatenating a data frame for each
+candidate, and with the columnar builder.
+
+"assembly" times only making the data frame, from candidate tracks
+that were already made and smoothed. "end to end" starts from the
+tokens' candidates, as `write_data()` does, which also makes and
+smooths each candidate's bandwidths.
+
+Usage:
+    python benchmarks/bench_columnar_output.py [n_tokens]
+"""
+import parselmouth as pm
+import polars as pl
+from aligned_textgrid import AlignedTextGrid, Word, Phone
+from pathlib import Path
+import sys
+import time
+import warnings
+
+from fasttrackpy import CandidateTracks
+from fasttrackpy.patterns.audio_textgrid import get_target_tiers,\
+                                                get_target_intervals
+from fasttrackpy.processors.outputs import formant_to_dataframe,\
+                                           tracks_to_dataframe,\
+                                           candidates_to_dataframe
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+WINDOW_LENGTH = 0.025
+REPEATS = 3
+
+def get_candidates(n_tokens: int) -> list[CandidateTracks]:
+    sound = pm.Sound(str(CORPUS_DIR.joinpath("KY25A_1.wav")))
+    tg = AlignedTextGrid(
+        textgrid_path = CORPUS_DIR.joinpath("KY25A_1.TextGrid"),
+        entry_classes = [Word, Phone]
+    )
+    intervals = get_target_intervals(get_target_tiers(tg))[:n_tokens]
+    all_candidates = []
+    for interval in intervals:
+        part = sound.extract_part(
+            from_time = interval.start - WINDOW_LENGTH/2,
+            to_time = interval.end + WINDOW_LENGTH/2
+        )
+        candidates = CandidateTracks(sound = part, engine = "numba")
+        candidates.interval = interval
+        candidates.file_name = "KY25A_1"
+        all_candidates.append(candidates)
+    return all_candidates
+
+def concat_tracks(tracks: list) -> pl.DataFrame:
+    return pl.concat(
+        [
+            pl.concat(
+                [
+                    formant_to_dataframe(track).with_columns(candidate = idx + 1)
+                    for idx, track in enumerate(token_tracks)
+                ],
+                how = "diagonal"
+            )
+            for token_tracks in tracks
+        ],
+        how = "diagonal"
+    )
+
+def concat_candidates(all_candidates: list) -> pl.DataFrame:
+    return concat_tracks([cand.candidates for cand in all_candidates])
+
+def columnar_tracks(tracks: list) -> pl.DataFrame:
+    return tracks_to_dataframe(
+        [track for token_tracks in tracks for track in token_tracks],
+        candidates = [
+            idx + 1
+            for token_tracks in tracks
+            for idx in range(len(token_tracks))
+        ]
+    )
+
+def columnar_candidates(all_candidates: list) -> pl.DataFrame:
+    return candidates_to_dataframe(all_candidates, which = "all")
+
+def best_time(fun, *args) -> tuple[float, pl.DataFrame]:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        df = fun(*args)
+        times.append(time.perf_counter() - start)
+    return min(times), df
+
+def main():
+    n_tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    warnings.simplefilter("ignore")
+    all_candidates = get_candidates(n_tokens)
+    tracks = [cand.candidates for cand in all_candidates]
+    # smoothed once, so only the assembly is timed
+    for token_tracks in tracks:
+        for track in token_tracks:
+            track.smoothed_bandwidths
+
+    rows = [
+        ("assembly", "concat", concat_tracks, tracks),
+        ("assembly", "columnar", columnar_tracks, tracks),
+        ("end to end", "concat", concat_candidates, all_candidates),
+        ("end to end", "columnar", columnar_candidates, all_candidates)
+    ]
+    results = {}
+    print(f"{len(all_candidates)} tokens, {sum(len(x) for x in tracks)} candidates")
+    print(f"{'':<12}{'method':<10}{'time (s)':>10}{'rows':>10}")
+    for name, method, fun, arg in rows:
+        elapsed, df = best_time(fun, arg)
+        results[(name, method)] = df
+        print(f"{name:<12}{method:<10}{elapsed:>10.3f}{df.height:>10}")
+    assert results[("assembly", "concat")].equals(results[("assembly", "columnar")])
+
+if __name__ == "__main__":
+    main()
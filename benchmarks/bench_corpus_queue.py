@@ -0,0 +1,85 @@
+"""
+Compare processing a corpus of many small files with one
+`joblib.Parallel` call per file (`process_audio_textgrid()`
+on each file) against the single corpus-wide work queue of
+`process_corpus()`.
+
+The corpus is made by cutting the test recording into short
+audio/TextGrid pairs with only a few vowels each. Core utilization
+is the serial processing time of all tokens divided by the wall
+time times the number of cores.
+
+Usage:
+    python benchmarks/bench_corpus_queue.py [n_files]
+"""
+import parselmouth as pm
+from pathlib import Path
+import tempfile
+import time
+import sys
+import warnings
+from joblib import cpu_count
+
+from fasttrackpy import process_audio_textgrid, process_corpus
+from fasttrackpy.patterns.corpus import get_audio_files, get_corpus
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+N_FILES = 40
+ENGINE = "numba"
+
+def make_corpus(out_dir: Path, n_files: int):
+    sound = pm.Sound(str(CORPUS_DIR.joinpath("KY25A_1.wav")))
+    tg = pm.read(str(CORPUS_DIR.joinpath("KY25A_1.TextGrid")))
+    step = (sound.xmax - sound.xmin) / n_files
+    for i in range(n_files):
+        start = sound.xmin + i * step
+        end = start + step
+        part = sound.extract_part(from_time = start, to_time = end)
+        part.save(str(out_dir.joinpath(f"part_{i:03}.wav")), "WAV")
+        tg_part = pm.praat.call(tg, "Extract part", start, end, "no")
+        tg_part.save(str(out_dir.joinpath(f"part_{i:03}.TextGrid")))
+
+def per_file(corpus_dir: Path):
+    corpus = get_corpus(get_audio_files(corpus_dir))
+    candidates = []
+    for pair in corpus:
+        candidates += process_audio_textgrid(
+            audio_path = pair.wav,
+            textgrid_path = pair.tg,
+            engine = ENGINE
+        )
+    return candidates
+
+def single_queue(corpus_dir: Path):
+    return process_corpus(corpus_dir, engine = ENGINE)
+
+def serial(corpus_dir: Path) -> float:
+    start = time.perf_counter()
+    process_corpus(corpus_dir, engine = ENGINE, backend = "serial")
+    return time.perf_counter() - start
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else N_FILES
+    warnings.simplefilter("ignore")
+    n_cores = cpu_count()
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(tmp)
+        make_corpus(corpus_dir, n_files)
+        # compile the numba kernels and start the workers
+        single_queue(corpus_dir)
+        busy = serial(corpus_dir)
+
+        print(f"{n_files} files, {n_cores} cores, serial time {busy:.2f}s")
+        print(f"{'scheduler':<14}{'tokens':>8}{'time (s)':>10}{'tokens/s':>10}{'utilization':>13}")
+        for name, fun in [("per file", per_file), ("single queue", single_queue)]:
+            start = time.perf_counter()
+            candidates = fun(corpus_dir)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:<14}{len(candidates):>8}{elapsed:>10.2f}"
+                f"{len(candidates)/elapsed:>10.1f}"
+                f"{busy/(elapsed*n_cores):>12.1%}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare formant analysis throughput of the "praat" and
+"numba" engines for all max formant candidates of a token.
+
+The first numba call compiles (or loads cached) kernels,
+so it is run once before timing.
+
+Usage:
+    python benchmarks/bench_formant_engines.py
+"""
+import parselmouth as pm
+import numpy as np
+from pathlib import Path
+import timeit
+
+from fasttrackpy.processors.formants import track_formants_batch
+
+DATA_DIR = Path(__file__).parents[1].joinpath("tests", "test_data")
+MAX_FORMANTS = np.linspace(4000, 7000, 20)
+REPEATS = 5
+
+def time_engine(sound: pm.Sound, engine: str) -> float:
+    timer = timeit.Timer(
+        lambda: track_formants_batch(
+            samples = sound.values,
+            sampling_frequency = sound.sampling_frequency,
+            max_formants = MAX_FORMANTS,
+            xmin = sound.xmin,
+            engine = engine
+        )
+    )
+    return min(timer.repeat(repeat=REPEATS, number=1))
+
+def main():
+    sounds = [
+        (path.name, pm.Sound(str(path)))
+        for path in sorted(DATA_DIR.glob("*.wav"))
+    ]
+    # compile
+    time_engine(sounds[0][1], "numba")
+
+    print(f"{'file':<20}{'praat (ms)':>12}{'numba (ms)':>12}{'speedup':>10}")
+    total = {"praat": 0.0, "numba": 0.0}
+    for name, sound in sounds:
+        praat = time_engine(sound, "praat")
+        numba = time_engine(sound, "numba")
+        total["praat"] += praat
+        total["numba"] += numba
+        print(
+            f"{name:<20}{praat*1000:>12.1f}{numba*1000:>12.1f}"
+            f"{praat/numba:>10.1f}x"
+        )
+    n_tokens = len(sounds)
+    print(
+        "tokens per second: "
+        f"praat {n_tokens/total['praat']:.1f}, "
+        f"numba {n_tokens/total['numba']:.1f}"
+    )
+
+if __name__ == "__main__":
+    main()
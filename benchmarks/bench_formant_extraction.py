@@ -0,0 +1,53 @@
+"""
+Compare per-token formant extraction time between querying
+each frame with `get_value_at_time()` and reading all frames
+at once with `formant_arrays()`, from Praat's in-memory
+matrix conversions.
+
+Usage:
+    python benchmarks/bench_formant_extraction.py
+"""
+import parselmouth as pm
+import numpy as np
+from pathlib import Path
+import timeit
+
+from fasttrackpy.processors.formants import formant_arrays,\
+                                            formant_arrays_by_time
+
+DATA_DIR = Path(__file__).parents[1].joinpath("tests", "test_data")
+MAX_FORMANTS = np.linspace(4000, 7000, 20)
+REPEATS = 5
+
+def token_formants(sound: pm.Sound):
+    return [
+        sound.to_formant_burg(
+            time_step = 0.002,
+            max_number_of_formants = 5.5,
+            maximum_formant = max_formant,
+            window_length = 0.025,
+            pre_emphasis_from = 50
+        )
+        for max_formant in MAX_FORMANTS
+    ]
+
+def time_extraction(formant_objs, fun, n_formants = 4):
+    timer = timeit.Timer(
+        lambda: [fun(x, n_formants) for x in formant_objs]
+    )
+    return min(timer.repeat(repeat=REPEATS, number=1))
+
+def main():
+    print(f"{'file':<20}{'frames':>8}{'by time (ms)':>15}{'bulk (ms)':>12}{'speedup':>10}")
+    for path in sorted(DATA_DIR.glob("*.wav")):
+        sound = pm.Sound(str(path))
+        formant_objs = token_formants(sound)
+        by_time = time_extraction(formant_objs, formant_arrays_by_time)
+        bulk = time_extraction(formant_objs, formant_arrays)
+        print(
+            f"{path.name:<20}{formant_objs[0].n_frames:>8}"
+            f"{by_time*1000:>15.2f}{bulk*1000:>12.2f}{by_time/bulk:>10.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Time repeated output calls on the same `CandidateTracks`:
+the first call does the numeric work, and repeated calls
+should only return cached values.
+
+For each test sound, this times the first and repeated
+access of a candidate's errors and the sound object.
+
+Usage:
+    python benchmarks/bench_memoize.py
+"""
+import parselmouth as pm
+from pathlib import Path
+import time
+
+from fasttrackpy import CandidateTracks, F1_Max, F4_Min, Rhotic
+
+DATA_DIR = Path(__file__).parents[1].joinpath("tests", "test_data")
+REPEATS = 20
+
+def time_calls(fun) -> tuple[float, float]:
+    start = time.perf_counter()
+    fun()
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fun()
+    repeated = (time.perf_counter() - start) / REPEATS
+    return first, repeated
+
+def main():
+    print(f"{'file':<12}{'call':<22}{'first (ms)':>12}{'repeat (ms)':>13}{'speedup':>10}")
+    for path in sorted(DATA_DIR.glob("*.wav")):
+        candidates = CandidateTracks(
+            sound = pm.Sound(str(path)),
+            heuristics = [F1_Max, F4_Min, Rhotic]
+        )
+        # a fresh track, with nothing seeded from the candidates
+        track = candidates.winner
+        track._clear_cache()
+        calls = {
+            "smooth_error": lambda: track.smooth_error,
+            "heuristic_error": lambda: track.heuristic_error,
+            "total_error": lambda: track.total_error,
+            "sound": lambda: track.sound,
+        }
+        for name, fun in calls.items():
+            first, repeated = time_calls(fun)
+            print(
+                f"{path.name:<12}{name:<22}{first*1000:>12.3f}"
+                f"{repeated*1000:>13.4f}{first/repeated:>10.0f}x"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Compare writing a large synthetic corpus to csv, Parquet and
+Arrow IPC files. The tokens of the test recording are analyzed
+once, and their data frames are repeated with new file names,
+groups and labels to make the corpus, so that only writing is
+timed.
+
+"csv (list)" is `write_data()` on a list of the tokens, which
+concatenates their data frames before writing. The others are
+`write_data_iter()`, which writes them as they come in.
+
+Usage:
+    python benchmarks/bench_output_formats.py [n_files] [tokens_per_file]
+"""
+import parselmouth as pm
+import polars as pl
+from aligned_textgrid import AlignedTextGrid, Word, Phone
+from pathlib import Path
+import sys
+import tempfile
+import time
+import warnings
+
+from fasttrackpy import CandidateTracks
+from fasttrackpy.patterns.audio_textgrid import get_target_tiers,\
+                                                get_target_intervals
+from fasttrackpy.processors.outputs import write_data, write_data_iter
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+WINDOW_LENGTH = 0.025
+N_TOKENS = 20
+LABELS = ["AY1", "AW1", "IY1", "UW1", "EY1", "OW1"]
+
+class Frame:
+    """A token whose data frame is already made."""
+    def __init__(self, df: pl.DataFrame):
+        self.df = df
+
+    def to_df(self, which: str = "winner", output: str = "formants"):
+        return self.df
+
+def analyze_tokens() -> list[pl.DataFrame]:
+    sound = pm.Sound(str(CORPUS_DIR.joinpath("KY25A_1.wav")))
+    tg = AlignedTextGrid(
+        textgrid_path = CORPUS_DIR.joinpath("KY25A_1.TextGrid"),
+        entry_classes = [Word, Phone]
+    )
+    intervals = get_target_intervals(get_target_tiers(tg))[:N_TOKENS]
+    dfs = []
+    for interval in intervals:
+        part = sound.extract_part(
+            from_time = interval.start - WINDOW_LENGTH/2,
+            to_time = interval.end + WINDOW_LENGTH/2
+        )
+        candidates = CandidateTracks(sound = part, engine = "numba")
+        dfs.append(candidates.to_df(which = "all"))
+    return dfs
+
+def corpus(dfs: list[pl.DataFrame], n_files: int, tokens_per_file: int):
+    for file_index in range(n_files):
+        for token_index in range(tokens_per_file):
+            df = dfs[token_index % len(dfs)]
+            yield Frame(df.with_columns(
+                file_name = pl.lit(f"speaker{file_index:04}"),
+                group = pl.lit(f"speaker{file_index % 2}"),
+                label = pl.lit(LABELS[token_index % len(LABELS)]),
+                id = pl.lit(f"0-0-{token_index}")
+            ))
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    tokens_per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    warnings.simplefilter("ignore")
+    dfs = analyze_tokens()
+    n_rows = sum(
+        dfs[i % len(dfs)].height for i in range(tokens_per_file)
+    ) * n_files
+    print(f"{n_files} files, {n_files * tokens_per_file} tokens, {n_rows} rows")
+    print(f"{'format':<14}{'time (s)':>10}{'size (MB)':>12}")
+
+    runs = [
+        ("csv (list)", lambda frames, path: write_data(
+            list(frames), file = path, which = "all"
+        )),
+        *[
+            (format, lambda frames, path, format=format: write_data_iter(
+                frames, file = path, which = "all", format = format
+            ))
+            for format in ["csv", "parquet", "ipc"]
+        ]
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for index, (name, run) in enumerate(runs):
+            path = Path(tmp_dir).joinpath(f"output{index}")
+            frames = corpus(dfs, n_files, tokens_per_file)
+            start = time.perf_counter()
+            run(frames, path)
+            elapsed = time.perf_counter() - start
+            size = path.stat().st_size / 2**20
+            print(f"{name:<14}{elapsed:>10.2f}{size:>12.1f}")
+            path.unlink()
+
+if __name__ == "__main__":
+    main()
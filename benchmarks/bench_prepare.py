@@ -0,0 +1,56 @@
+"""
+Compare per-file wall time of `process_audio_textgrid()` when each
+token is resampled in its formant analysis ("token") against
+resampling and pre-emphasizing the file once per max formant
+("polyphase"), for both formant engines.
+
+It also reports how often the prepared runs pick the same winning
+max formant as the "token" run.
+
+Usage:
+    python benchmarks/bench_prepare.py
+"""
+import numpy as np
+from pathlib import Path
+import time
+import warnings
+
+from fasttrackpy import process_audio_textgrid
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+RESAMPLERS = ["token", "polyphase"]
+ENGINES = ["praat", "numba"]
+
+def run(engine: str, resampler: str):
+    start = time.perf_counter()
+    candidates = process_audio_textgrid(
+        audio_path = CORPUS_DIR.joinpath("KY25A_1.wav"),
+        textgrid_path = CORPUS_DIR.joinpath("KY25A_1.TextGrid"),
+        engine = engine,
+        resampler = resampler
+    )
+    elapsed = time.perf_counter() - start
+    winners = np.array([x.winner_idx for x in candidates])
+    return elapsed, winners
+
+def main():
+    warnings.simplefilter("ignore")
+    # compile the numba kernels
+    run("numba", "polyphase")
+
+    print(f"{'engine':<8}{'resampler':<12}{'time (s)':>10}{'speedup':>10}{'same winner':>13}")
+    for engine in ENGINES:
+        token_time, token_winners = run(engine, "token")
+        for resampler in RESAMPLERS:
+            if resampler == "token":
+                elapsed, winners = token_time, token_winners
+            else:
+                elapsed, winners = run(engine, resampler)
+            same = np.mean(winners == token_winners)
+            print(
+                f"{engine:<8}{resampler:<12}{elapsed:>10.2f}"
+                f"{token_time/elapsed:>9.2f}x{same:>12.1%}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare what workers send back per token: whole `CandidateTracks`
+objects against their `CandidateRecord`s, for the tokens of the
+test recording, with all candidates kept and with only the winner.
+
+The round trip time is pickling in the worker plus unpickling in
+the parent, and for records, rebuilding the `CandidateTracks`.
+
+Usage:
+    python benchmarks/bench_records.py
+"""
+import parselmouth as pm
+from aligned_textgrid import AlignedTextGrid, Word, Phone
+from pathlib import Path
+import pickle
+import time
+import warnings
+
+from fasttrackpy import CandidateTracks
+from fasttrackpy.patterns.audio_textgrid import get_target_tiers,\
+                                                get_target_intervals
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+WINDOW_LENGTH = 0.025
+
+def round_trip(objects, rebuild) -> tuple[int, float]:
+    start = time.perf_counter()
+    pickled = [pickle.dumps(x) for x in objects]
+    [rebuild(pickle.loads(x)) for x in pickled]
+    elapsed = time.perf_counter() - start
+    return sum(len(x) for x in pickled), elapsed
+
+def main():
+    warnings.simplefilter("ignore")
+    sound = pm.Sound(str(CORPUS_DIR.joinpath("KY25A_1.wav")))
+    tg = AlignedTextGrid(
+        textgrid_path = CORPUS_DIR.joinpath("KY25A_1.TextGrid"),
+        entry_classes = [Word, Phone]
+    )
+    intervals = get_target_intervals(get_target_tiers(tg))
+    parts = [
+        sound.extract_part(
+            from_time = interval.start - WINDOW_LENGTH/2,
+            to_time = interval.end + WINDOW_LENGTH/2
+        )
+        for interval in intervals
+    ]
+
+    print(f"{len(parts)} tokens")
+    print(f"{'kept':<8}{'returned':<12}{'bytes':>12}{'round trip (ms)':>17}")
+    for keep_candidates in ["all", "winner"]:
+        candidate_list = [
+            CandidateTracks(
+                sound = part,
+                engine = "numba",
+                keep_candidates = keep_candidates
+            )
+            for part in parts
+        ]
+        # the winner and data frames the workers made
+        for candidates in candidate_list:
+            candidates.to_df()
+
+        samples = [x.samples for x in candidate_list]
+        records = [x.to_record() for x in candidate_list]
+        for name, objects, rebuild in [
+            ("tracks", candidate_list, lambda x: x),
+            ("records", records, lambda x: CandidateTracks.from_record(
+                x, samples = samples[0]
+            ))
+        ]:
+            n_bytes, elapsed = round_trip(objects, rebuild)
+            print(
+                f"{keep_candidates:<8}{name:<12}{n_bytes:>12,}"
+                f"{elapsed*1000:>17.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compare dispatching tokens in file order against longest-first
+scheduling on a skewed synthetic corpus: many short tokens, with
+a few long ones at the end of the queue.
+
+Each token's processing time is measured once, and then the run is
+simulated on more cores than this machine may have: the workers
+take the next task in dispatch order whenever they are free. The
+makespan is when the last task finishes, and the tail is the time
+from the first worker running out of tasks to the end of the run.
+The last table is the measured wall time on this machine's cores.
+
+Usage:
+    python benchmarks/bench_schedule.py [n_short] [n_long]
+"""
+import parselmouth as pm
+import numpy as np
+import heapq
+from pathlib import Path
+import sys
+import time
+import warnings
+from joblib import cpu_count
+
+from fasttrackpy.patterns.audio_textgrid import get_candidates,\
+                                                get_token_features
+from fasttrackpy.utils.schedule import CostModel,\
+                                       longest_first,\
+                                       run_longest_first
+from fasttrackpy.utils.shared_audio import SharedAudio, window_slice
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+N_SHORT = 400
+N_LONG = 4
+SHORT = (0.04, 0.15)
+LONG = 1.5
+CORES = [4, 8, 16]
+
+def make_tasks(shared, n_short: int, n_long: int) -> list[dict]:
+    rng = np.random.default_rng(1)
+    starts = rng.uniform(1, 20, size = n_short + n_long)
+    durations = list(rng.uniform(*SHORT, size = n_short)) + [LONG] * n_long
+    return [
+        {
+            "audio": window_slice(shared, start, start + duration),
+            "engine": "numba",
+            "keep_candidates": "winner"
+        }
+        for start, duration in zip(starts, durations)
+    ]
+
+def simulate(seconds: list[float], n_cores: int) -> tuple[float, float]:
+    free = [0.0] * n_cores
+    for x in seconds:
+        heapq.heappush(free, heapq.heappop(free) + x)
+    # the first worker to go idle does so once every task has started
+    starved = min(free)
+    makespan = max(free)
+    return makespan, makespan - starved
+
+def main():
+    n_short = int(sys.argv[1]) if len(sys.argv) > 1 else N_SHORT
+    n_long = int(sys.argv[2]) if len(sys.argv) > 2 else N_LONG
+    warnings.simplefilter("ignore")
+    sound = pm.Sound(str(CORPUS_DIR.joinpath("KY25A_1.wav")))
+
+    with SharedAudio() as shared_audio:
+        tasks = make_tasks(shared_audio.add(sound), n_short, n_long)
+        # compile the numba kernels
+        get_candidates(tasks[0])
+
+        seconds = []
+        for task in tasks:
+            start = time.perf_counter()
+            get_candidates(task)
+            seconds.append(time.perf_counter() - start)
+
+        cost_model = CostModel()
+        scheduled = [
+            x[0] for x in longest_first(tasks, get_token_features, cost_model)
+        ]
+        orders = {
+            "file order": list(range(len(tasks))),
+            "longest first": scheduled
+        }
+
+        print(
+            f"{n_short} short and {n_long} long tokens, "
+            f"{sum(seconds):.2f}s of processing"
+        )
+        print(f"{'simulated':<15}{'cores':>6}{'makespan (s)':>14}{'tail (s)':>10}")
+        for n_cores in CORES:
+            for name, order in orders.items():
+                makespan, tail = simulate([seconds[i] for i in order], n_cores)
+                print(f"{name:<15}{n_cores:>6}{makespan:>14.2f}{tail:>10.2f}")
+
+        n_jobs = cpu_count()
+        print(f"{'measured':<15}{'cores':>6}{'wall (s)':>14}")
+        # sorting chunks of one task keeps the file order
+        for name, chunk_size in [("file order", 1), ("longest first", len(tasks))]:
+            start = time.perf_counter()
+            for _ in run_longest_first(
+                get_candidates, tasks, get_token_features, n_jobs,
+                chunk_size = chunk_size
+            ):
+                pass
+            elapsed = time.perf_counter() - start
+            print(f"{name:<15}{n_jobs:>6}{elapsed:>14.2f}")
+
+if __name__ == "__main__":
+    main()
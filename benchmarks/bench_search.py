@@ -0,0 +1,79 @@
+"""
+Compare the "coarse_to_fine" and "golden" max formant searches
+against the full "grid" search on the vowels of the test corpus:
+how often they pick the same winner, how far off the winning max
+formant is when they don't, how many formant analyses they save,
+and how long they take.
+
+Usage:
+    python benchmarks/bench_search.py [max_tokens]
+"""
+import parselmouth as pm
+import numpy as np
+from aligned_textgrid import AlignedTextGrid, Word, Phone
+from pathlib import Path
+import sys
+import time
+import warnings
+
+from fasttrackpy import CandidateTracks, F1_Max, F4_Min, Rhotic
+from fasttrackpy.patterns.audio_textgrid import get_target_tiers,\
+                                                get_target_intervals
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+SEARCHES = ["grid", "coarse_to_fine", "golden"]
+
+def get_sounds(max_tokens: int) -> list[pm.Sound]:
+    sound = pm.Sound(str(CORPUS_DIR.joinpath("KY25A_1.wav")))
+    tg = AlignedTextGrid(
+        textgrid_path = CORPUS_DIR.joinpath("KY25A_1.TextGrid"),
+        entry_classes = [Word, Phone]
+    )
+    intervals = get_target_intervals(get_target_tiers(tg))
+    return [
+        sound.extract_part(
+            from_time = interval.start - 0.025,
+            to_time = interval.end + 0.025
+        )
+        for interval in intervals[0:max_tokens]
+    ]
+
+def main(max_tokens: int = 200):
+    sounds = get_sounds(max_tokens)
+    winners = {x: [] for x in SEARCHES}
+    analyses = {x: [] for x in SEARCHES}
+    times = {x: 0.0 for x in SEARCHES}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for sound in sounds:
+            for search in SEARCHES:
+                start = time.perf_counter()
+                candidates = CandidateTracks(
+                    sound = sound,
+                    heuristics = [F1_Max, F4_Min, Rhotic],
+                    search = search
+                )
+                times[search] += time.perf_counter() - start
+                winners[search].append(
+                    candidates.max_formants[candidates.winner_idx]
+                )
+                analyses[search].append(candidates.n_analyses)
+
+    grid = np.array(winners["grid"])
+    step = candidates.max_formants[1] - candidates.max_formants[0]
+    print(f"{len(sounds)} tokens, grid step {step:.1f} Hz")
+    print(
+        f"{'search':<16}{'analyses':>10}{'saved':>8}{'same':>8}"
+        f"{'<=1 step':>10}{'max off (Hz)':>14}{'time (s)':>10}"
+    )
+    for search in SEARCHES:
+        diff = np.abs(np.array(winners[search]) - grid)
+        n = np.mean(analyses[search])
+        print(
+            f"{search:<16}{n:>10.1f}{candidates.nstep - n:>8.1f}"
+            f"{np.mean(diff == 0):>8.1%}{np.mean(diff <= step + 1e-6):>10.1%}"
+            f"{diff.max():>14.1f}{times[search]:>10.1f}"
+        )
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
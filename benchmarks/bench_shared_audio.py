@@ -0,0 +1,96 @@
+"""
+Compare sending token samples to the workers inside every
+task ("pickled") against sending slices of the file's samples
+in a `SharedAudio` store ("shared").
+
+IPC bytes are the pickled size of the task arguments sent to
+the workers. Both runs use the same workers and processing,
+so the wall time difference is the cost of moving the samples.
+
+Usage:
+    python benchmarks/bench_shared_audio.py
+"""
+import parselmouth as pm
+from aligned_textgrid import AlignedTextGrid, Word, Phone
+from pathlib import Path
+import pickle
+import time
+import warnings
+
+from fasttrackpy.patterns.audio_textgrid import get_target_tiers,\
+                                                get_target_intervals,\
+                                                get_sound_slices,\
+                                                iter_candidates
+from fasttrackpy.utils.shared_audio import SharedAudio
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+WINDOW_LENGTH = 0.025
+ENGINE = "numba"
+REPEATS = 3
+
+def task_args(**audio_args):
+    return {
+        **audio_args,
+        "engine": ENGINE,
+        "keep_candidates": "winner"
+    }
+
+def run(arg_list) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in iter_candidates(arg_list, True):
+            pass
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    warnings.simplefilter("ignore")
+    sound = pm.Sound(str(CORPUS_DIR.joinpath("KY25A_1.wav")))
+    tg = AlignedTextGrid(
+        textgrid_path = CORPUS_DIR.joinpath("KY25A_1.TextGrid"),
+        entry_classes = [Word, Phone]
+    )
+    intervals = get_target_intervals(get_target_tiers(tg))
+
+    pickled = [
+        task_args(
+            samples = part.values,
+            sampling_frequency = part.sampling_frequency,
+            xmin = part.xmin
+        )
+        for part in [
+            sound.extract_part(
+                from_time = interval.start - WINDOW_LENGTH/2,
+                to_time = interval.end + WINDOW_LENGTH/2
+            )
+            for interval in intervals
+        ]
+    ]
+
+    with SharedAudio() as shared_audio:
+        start = time.perf_counter()
+        slices = get_sound_slices(
+            shared_audio.add(sound),
+            intervals,
+            WINDOW_LENGTH
+        )
+        share_time = time.perf_counter() - start
+        shared = [task_args(audio = x) for x in slices]
+
+        # compile the numba kernels and start the workers
+        run(shared[:2])
+
+        print(f"{len(intervals)} tokens, {ENGINE} engine")
+        print(
+            f"shared file: {shared_audio.n_bytes/1e6:.2f} MB, "
+            f"written in {share_time*1000:.1f} ms"
+        )
+        print(f"{'tasks':<10}{'IPC bytes':>12}{'time (s)':>10}")
+        for name, arg_list in [("pickled", pickled), ("shared", shared)]:
+            n_bytes = sum(len(pickle.dumps(x)) for x in arg_list)
+            elapsed = run(arg_list)
+            print(f"{name:<10}{n_bytes:>12,}{elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    main()
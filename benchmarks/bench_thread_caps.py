@@ -0,0 +1,85 @@
+"""
+Compare loky workers with and without thread caps on the tokens
+of the test recording. Each task analyzes a token and makes its
+data frame, which uses numpy and scipy's BLAS libraries and
+polars' thread pool.
+
+"uncapped" lets each library in each worker start a thread per
+core, which is what happens without limits. "capped" gives each
+worker one thread per library. Threads are the OS threads of a
+worker once it has run its tasks.
+
+Usage:
+    python benchmarks/bench_thread_caps.py [n_jobs]
+"""
+import parselmouth as pm
+from aligned_textgrid import AlignedTextGrid, Word, Phone
+from joblib import Parallel, delayed, cpu_count
+from pathlib import Path
+import os
+import sys
+import time
+import warnings
+
+from fasttrackpy import CandidateTracks
+from fasttrackpy.patterns.audio_textgrid import get_target_tiers,\
+                                                get_target_intervals
+from fasttrackpy.utils.workers import get_backend
+
+CORPUS_DIR = Path(__file__).parents[1].joinpath("tests", "test_data", "corpus")
+WINDOW_LENGTH = 0.025
+REPEATS = 3
+
+def task(samples, sampling_frequency) -> int:
+    warnings.simplefilter("ignore")
+    candidates = CandidateTracks(
+        samples = samples,
+        sampling_frequency = sampling_frequency,
+        engine = "numba"
+    )
+    candidates.to_df(which = "all")
+    return len(os.listdir("/proc/self/task"))
+
+def run(parts, n_jobs: int, threads: int) -> tuple[float, int]:
+    times = []
+    for _ in range(REPEATS):
+        # loky starts new workers when the environment changes,
+        # and reuses them for the repeats
+        backend = get_backend(
+            "loky", n_jobs,
+            blas_threads = threads,
+            polars_threads = threads
+        )
+        start = time.perf_counter()
+        n_threads = Parallel(n_jobs = n_jobs, backend = backend)(
+            delayed(task)(part.values, part.sampling_frequency)
+            for part in parts
+        )
+        times.append(time.perf_counter() - start)
+    return min(times), max(n_threads)
+
+def main():
+    n_cores = cpu_count()
+    n_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else n_cores
+    warnings.simplefilter("ignore")
+    sound = pm.Sound(str(CORPUS_DIR.joinpath("KY25A_1.wav")))
+    tg = AlignedTextGrid(
+        textgrid_path = CORPUS_DIR.joinpath("KY25A_1.TextGrid"),
+        entry_classes = [Word, Phone]
+    )
+    parts = [
+        sound.extract_part(
+            from_time = interval.start - WINDOW_LENGTH/2,
+            to_time = interval.end + WINDOW_LENGTH/2
+        )
+        for interval in get_target_intervals(get_target_tiers(tg))
+    ]
+
+    print(f"{len(parts)} tokens, {n_jobs} workers, {n_cores} cores")
+    print(f"{'threads':<10}{'per library':>12}{'time (s)':>10}{'OS threads':>12}")
+    for name, threads in [("uncapped", n_cores), ("capped", 1)]:
+        elapsed, n_threads = run(parts, n_jobs, threads)
+        print(f"{name:<10}{threads:>12}{elapsed:>10.2f}{n_threads:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,9 @@ from fasttrackpy.processors.heuristic import (
     Rhotic,
     F3_F4_Sep
 )
-from fasttrackpy.patterns.just_audio import process_audio_file, process_directory
-from fasttrackpy.patterns.audio_textgrid import process_audio_textgrid
-from fasttrackpy.patterns.corpus import process_corpus
+from fasttrackpy.patterns.just_audio import process_audio_file, process_directory, iter_directory
+from fasttrackpy.patterns.audio_textgrid import process_audio_textgrid, iter_audio_textgrid
+from fasttrackpy.patterns.corpus import process_corpus, iter_corpus
 
 from importlib.metadata import version
 
@@ -39,5 +39,8 @@ __all__ = [
     "process_audio_file",
     "process_audio_textgrid",
     "process_corpus",
+    "iter_directory",
+    "iter_audio_textgrid",
+    "iter_corpus",
     "__version__"
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from fasttrackpy.tracks import CandidateTracks
-from fasttrackpy.processors.outputs import write_data
+from fasttrackpy.processors.outputs import write_data, write_data_iter, \
+    OUTPUT_FORMATS, PartitionWriter
 from fasttrackpy.processors.aggs import Agg
 from fasttrackpy.processors.smoothers import Smoother
 from fasttrackpy.processors.losses import Loss
@@ -14,10 +15,13 @@ from fasttrackpy.processors.heuristic import (
     F3_F4_Sep
 )
 from fasttrackpy.patterns.just_audio import process_audio_file, \
-                                            process_directory,\
+                                            iter_directory,\
                                             is_audio
-from fasttrackpy.patterns.audio_textgrid import process_audio_textgrid
-from fasttrackpy.patterns.corpus import process_corpus
+from fasttrackpy.patterns.audio_textgrid import iter_audio_textgrid
+from fasttrackpy.patterns.corpus import iter_corpus
+from fasttrackpy.utils.workers import BACKENDS, resolve_n_jobs
+from fasttrackpy.utils.manifest import Manifest, manifest_path
+from fasttrackpy.utils.cache import TokenCache, DEFAULT_CACHE_BYTES
 import parselmouth as pm
 from pathlib import Path
 from typing import Union
@@ -54,6 +58,27 @@ def configure(ctx, param, filename):
     
     ctx.default_map = config
 
+def batch_size_option(ctx, param, value):
+    if value is None or str(value) == "auto":
+        return "auto"
+    try:
+        batch_size = int(value)
+    except ValueError:
+        batch_size = 0
+    if batch_size < 1:
+        raise click.BadParameter("must be 'auto' or a positive integer")
+    return batch_size
+
+def check_partition_output(partition_output, output_format, dest):
+    if not partition_output:
+        return
+    if output_format == "csv":
+        raise click.UsageError(
+            "--partition-output needs --format parquet or ipc."
+        )
+    if not dest:
+        raise click.UsageError("--partition-output needs --dest.")
+
 formatter_settings = HelpFormatter.settings(
     theme=HelpTheme(
         invoked_command=Style(fg='bright_yellow'),
@@ -103,6 +128,13 @@ audio_processing = cloup.option_group(
         help = "Number of max-formant steps to be evaluated. "\
                "Defaults to 20."
     ),
+    cloup.option(
+        "--search",
+        type=click.Choice(["grid", "coarse_to_fine", "golden"]),
+        default="grid",
+        help = "How to search the max-formant steps. 'grid' evaluates "\
+               "every step. Defaults to 'grid'."
+    ),
     cloup.option(
         "--n-formants", 
         type=click.IntRange(min=1), 
@@ -126,7 +158,23 @@ audio_processing = cloup.option_group(
         type=click.FloatRange(min=0), 
         default=50,
         help="Pre-emphasis. Defaults to 50(Hz)."
-    )    
+    ),
+    cloup.option(
+        "--engine",
+        type=click.Choice(["praat", "numba"]),
+        default="praat",
+        help="Formant analysis engine. Defaults to 'praat'."
+    ),
+    cloup.option(
+        "--resampler",
+        type=click.Choice(["token", "polyphase"]),
+        default="token",
+        help="How to resample audio for each max-formant. 'token' "\
+             "resamples each token. 'polyphase' resamples each file "\
+             "once before cutting out tokens, which approximates "\
+             "'token' and can pick other winners. "\
+             "Defaults to 'token'."
+    )
 )
 
 smoother_options = cloup.option_group(
@@ -194,6 +242,46 @@ heuristic_options = cloup.option_group(
     )
 )
 
+parallel_options = cloup.option_group(
+    "Parallel Processing",
+    cloup.option(
+        "--n-jobs",
+        type=click.INT,
+        default=None,
+        help="Number of workers. Negative values count back from "\
+             "the number of cores, so -1 is every core. "\
+             "Defaults to every core."
+    ),
+    cloup.option(
+        "--backend",
+        type=click.Choice(BACKENDS),
+        default="loky",
+        help="How to run the workers. 'serial' processes everything "\
+             "in one process. Defaults to 'loky'."
+    ),
+    cloup.option(
+        "--batch-size",
+        default="auto",
+        callback=batch_size_option,
+        help="Number of tasks sent to a worker at a time, "\
+             "or 'auto'. Defaults to 'auto'."
+    ),
+    cloup.option(
+        "--blas-threads",
+        type=click.IntRange(min=1),
+        default=None,
+        help="Threads for numpy and scipy's BLAS libraries in each "\
+             "worker. Defaults to the cores divided by the workers."
+    ),
+    cloup.option(
+        "--polars-threads",
+        type=click.IntRange(min=1),
+        default=None,
+        help="Threads for polars in each worker. "\
+             "Defaults to the cores divided by the workers."
+    )
+)
+
 output_options = cloup.option_group(
     "Output Options",
     cloup.option(
@@ -218,9 +306,69 @@ output_options = cloup.option_group(
         help = "When processing a corpus, save each file/group to a "\
                "separate file?"
     ),
+    cloup.option(
+        "--format",
+        "output_format",
+        type=click.Choice(OUTPUT_FORMATS),
+        default="csv",
+        help = "The output file format. 'parquet' and 'ipc' (Arrow) "\
+               "files are zstd compressed and written as the data comes "\
+               "in. Defaults to 'csv'."
+    ),
+    cloup.option(
+        "--partition-output",
+        is_flag=True,
+        default=False,
+        help = "Save a Hive-style directory tree in the destination, "\
+               "with a directory for each file/group, that polars can "\
+               "scan. Needs --format parquet or ipc."
+    ),
     help = "Options for what data should be saved."
 )
 
+cache_options = cloup.option_group(
+    "Caching",
+    cloup.option(
+        "--cache-dir",
+        type=click.Path(file_okay=False),
+        default=None,
+        help="A directory to cache analyzed tokens in. Tokens analyzed "\
+             "with the same settings before are read from it. "\
+             "Defaults to no cache."
+    ),
+    cloup.option(
+        "--cache-size",
+        type=click.IntRange(min=1),
+        default=DEFAULT_CACHE_BYTES // 2**20,
+        help="The size limit of the cache in MiB. The tokens used "\
+             "longest ago are removed first. Defaults to 1024."
+    )
+)
+
+resume_options = cloup.option_group(
+    "Resuming",
+    cloup.option(
+        "--resume",
+        is_flag=True,
+        default=False,
+        help="Skip the files an earlier run with the same outputs and "\
+             "settings finished, as recorded in its manifest."
+    )
+)
+
+worker_output_options = cloup.option_group(
+    "Worker Output",
+    cloup.option(
+        "--worker-output",
+        is_flag=True,
+        default=False,
+        help="Have the workers write the data of each file to a "\
+             "Hive-style directory tree in the destination themselves, "\
+             "rather than sending it back, with a list of the files "\
+             "in fasttrack_parts.json. Needs --dest."
+    )
+)
+
 textgrid_processing = cloup.option_group(
     "TextGrid Processing",
     cloup.option(
@@ -293,6 +441,7 @@ def fasttrack():
 @audio_processing
 @smoother_options
 @heuristic_options
+@parallel_options
 def audio(
         file: Union[str, Path] = None,
         dir: Union[str,Path] = None,
@@ -300,6 +449,8 @@ def audio(
         dest: Union[str, Path] = None,
         which_output: str = "winner",
         data_output: str = "formants",
+        output_format: str = "csv",
+        partition_output: bool = False,
         smoother_method: str = "dct_smooth_regression",
         smoother_order: int = 5,
         loss_method: str = "lmse",
@@ -313,6 +464,13 @@ def audio(
         window_length: float = 0.025,
         time_step: float = 0.002,
         pre_emphasis_from: float = 50,
+        engine: str = "praat",
+        search: str = "grid",
+        n_jobs: int = None,
+        backend: str = "loky",
+        batch_size: int|str = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None,
         **kwargs
 ):
     """Run fasttrack.
@@ -328,6 +486,10 @@ def audio(
         data_output (str, optional): Whether to save the formant data,
             or smoothing parameter data.
             Defaults to "formants".
+        output_format (str, optional): The output file format, 'csv',
+            'parquet' or 'ipc'. Defaults to 'csv'.
+        partition_output (bool, optional): Whether to save a Hive-style
+            directory tree of parquet or ipc files. Defaults to False.
         smoother_method (str, optional): Smoother method to use. Defaults to 'dct_smooth_regression'
             (Discrete Cosine Transform)
         smoother_order (int, optional): Order of the smooth. 
@@ -348,7 +510,20 @@ def audio(
         time_step (float, optional): Formant analysis window step size.
             Defaults to 0.002(s)
         pre_emphasis_from (float, optional): Pre-emphasis. Defaults to 50(Hz)
+        engine (str, optional): Formant analysis engine. Defaults to 'praat'.
+        search (str, optional): How to search the max-formant steps.
+            Defaults to 'grid'.
+        n_jobs (int, optional): Number of workers. Defaults to every core.
+        backend (str, optional): How to run the workers. Defaults to 'loky'.
+        batch_size (int|str, optional): Number of tasks sent to a worker
+            at a time. Defaults to 'auto'.
+        blas_threads (int, optional): Threads for BLAS libraries in each
+            worker. Defaults to the cores divided by the workers.
+        polars_threads (int, optional): Threads for polars in each worker.
+            Defaults to the cores divided by the workers.
     """
+    check_partition_output(partition_output, output_format, dest)
+
     smoother_kwargs = {
         "method": smoother_method,
         "order": smoother_order
@@ -384,17 +559,26 @@ def audio(
             smoother=smoother,
             loss_fun=loss_fun,
             agg_fun=agg_fun,
-            heuristics=heuristics
+            heuristics=heuristics,
+            engine=engine,
+            search=search,
+            output=data_output,
+            keep_candidates=which_output,
+            # one file gets all the workers for its candidates
+            n_jobs=1 if backend == "serial" \
+                else resolve_n_jobs(n_jobs)
         )
 
         write_data(candidates=candidates, 
                    file=output, 
                    destination=dest,
                    which=which_output, 
-                   output=data_output
+                   output=data_output,
+                   format=output_format,
+                   partition=partition_output
         )
     if dir:
-        candidate_list = process_directory(
+        candidate_list = iter_directory(
             path = dir,
             min_max_formant=min_max_formant,
             max_max_formant=max_max_formant,
@@ -405,15 +589,27 @@ def audio(
             pre_emphasis_from=pre_emphasis_from,
             smoother=smoother,
             loss_fun=loss_fun,
-            agg_fun=agg_fun
+            agg_fun=agg_fun,
+            engine=engine,
+            search=search,
+            output=data_output,
+            keep_candidates=which_output,
+            n_jobs=n_jobs,
+            backend=backend,
+            batch_size=batch_size,
+            blas_threads=blas_threads,
+            polars_threads=polars_threads
         )
 
-        [write_data(
-            x, 
-            destination=dest,
-            which = which_output,
-            output=data_output
-            ) for x in candidate_list]
+        for x in candidate_list:
+            write_data(
+                x, 
+                destination=dest,
+                which = which_output,
+                output=data_output,
+                format=output_format,
+                partition=partition_output
+            )
 
 @fasttrack.command(
     aliases = ["audio-tg"],
@@ -442,6 +638,8 @@ def audio(
 @audio_processing
 @smoother_options
 @heuristic_options
+@parallel_options
+@cache_options
 def audio_textgrid(
         audio: Union[str, Path] = None,
         textgrid: Union[str,Path] = None,
@@ -452,6 +650,8 @@ def audio_textgrid(
         dest: Union[str, Path] = None,
         which_output: str = "winner",
         data_output: str = "formants",
+        output_format: str = "csv",
+        partition_output: bool = False,
         smoother_method: str = "dct_smooth_regression",
         smoother_order: int = 5,
         loss_method: str = "lmse",
@@ -463,6 +663,16 @@ def audio_textgrid(
         window_length: float = 0.025,
         time_step: float = 0.002,
         pre_emphasis_from: float = 50,
+        engine: str = "praat",
+        search: str = "grid",
+        resampler: str = "token",
+        n_jobs: int = None,
+        backend: str = "loky",
+        batch_size: int|str = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None,
+        cache_dir: Union[str, Path] = None,
+        cache_size: int = DEFAULT_CACHE_BYTES // 2**20,
         **kwargs
 ):
     """Run fasttrack.
@@ -479,6 +689,10 @@ def audio_textgrid(
         data_output (str, optional): Whether to save the formant data,
             or smoothing parameter data.
             Defaults to "formants".
+        output_format (str, optional): The output file format, 'csv',
+            'parquet' or 'ipc'. Defaults to 'csv'.
+        partition_output (bool, optional): Whether to save a Hive-style
+            directory tree of parquet or ipc files. Defaults to False.
         smoother_method (str, optional): Smoother method to use. Defaults to 'dct_smooth_regression'
             (Discrete Cosine Transform)
         smoother_order (int, optional): Order of the smooth. 
@@ -499,7 +713,26 @@ def audio_textgrid(
         time_step (float, optional): Formant analysis window step size.
             Defaults to 0.002(s)
         pre_emphasis_from (float, optional): Pre-emphasis. Defaults to 50(Hz)
+        engine (str, optional): Formant analysis engine. Defaults to 'praat'.
+        search (str, optional): How to search the max-formant steps.
+            Defaults to 'grid'.
+        resampler (str, optional): How to resample audio for each
+            max-formant. Defaults to 'token'.
+        n_jobs (int, optional): Number of workers. Defaults to every core.
+        backend (str, optional): How to run the workers. Defaults to 'loky'.
+        batch_size (int|str, optional): Number of tasks sent to a worker
+            at a time. Defaults to 'auto'.
+        blas_threads (int, optional): Threads for BLAS libraries in each
+            worker. Defaults to the cores divided by the workers.
+        polars_threads (int, optional): Threads for polars in each worker.
+            Defaults to the cores divided by the workers.
+        cache_dir (Union[str, Path], optional): A directory to cache analyzed
+            tokens in. Defaults to None.
+        cache_size (int, optional): The size limit of the cache in MiB.
+            Defaults to 1024.
     """
+    check_partition_output(partition_output, output_format, dest)
+
     smoother_kwargs = {
         "method": smoother_method,
         "order": smoother_order
@@ -521,7 +754,9 @@ def audio_textgrid(
 
     entry_classes = entry_classes.split("|")
 
-    all_candidates = process_audio_textgrid(
+    cache = TokenCache(cache_dir, cache_size * 2**20) if cache_dir else None
+
+    all_candidates = iter_audio_textgrid(
         audio_path=audio,
         textgrid_path=textgrid,
         entry_classes=entry_classes,
@@ -538,14 +773,28 @@ def audio_textgrid(
         smoother=smoother,
         loss_fun=loss_fun,
         agg_fun=agg_fun,
-        heuristics=heuristics
+        heuristics=heuristics,
+        engine=engine,
+        search=search,
+        resampler=resampler,
+        output=data_output,
+        keep_candidates=which_output,
+        n_jobs=n_jobs,
+        backend=backend,
+        batch_size=batch_size,
+        blas_threads=blas_threads,
+        polars_threads=polars_threads,
+        cache=cache
     )
 
-    write_data(candidates=all_candidates, 
-                file=output, 
-                destination=dest,
-                which=which_output, 
-                output=data_output
+    write_data_iter(
+        all_candidates,
+        file=output, 
+        destination=dest,
+        which=which_output, 
+        output=data_output,
+        format=output_format,
+        partition=partition_output
     )
 
 @fasttrack.command(
@@ -568,6 +817,10 @@ def audio_textgrid(
 @audio_processing
 @smoother_options
 @heuristic_options
+@parallel_options
+@cache_options
+@resume_options
+@worker_output_options
 def corpus(
         corpus: str|Path = None,
         entry_classes: str = None,
@@ -578,6 +831,8 @@ def corpus(
         dest: str|Path = None,
         which_output: str = "winner",
         data_output: str = "formants",
+        output_format: str = "csv",
+        partition_output: bool = False,
         smoother_method: str = "dct_smooth_regression",
         smoother_order: int = 5,
         loss_method: str = "lmse",
@@ -589,6 +844,18 @@ def corpus(
         window_length: float = 0.025,
         time_step: float = 0.002,
         pre_emphasis_from: float = 50,
+        engine: str = "praat",
+        search: str = "grid",
+        resampler: str = "token",
+        n_jobs: int = None,
+        backend: str = "loky",
+        batch_size: int|str = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None,
+        cache_dir: str|Path = None,
+        cache_size: int = DEFAULT_CACHE_BYTES // 2**20,
+        resume: bool = False,
+        worker_output: bool = False,
         **kwargs
 ):
     smoother_kwargs = {
@@ -612,7 +879,60 @@ def corpus(
 
     entry_classes = entry_classes.split("|")
 
-    all_candidates = process_corpus(
+    cache = TokenCache(cache_dir, cache_size * 2**20) if cache_dir else None
+
+    check_partition_output(partition_output, output_format, dest)
+    if resume and (output_format != "csv" or worker_output):
+        raise click.UsageError(
+            "--resume only works with csv output, without --worker-output."
+        )
+
+    writer = None
+    if worker_output:
+        if not dest:
+            raise click.UsageError("--worker-output needs --dest.")
+        writer = PartitionWriter(
+            dest,
+            format = output_format,
+            which = which_output,
+            output = data_output
+        )
+
+    # which files are done is saved as the run goes, so
+    # a run that is stopped can be resumed.
+    manifest = None
+    if output_format == "csv" and writer is None:
+        manifest = Manifest(
+            manifest_path(output, dest),
+            config = {
+                "corpus": str(Path(corpus).resolve()),
+                "entry_classes": entry_classes,
+                "target_tier": target_tier,
+                "target_labels": target_labels,
+                "min_duration": min_duration,
+                "min_max_formant": min_max_formant,
+                "max_max_formant": max_max_formant,
+                "nstep": nstep,
+                "n_formants": n_formants,
+                "window_length": window_length,
+                "time_step": time_step,
+                "pre_emphasis_from": pre_emphasis_from,
+                "smoother": smoother_kwargs,
+                "loss": loss_kwargs,
+                "heuristics": {
+                    k: v for k, v in kwargs.items() if k in heuristic_dict
+                },
+                "engine": engine,
+                "search": search,
+                "resampler": resampler,
+                "which_output": which_output,
+                "data_output": data_output,
+                "separate_output": separate_output
+            },
+            resume = resume
+        )
+
+    all_candidates = iter_corpus(
         corpus_path = corpus,
         entry_classes = entry_classes,
         target_tier = target_tier,
@@ -628,17 +948,51 @@ def corpus(
         smoother = smoother,
         loss_fun = loss_fun,
         agg_fun = agg_fun,
-        heuristics=heuristics
-    )
-
-    write_data(
-        all_candidates,
-        file=output, 
-        destination=dest,
-        which=which_output, 
+        heuristics=heuristics,
+        engine=engine,
+        search=search,
+        resampler=resampler,
         output=data_output,
-        separate=separate_output
+        keep_candidates=which_output,
+        n_jobs=n_jobs,
+        backend=backend,
+        batch_size=batch_size,
+        blas_threads=blas_threads,
+        polars_threads=polars_threads,
+        cache=cache,
+        manifest=manifest,
+        writer=writer
     )
 
+    try:
+        if writer is not None:
+            # the workers wrote the data, and only
+            # the list of their files comes back
+            writer.save_index(list(all_candidates))
+            return
+        write_data_iter(
+            all_candidates,
+            file=output, 
+            destination=dest,
+            which=which_output, 
+            output=data_output,
+            separate=separate_output,
+            manifest=manifest,
+            format=output_format,
+            partition=partition_output
+        )
+    except KeyboardInterrupt:
+        if manifest is None:
+            click.echo("Interrupted.", err=True)
+            raise click.exceptions.Exit(130)
+        # the rows of finished files are written, and the
+        # rows of the unfinished one were removed
+        click.echo(
+            f"Interrupted with {len(manifest.files)} files finished. "\
+            "Run again with --resume to continue.",
+            err=True
+        )
+        raise click.exceptions.Exit(130)
+
 if __name__ == "__main__":
     fasttrack()
\ No newline at end of file
@@ -2,17 +2,28 @@ import parselmouth as pm
 from aligned_textgrid import AlignedTextGrid, Word, Phone, SequenceInterval, SequenceTier
 import aligned_textgrid
 from fasttrackpy import CandidateTracks, Smoother, Loss, Agg
+from fasttrackpy.tracks import CandidateRecord
 from fasttrackpy.processors.heuristic import MinMaxHeuristic, SpacingHeuristic
+from fasttrackpy.processors.prepare import PreparedWindow, prepare_windows
 from fasttrackpy.patterns.just_audio import is_audio
 from fasttrackpy.utils.safely import safely, filter_nones
+from fasttrackpy.utils.shared_audio import SharedAudio,\
+                                            SharedSound,\
+                                            AudioSlice,\
+                                            window_slice,\
+                                            attach_audio
+from fasttrackpy.utils.run_config import RunConfig, attach_config
+from fasttrackpy.utils.schedule import CostModel, iter_tasks
+from fasttrackpy.utils.cache import TokenCache
 import re
 import os
 import sys
+import numpy as np
 
 from pathlib import Path
-from tqdm import tqdm
-from joblib import Parallel, cpu_count, delayed
 import warnings
+from typing import Literal
+from collections.abc import Iterator
 
 def get_interval_classes(
         textgrid_format: list = ["Word", "Phone"]
@@ -55,37 +66,120 @@ def get_target_intervals(
 
     return intervals
 
+def get_prepared_windows(
+        sound: pm.Sound,
+        intervals: list[SequenceInterval],
+        window_length: float,
+        min_max_formant: float = 4000,
+        max_max_formant: float = 7000,
+        nstep: int = 20,
+        pre_emphasis_from: float = 50,
+        resampler: Literal["token", "polyphase"] = "token"
+    ) -> list[PreparedWindow|None]:
+    if resampler == "token":
+        return [None for _ in intervals]
+
+    windows = [
+        (interval.start-(window_length/2), interval.end+(window_length/2))
+        for interval in intervals
+    ]
+    return prepare_windows(
+        sound,
+        windows = windows,
+        max_formants = np.linspace(min_max_formant, max_max_formant, nstep),
+        pre_emphasis_from = pre_emphasis_from,
+        resampler = resampler
+    )
+
+def get_sound_slices(
+        shared: SharedSound,
+        intervals: list[SequenceInterval],
+        window_length: float
+) -> list[AudioSlice]:
+    return [
+        window_slice(
+            shared,
+            from_time = interval.start-(window_length/2),
+            to_time = interval.end+(window_length/2)
+        )
+        for interval in intervals
+    ]
+
 @safely(message="There was a problem getting some candidate tracks.")
 def get_candidates(args_dict):
+    args_dict = dict(attach_audio(attach_config(args_dict)))
+    cache = args_dict.pop("cache", None)
+    if cache is not None:
+        key = cache.key(args_dict)
+        record = cache.get(key)
+        if record is not None:
+            return record
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
         candidates =  CandidateTracks(**args_dict)
     if candidates.winner.formants.shape[1] == 1:
         warnings.warn("formant tracking error")
-    return candidates
+    # only the compact record is sent back
+    record = candidates.to_record()
+    if cache is not None:
+        cache.put(key, record)
+    return record
 
-@delayed
-@safely(message="There was a problem getting some candidate tracks.")
-def get_candidates_delayed(args_dict):
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        candidates =  CandidateTracks(**args_dict)
-    if candidates.winner.formants.shape[1] == 1:
-        warnings.warn("formant tracking error")
-    return candidates
-
-def run_candidates(arg_list, parallel:bool):
-    if parallel:
-        n_jobs = cpu_count()
-        all_candidates = Parallel(n_jobs=n_jobs)(
-            get_candidates_delayed(args_dict=arg) for arg in tqdm(arg_list)
-            )
-        return all_candidates
-    
-    all_candidates = [get_candidates(args_dict=arg) for arg in tqdm(arg_list)]
-    return all_candidates
+def get_token_features(args_dict: dict) -> np.ndarray:
+    """The cost features of a token's task, for scheduling.
+    """
+    args_dict = attach_config(args_dict)
+    if "audio" in args_dict:
+        n_samples = args_dict["audio"].end - args_dict["audio"].start
+        sampling_frequency = args_dict["audio"].sampling_frequency
+    else:
+        n_samples = np.shape(args_dict["samples"])[-1]
+        sampling_frequency = args_dict["sampling_frequency"]
+    return CostModel.features(
+        duration = n_samples / sampling_frequency,
+        sampling_frequency = sampling_frequency,
+        nstep = args_dict.get("nstep", 20),
+        time_step = args_dict.get("time_step", 0.002)
+    )
 
-def process_audio_textgrid(
+def rebuild_candidates(
+        record: CandidateRecord,
+        args_dict: dict
+) -> CandidateTracks:
+    """Rebuild the candidate tracks of a record returned by a worker
+    with the samples and processing objects of its task's arguments.
+    """
+    args_dict = attach_audio(attach_config(args_dict))
+    return CandidateTracks.from_record(
+        record,
+        samples = np.array(args_dict["samples"]),
+        smoother = args_dict["smoother"],
+        loss_fun = args_dict["loss_fun"],
+        agg_fun = args_dict["agg_fun"],
+        heuristics = args_dict["heuristics"],
+        prepared = args_dict["prepared"]
+    )
+
+def iter_candidates(
+        arg_list,
+        parallel:bool,
+        run_config: RunConfig = None,
+        **kwargs
+    ):
+    return iter_tasks(
+        get_candidates,
+        arg_list,
+        get_token_features,
+        parallel,
+        run_config,
+        split_candidates = True,
+        **kwargs
+    )
+
+def run_candidates(arg_list, parallel:bool, run_config: RunConfig = None, **kwargs):
+    return list(iter_candidates(arg_list, parallel, run_config, **kwargs))
+
+def iter_audio_textgrid(
         audio_path: str|Path,
         textgrid_path: str|Path,
         entry_classes: list = ["Word", "Phone"],
@@ -102,9 +196,21 @@ def process_audio_textgrid(
         smoother: Smoother = Smoother(),
         loss_fun: Loss = Loss(),
         agg_fun: Agg = Agg(),
-        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = []     
-)->list[CandidateTracks]:
-    """Process an audio and TextGrid file together.
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+        engine: Literal["praat", "numba"] = "praat",
+        output: Literal["formants", "param", "log_param"] | None = "formants",
+        keep_candidates: Literal["all", "winner"] = "all",
+        search: Literal["grid", "coarse_to_fine", "golden"] = "grid",
+        resampler: Literal["token", "polyphase"] = "token",
+        n_jobs: int = None,
+        backend: Literal["loky", "multiprocessing", "threading", "serial"] = "loky",
+        batch_size: int|Literal["auto"] = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None,
+        cache: TokenCache = None
+)->Iterator[CandidateTracks]:
+    """Process an audio and TextGrid file together,
+    yielding the candidates of each interval as they are done.
 
     Args:
         audio_path (str | Path): Path to an audio file.
@@ -138,10 +244,45 @@ def process_audio_textgrid(
             Defaults to Agg().
         heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
             A list of formant tracking heuristics to use.
+        engine (Literal["praat", "numba"], optional): The formant
+            analysis engine. Defaults to "praat".
+        output (Literal["formants", "param", "log_param"] | None, optional):
+            The data that will be output, used to skip computing
+            what it doesn't need. Defaults to "formants".
+        keep_candidates (Literal["all", "winner"], optional): Whether to keep
+            all candidate tracks, or only the winner. Defaults to "all".
+        search (Literal["grid", "coarse_to_fine", "golden"], optional):
+            How to search the max formants. See
+            [](`~fasttrackpy.CandidateTracks`). Defaults to "grid".
+        resampler (Literal["token", "polyphase"], optional):
+            How to resample the audio for each max formant. `"token"`
+            resamples each token in its formant analysis. `"polyphase"`
+            resamples and pre-emphasizes the file once for each max formant
+            before cutting out the tokens, with a polyphase resampler whose
+            formants approximate the token resampling's. See
+            [](`~fasttrackpy.processors.prepare.prepare_windows`).
+            Defaults to "token".
+        n_jobs (int, optional): The number of workers. None uses every
+            core, and negative values count back from it, as in joblib.
+            Defaults to None.
+        backend (Literal["loky", "multiprocessing", "threading", "serial"], optional):
+            How to run the workers. `"serial"` processes everything in this
+            process. Defaults to "loky".
+        batch_size (int|Literal["auto"], optional): The number of tokens
+            sent to a worker at a time. Defaults to "auto".
+        blas_threads (int, optional): The number of threads numpy and scipy's
+            BLAS and OpenMP libraries can use in each loky worker. If None, the
+            cores divided by the workers. Defaults to None.
+        polars_threads (int, optional): The number of threads polars can use
+            in each loky worker. If None, the cores divided by the workers.
+            Defaults to None.
+        cache (TokenCache, optional): A
+            [](`~fasttrackpy.utils.cache.TokenCache`) of analyzed tokens.
+            Tokens it has are read from it instead of being analyzed,
+            and the others are added to it. Defaults to None.
 
-
-    Returns:
-        (list[CandidateTracks]): A list of candidate tracks.
+    Yields:
+        (CandidateTracks): The candidate tracks of each interval.
     """
     
     if not is_audio(str(audio_path)):
@@ -158,44 +299,211 @@ def process_audio_textgrid(
         target_labels=target_labels,
         min_duration=min_duration
         )
-    sound_parts = [
-        sound.extract_part(from_time = interval.start-(window_length/2), to_time = interval.end+(window_length/2))
-        for interval in target_intervals
-    ]
+    # the workers read their windows from the shared samples
+    shared_audio = SharedAudio()
+    sound_parts = get_sound_slices(
+        shared_audio.add(sound),
+        target_intervals,
+        window_length
+    )
+
+    prepared_windows = get_prepared_windows(
+        sound,
+        target_intervals,
+        window_length = window_length,
+        min_max_formant = min_max_formant,
+        max_max_formant = max_max_formant,
+        nstep = nstep,
+        pre_emphasis_from = pre_emphasis_from,
+        resampler = resampler
+    )
+
+    # the settings every task shares
+    run_config = RunConfig(
+        min_max_formant = min_max_formant,
+        max_max_formant = max_max_formant,
+        nstep = nstep,
+        n_formants = n_formants,
+        window_length = window_length,
+        time_step = time_step,
+        pre_emphasis_from = pre_emphasis_from,
+        smoother = smoother,
+        loss_fun = loss_fun,
+        agg_fun = agg_fun,
+        heuristics = heuristics,
+        engine = engine,
+        output = output,
+        keep_candidates = keep_candidates,
+        search = search,
+        cache = cache
+    )
 
     arg_list = [
         {
-            "samples": x.values,
-            "sampling_frequency": x.sampling_frequency,
-            "xmin": x.xmin,
+            "config": run_config.id,
+            "audio": x,
             #"interval": interval,
-            "min_max_formant": min_max_formant,
-            "max_max_formant": max_max_formant,
-            "nstep": nstep,
-            "n_formants": n_formants,
-            "window_length": window_length,
-            "time_step" : time_step,
-            "pre_emphasis_from": pre_emphasis_from,
-            "smoother": smoother,
-            "loss_fun":loss_fun,
-            "agg_fun": agg_fun,
-            "heuristics": heuristics
-        } for x, interval in zip(sound_parts, target_intervals)
+            "prepared": prepared
+        } for x, prepared in zip(sound_parts, prepared_windows)
     ]
     
     windows_3_12 = os.name != "posix" and \
             sys.version_info.major == 3 and \
             sys.version_info.minor == 12
 
-    candidate_list = run_candidates(
-        arg_list, not windows_3_12
-    )
+    with shared_audio, run_config:
+        candidate_list = iter_candidates(
+            arg_list, not windows_3_12, run_config,
+            n_jobs = n_jobs,
+            backend = backend,
+            batch_size = batch_size,
+            blas_threads = blas_threads,
+            polars_threads = polars_threads
+        )
 
-    candidate_list, target_intervals = filter_nones(candidate_list, [candidate_list, target_intervals])
-    for cand, interval in zip(candidate_list, target_intervals):
-        cand.interval = interval
-        cand.file_name = Path(str(audio_path)).stem
+        for record, args_dict, interval in zip(candidate_list, arg_list, target_intervals):
+            if record is None:
+                continue
+            cand = rebuild_candidates(record, args_dict)
+            cand.interval = interval
+            cand.file_name = Path(str(audio_path)).stem
+            yield cand
 
-    return candidate_list
+def process_audio_textgrid(
+        audio_path: str|Path,
+        textgrid_path: str|Path,
+        entry_classes: list = ["Word", "Phone"],
+        target_tier: str = "Phone",
+        target_labels: str = "[AEIOU]",
+        min_duration: float = 0.05,
+        min_max_formant:float = 4000,
+        max_max_formant:float = 7000,
+        nstep:int = 20,
+        n_formants: int = 4,
+        window_length: float = 0.025,
+        time_step: float = 0.002,
+        pre_emphasis_from: float = 50,
+        smoother: Smoother = Smoother(),
+        loss_fun: Loss = Loss(),
+        agg_fun: Agg = Agg(),
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+        engine: Literal["praat", "numba"] = "praat",
+        output: Literal["formants", "param", "log_param"] | None = "formants",
+        keep_candidates: Literal["all", "winner"] = "all",
+        search: Literal["grid", "coarse_to_fine", "golden"] = "grid",
+        resampler: Literal["token", "polyphase"] = "token",
+        n_jobs: int = None,
+        backend: Literal["loky", "multiprocessing", "threading", "serial"] = "loky",
+        batch_size: int|Literal["auto"] = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None,
+        cache: TokenCache = None
+)->list[CandidateTracks]:
+    """Process an audio and TextGrid file together.
+    To handle each interval's candidates as they are done, without
+    keeping them all in memory, use
+    [](`~fasttrackpy.patterns.audio_textgrid.iter_audio_textgrid`).
 
+    Args:
+        audio_path (str | Path): Path to an audio file.
+        textgrid_path (str | Path): Path to a TextGrid
+        entry_classes (list, optional): Entry classes for the textgrid tiers. 
+            Defaults to ["Word", "Phone"].
+        target_tier (str, optional): The tier to target. 
+            Defaults to "Phone".
+        target_labels (str, optional): A regex that will match intervals to target. 
+            Defaults to "[AEIOU]".
+        min_duration (float, optional): Minimum vowel duration to mention.
+            Defaults to 0.05.
+        min_max_formant (float, optional): The lowest max-formant value to try. 
+            Defaults to 4000.
+        max_max_formant (float, optional): The highest max formant to try. 
+            Defaults to 7000.
+        nstep (int, optional): The number of steps from the min to the max max formant. 
+            Defaults to 20.
+        n_formants (int, optional): The number of formants to track. Defaults to 4.
+        window_length (float, optional): Window length of the formant analysis. 
+            Defaults to 0.025.
+        time_step (float, optional): Time step of the formant analyusis window. 
+            Defaults to 0.002.
+        pre_emphasis_from (float, optional): Pre-emphasis threshold. 
+            Defaults to 50.
+        smoother (Smoother, optional): The smoother method to use. 
+            Defaults to `Smoother()`.
+        loss_fun (Loss, optional): The loss function to use. 
+            Defaults to Loss().
+        agg_fun (Agg, optional): The loss aggregation function to use. 
+            Defaults to Agg().
+        heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
+            A list of formant tracking heuristics to use.
+        engine (Literal["praat", "numba"], optional): The formant
+            analysis engine. Defaults to "praat".
+        output (Literal["formants", "param", "log_param"] | None, optional):
+            The data that will be output, used to skip computing
+            what it doesn't need. Defaults to "formants".
+        keep_candidates (Literal["all", "winner"], optional): Whether to keep
+            all candidate tracks, or only the winner. Defaults to "all".
+        search (Literal["grid", "coarse_to_fine", "golden"], optional):
+            How to search the max formants. See
+            [](`~fasttrackpy.CandidateTracks`). Defaults to "grid".
+        resampler (Literal["token", "polyphase"], optional):
+            How to resample the audio for each max formant. `"token"`
+            resamples each token in its formant analysis. `"polyphase"`
+            resamples and pre-emphasizes the file once for each max formant
+            before cutting out the tokens, with a polyphase resampler whose
+            formants approximate the token resampling's. See
+            [](`~fasttrackpy.processors.prepare.prepare_windows`).
+            Defaults to "token".
+        n_jobs (int, optional): The number of workers. None uses every
+            core, and negative values count back from it, as in joblib.
+            Defaults to None.
+        backend (Literal["loky", "multiprocessing", "threading", "serial"], optional):
+            How to run the workers. `"serial"` processes everything in this
+            process. Defaults to "loky".
+        batch_size (int|Literal["auto"], optional): The number of tokens
+            sent to a worker at a time. Defaults to "auto".
+        blas_threads (int, optional): The number of threads numpy and scipy's
+            BLAS and OpenMP libraries can use in each loky worker. If None, the
+            cores divided by the workers. Defaults to None.
+        polars_threads (int, optional): The number of threads polars can use
+            in each loky worker. If None, the cores divided by the workers.
+            Defaults to None.
+        cache (TokenCache, optional): A
+            [](`~fasttrackpy.utils.cache.TokenCache`) of analyzed tokens.
+            Tokens it has are read from it instead of being analyzed,
+            and the others are added to it. Defaults to None.
 
+    Returns:
+        (list[CandidateTracks]): A list of candidate tracks.
+    """
+    
+    return list(iter_audio_textgrid(
+        audio_path = audio_path,
+        textgrid_path = textgrid_path,
+        entry_classes = entry_classes,
+        target_tier = target_tier,
+        target_labels = target_labels,
+        min_duration = min_duration,
+        min_max_formant = min_max_formant,
+        max_max_formant = max_max_formant,
+        nstep = nstep,
+        n_formants = n_formants,
+        window_length = window_length,
+        time_step = time_step,
+        pre_emphasis_from = pre_emphasis_from,
+        smoother = smoother,
+        loss_fun = loss_fun,
+        agg_fun = agg_fun,
+        heuristics = heuristics,
+        engine = engine,
+        output = output,
+        keep_candidates = keep_candidates,
+        search = search,
+        resampler = resampler,
+        n_jobs = n_jobs,
+        backend = backend,
+        batch_size = batch_size,
+        blas_threads = blas_threads,
+        polars_threads = polars_threads,
+        cache = cache
+    ))
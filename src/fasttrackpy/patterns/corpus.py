@@ -4,21 +4,36 @@ import aligned_textgrid
 from fasttrackpy import CandidateTracks, Smoother, Loss, Agg
 from fasttrackpy.processors.heuristic import MinMaxHeuristic, SpacingHeuristic
 from fasttrackpy.patterns.just_audio import is_audio
-from fasttrackpy.patterns.audio_textgrid import get_interval_classes
+from fasttrackpy.patterns.audio_textgrid import get_interval_classes,\
+                                                get_prepared_windows,\
+                                                get_sound_slices,\
+                                                get_token_features,\
+                                                rebuild_candidates
+from fasttrackpy.processors.outputs import PartitionWriter, token_interval,\
+                                           candidates_to_dataframe
 from fasttrackpy.utils.safely import safely, filter_nones
+from fasttrackpy.utils.shared_audio import SharedAudio, attach_audio
+from fasttrackpy.utils.run_config import RunConfig, attach_config
+from fasttrackpy.utils.schedule import iter_tasks
+from fasttrackpy.utils.cache import TokenCache
+from fasttrackpy.utils.manifest import Manifest
 import re
-from collections import namedtuple
+from collections import namedtuple, deque, Counter
+from collections.abc import Callable, Iterator
 from pathlib import Path
-from tqdm import tqdm
 from functools import reduce
 from operator import add
-from joblib import Parallel, cpu_count, delayed
 import warnings
+from typing import Literal
 import os
 import sys
 
 CorpusPair = namedtuple("CorpusPair", field_names=["wav", "tg"])
 
+# The most tokens of a file a worker analyzes and
+# writes at a time, with a `PartitionWriter`.
+PART_TOKENS = 128
+
 def get_audio_files(
         corpus_path: str|Path
         )->list[Path]:
@@ -87,51 +102,117 @@ def get_target_intervals(
 
     return intervals
 
-@safely(message = "There was a problem extracting some sounds.")
-def get_sound_parts(
+@safely(message = "There was a problem preparing some sounds.")
+def get_sound_windows(
         intervals: list[SequenceInterval],
-        window_length: float
+        window_length: float,
+        shared_audio: SharedAudio,
+        min_max_formant: float = 4000,
+        max_max_formant: float = 7000,
+        nstep: int = 20,
+        pre_emphasis_from: float = 50,
+        resampler: Literal["token", "polyphase"] = "token"
 ):
     sound = pm.Sound(str(intervals[0].wav))
-    sound_parts = [
-        sound.extract_part(from_time = interval.start-(window_length/2), 
-        to_time = interval.end+(window_length/2))
-        for interval in intervals
-    ]
-
-    return sound_parts
-
-@delayed
-@safely(message = "There was a problem getting some candidate tracks.")
-def get_candidates_delayed(args_dict):
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        candidates =  CandidateTracks(**args_dict)
-    if candidates.winner.formants.shape[1] == 1:
-        warnings.warn("formant tracking error")
-    return candidates
+    prepared_windows = get_prepared_windows(
+        sound,
+        intervals,
+        window_length = window_length,
+        min_max_formant = min_max_formant,
+        max_max_formant = max_max_formant,
+        nstep = nstep,
+        pre_emphasis_from = pre_emphasis_from,
+        resampler = resampler
+    )
+    # shared only once preparing the file has worked, so a
+    # file that fails isn't left in shared memory.
+    sound_parts = get_sound_slices(
+        shared_audio.add(sound),
+        intervals,
+        window_length
+    )
+    return list(zip(sound_parts, prepared_windows))
 
 @safely(message = "There was a problem getting some candidate tracks.")
 def get_candidates(args_dict):
+    args_dict = dict(attach_audio(attach_config(args_dict)))
+    cache = args_dict.pop("cache", None)
+    if cache is not None:
+        key = cache.key(args_dict)
+        record = cache.get(key)
+        if record is not None:
+            return record
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
         candidates =  CandidateTracks(**args_dict)
     if candidates.winner.formants.shape[1] == 1:
         warnings.warn("formant tracking error")
-    return candidates
+    # only the compact record is sent back
+    record = candidates.to_record()
+    if cache is not None:
+        cache.put(key, record)
+    return record
 
-def run_candidates(arg_list, parallel:bool):
-    if parallel:
-        n_jobs = cpu_count()
-        all_candidates = Parallel(n_jobs=n_jobs)(
-            get_candidates_delayed(args_dict=arg) for arg in tqdm(arg_list)
-            )
-        return all_candidates
-    
-    all_candidates = [get_candidates(args_dict=arg) for arg in tqdm(arg_list)]
-    return all_candidates
+def write_token_chunk(chunk: dict) -> list[dict]:
+    """Analyze a chunk of a file's tokens and write their data
+    with the chunk's `PartitionWriter`, in the worker.
 
-def process_corpus(
+    Args:
+        chunk (dict): The task arguments and `TokenInterval` of each
+            token under `"tokens"`, with the `"file_name"`, the
+            chunk's `"part"` number and the `"writer"`.
+
+    Returns:
+        (list[dict]): The files written.
+    """
+    writer = chunk["writer"]
+    all_candidates = []
+    for args_dict, interval in chunk["tokens"]:
+        record = get_candidates(args_dict)
+        if record is None:
+            continue
+        cand = rebuild_candidates(record, args_dict)
+        cand.interval = interval
+        cand.file_name = chunk["file_name"]
+        all_candidates.append(cand)
+    if not all_candidates:
+        return []
+    # one data frame for the chunk
+    df = candidates_to_dataframe(
+        all_candidates,
+        which = writer.which,
+        output = writer.output
+    )
+    return writer.write([df], chunk["part"])
+
+def get_chunk_features(chunk: dict):
+    """The cost features of a chunk of tokens, for scheduling."""
+    return sum(
+        get_token_features(args_dict)
+        for args_dict, _ in chunk["tokens"]
+    )
+
+def iter_candidates(
+        arg_list,
+        parallel:bool,
+        run_config: RunConfig = None,
+        fun: Callable = get_candidates,
+        task_features: Callable = get_token_features,
+        **kwargs
+    ):
+    return iter_tasks(
+        fun,
+        arg_list,
+        task_features,
+        parallel,
+        run_config,
+        **kwargs
+    )
+
+def run_candidates(arg_list, parallel:bool, run_config: RunConfig = None, **kwargs):
+    return list(iter_candidates(arg_list, parallel, run_config, **kwargs))
+
+def iter_corpus(
         corpus_path: str|Path,
         entry_classes: list = ["Word", "Phone"],
         target_tier: str = "Phone",
@@ -147,9 +228,23 @@ def process_corpus(
         smoother: Smoother = Smoother(),
         loss_fun: Loss = Loss(),
         agg_fun: Agg = Agg(),
-        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = []  
-)->list[CandidateTracks]:
-    """Given a directory to a corpus of audio/textgrid pairs, return candidates for all vowels.
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+        engine: Literal["praat", "numba"] = "praat",
+        output: Literal["formants", "param", "log_param"] | None = "formants",
+        keep_candidates: Literal["all", "winner"] = "all",
+        search: Literal["grid", "coarse_to_fine", "golden"] = "grid",
+        resampler: Literal["token", "polyphase"] = "token",
+        n_jobs: int = None,
+        backend: Literal["loky", "multiprocessing", "threading", "serial"] = "loky",
+        batch_size: int|Literal["auto"] = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None,
+        cache: TokenCache = None,
+        manifest: Manifest = None,
+        writer: PartitionWriter = None
+)->Iterator[CandidateTracks|dict]:
+    """Given a directory to a corpus of audio/textgrid pairs, yield candidates
+    for all vowels as they are done.
 
     Args:
         corpus_path (str | Path): A path to the corpus
@@ -181,13 +276,67 @@ def process_corpus(
         agg_fun (Agg, optional): The loss aggregation function to use. 
             Defaults to Agg().
         heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
-            A list of formant tracking heuristics to use.            
+            A list of formant tracking heuristics to use.
+        engine (Literal["praat", "numba"], optional): The formant
+            analysis engine. Defaults to "praat".
+        output (Literal["formants", "param", "log_param"] | None, optional):
+            The data that will be output, used to skip computing
+            what it doesn't need. Defaults to "formants".
+        keep_candidates (Literal["all", "winner"], optional): Whether to keep
+            all candidate tracks, or only the winner. Defaults to "all".
+        search (Literal["grid", "coarse_to_fine", "golden"], optional):
+            How to search the max formants. See
+            [](`~fasttrackpy.CandidateTracks`). Defaults to "grid".
+        resampler (Literal["token", "polyphase"], optional):
+            How to resample the audio for each max formant. `"token"`
+            resamples each token in its formant analysis. `"polyphase"`
+            resamples and pre-emphasizes each file once for each max formant
+            before cutting out the tokens, with a polyphase resampler whose
+            formants approximate the token resampling's. See
+            [](`~fasttrackpy.processors.prepare.prepare_windows`).
+            Defaults to "token".
+        n_jobs (int, optional): The number of workers. None uses every
+            core, and negative values count back from it, as in joblib.
+            Defaults to None.
+        backend (Literal["loky", "multiprocessing", "threading", "serial"], optional):
+            How to run the workers. `"serial"` processes everything in this
+            process. Defaults to "loky".
+        batch_size (int|Literal["auto"], optional): The number of tokens
+            sent to a worker at a time. Defaults to "auto".
+        blas_threads (int, optional): The number of threads numpy and scipy's
+            BLAS and OpenMP libraries can use in each loky worker. If None, the
+            cores divided by the workers. Defaults to None.
+        polars_threads (int, optional): The number of threads polars can use
+            in each loky worker. If None, the cores divided by the workers.
+            Defaults to None.
+        cache (TokenCache, optional): A
+            [](`~fasttrackpy.utils.cache.TokenCache`) of analyzed tokens.
+            Tokens it has are read from it instead of being analyzed,
+            and the others are added to it. Defaults to None.
+        manifest (Manifest, optional): A
+            [](`~fasttrackpy.utils.manifest.Manifest`) to record each file
+            in once all of its tokens have been handled, or once it is
+            found to have no tokens. Files it already has are skipped.
+            Defaults to None.
+        writer (PartitionWriter, optional): A
+            [](`~fasttrackpy.processors.outputs.PartitionWriter`). If
+            given, the workers write the data of each chunk of up to
+            `PART_TOKENS` of a file's tokens to partitions themselves,
+            and the files they wrote are yielded instead of the candidates.
+            It can't be used with a manifest. Defaults to None.
 
-    Returns:
-        (list[CandidateTracks]): A list of candidate tracks.
+    Yields:
+        (CandidateTracks|dict): The candidate tracks of each vowel, or
+            with a `writer`, the `path` and number of `rows` of each
+            file the workers wrote.
     """
+    if writer is not None and manifest is not None:
+        raise ValueError("A manifest can't be kept for partitions workers write.")
+
     all_audio = get_audio_files(corpus_path=corpus_path)
     corpus = get_corpus(all_audio)
+    if manifest is not None:
+        corpus = [pair for pair in corpus if not manifest.is_done(pair)]
     entry_classes = get_interval_classes(entry_classes)
     all_tg = [read_and_associate_tg(pair, entry_classes=entry_classes)
               for pair in corpus]
@@ -200,43 +349,275 @@ def process_corpus(
                              )
             for tiers in all_tiers
         ]
-    all_candidates = []
-    for intervals in all_intervals:
-        sound_parts = get_sound_parts(intervals, window_length)
-        sound_parts, intervals = filter_nones(sound_parts, [sound_parts, intervals])
-
-        arg_list = [
-            {
-                "samples": x.values,
-                "sampling_frequency": x.sampling_frequency,
-                "xmin": x.xmin,
-                #"interval": interval,
-                "min_max_formant": min_max_formant,
-                "max_max_formant": max_max_formant,
-                "nstep": nstep,
-                "n_formants": n_formants,
-                "window_length": window_length,
-                "time_step" : time_step,
-                "pre_emphasis_from": pre_emphasis_from,
-                "smoother": smoother,
-                "loss_fun":loss_fun,
-                "agg_fun": agg_fun,
-                "heuristics": heuristics
-            } for x, interval in zip(sound_parts, intervals)
-        ]
+    # all tokens of all files go in one queue, so the
+    # workers don't idle between files. The intervals and
+    # task arguments stay in this process, queued in the same
+    # order as the tokens, to rebuild the workers' records
+    # into candidates with their intervals.
+    queued_tokens = deque()
+    # each file's samples are shared with the workers
+    # until all of its tokens are done.
+    shared_audio = SharedAudio()
+    remaining = Counter()
+    # the files and token counts of the shared samples
+    pairs = {}
+    # the settings every task shares
+    run_config = RunConfig(
+        min_max_formant = min_max_formant,
+        max_max_formant = max_max_formant,
+        nstep = nstep,
+        n_formants = n_formants,
+        window_length = window_length,
+        time_step = time_step,
+        pre_emphasis_from = pre_emphasis_from,
+        smoother = smoother,
+        loss_fun = loss_fun,
+        agg_fun = agg_fun,
+        heuristics = heuristics,
+        engine = engine,
+        output = output,
+        keep_candidates = keep_candidates,
+        search = search,
+        cache = cache
+    )
+
+    def corpus_args():
+        for pair, intervals in zip(corpus, all_intervals):
+            if len(intervals) < 1:
+                if manifest is not None:
+                    manifest.skip(pair)
+                continue
+            sound_windows = get_sound_windows(
+                intervals,
+                window_length,
+                shared_audio,
+                min_max_formant = min_max_formant,
+                max_max_formant = max_max_formant,
+                nstep = nstep,
+                pre_emphasis_from = pre_emphasis_from,
+                resampler = resampler
+            )
+            if sound_windows is None:
+                if manifest is not None:
+                    manifest.skip(pair, failed = True)
+                continue
+            sound_windows, intervals = filter_nones(sound_windows, [sound_windows, intervals])
+
+            if len(sound_windows) < 1:
+                if manifest is not None:
+                    manifest.skip(pair, failed = True)
+                continue
+            # counted before any are queued, so the file isn't
+            # removed while some of its tokens are still to come.
+            remaining[sound_windows[0][0].path] += len(sound_windows)
+            pairs[sound_windows[0][0].path] = (pair, len(sound_windows))
+
+            args_dicts = [
+                {
+                    "config": run_config.id,
+                    "audio": x,
+                    #"interval": interval,
+                    "prepared": prepared
+                }
+                for x, prepared in sound_windows
+            ]
+            if writer is not None:
+                tokens = list(zip(
+                    args_dicts,
+                    [token_interval(x) for x in intervals]
+                ))
+                for part, start in enumerate(range(0, len(tokens), PART_TOKENS)):
+                    chunk = {
+                        "file_name": Path(str(pair.wav)).stem,
+                        "part": part,
+                        "writer": writer,
+                        "tokens": tokens[start:start + PART_TOKENS]
+                    }
+                    queued_tokens.append((None, chunk))
+                    yield chunk
+                continue
+
+            for args_dict, interval in zip(args_dicts, intervals):
+                queued_tokens.append((interval, args_dict))
+                yield args_dict
 
-        windows_3_12 = os.name != "posix" and \
-                sys.version_info.major == 3 and \
-                sys.version_info.minor == 12
+    windows_3_12 = os.name != "posix" and \
+            sys.version_info.major == 3 and \
+            sys.version_info.minor == 12
 
-        candidate_list = run_candidates(
-            arg_list, not windows_3_12
+    with shared_audio, run_config:
+        all_candidates = iter_candidates(
+            corpus_args(), not windows_3_12, run_config,
+            n_jobs = n_jobs,
+            backend = backend,
+            batch_size = batch_size,
+            blas_threads = blas_threads,
+            polars_threads = polars_threads,
+            fun = get_candidates if writer is None else write_token_chunk,
+            task_features = get_token_features if writer is None \
+                else get_chunk_features
         )
 
-        candidate_list, intervals = filter_nones(candidate_list, [candidate_list, intervals])
-        for cand, interval in zip(candidate_list, intervals):
-            cand.interval = interval
-            cand.file_name = Path(str(interval.wav)).stem
-        all_candidates += candidate_list
-    
-    return all_candidates
\ No newline at end of file
+        for result in all_candidates:
+            interval, task = queued_tokens.popleft()
+            cand = None
+            if writer is None:
+                args_dicts = [task]
+                # rebuilt while the file's samples are shared
+                if result is not None:
+                    cand = rebuild_candidates(result, task)
+            else:
+                args_dicts = [args_dict for args_dict, _ in task["tokens"]]
+
+            audio_slice = args_dicts[0]["audio"]
+            remaining[audio_slice.path] -= len(args_dicts)
+            finished = None
+            if remaining[audio_slice.path] == 0:
+                shared_audio.remove(audio_slice)
+                finished = pairs.pop(audio_slice.path)
+
+            if writer is not None:
+                yield from result
+            elif cand is not None:
+                cand.interval = interval
+                cand.file_name = Path(str(interval.wav)).stem
+                yield cand
+            # the caller has handled the file's last token
+            # by the time the generator resumes
+            if finished and manifest is not None:
+                manifest.finish(*finished)
+
+def process_corpus(
+        corpus_path: str|Path,
+        entry_classes: list = ["Word", "Phone"],
+        target_tier: str = "Phone",
+        target_labels: str = "[AEIOU]",
+        min_duration: float = 0.05,
+        min_max_formant:float = 4000,
+        max_max_formant:float = 7000,
+        nstep:int = 20,
+        n_formants: int = 4,
+        window_length: float = 0.025,
+        time_step: float = 0.002,
+        pre_emphasis_from: float = 50,
+        smoother: Smoother = Smoother(),
+        loss_fun: Loss = Loss(),
+        agg_fun: Agg = Agg(),
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+        engine: Literal["praat", "numba"] = "praat",
+        output: Literal["formants", "param", "log_param"] | None = "formants",
+        keep_candidates: Literal["all", "winner"] = "all",
+        search: Literal["grid", "coarse_to_fine", "golden"] = "grid",
+        resampler: Literal["token", "polyphase"] = "token",
+        n_jobs: int = None,
+        backend: Literal["loky", "multiprocessing", "threading", "serial"] = "loky",
+        batch_size: int|Literal["auto"] = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None,
+        cache: TokenCache = None
+)->list[CandidateTracks]:
+    """Given a directory to a corpus of audio/textgrid pairs, return candidates for all vowels.
+    To handle each vowel's candidates as they are done, without
+    keeping them all in memory, use
+    [](`~fasttrackpy.patterns.corpus.iter_corpus`).
+
+    Args:
+        corpus_path (str | Path): A path to the corpus
+        entry_classes (list, optional): Entry classes for the textgrid tiers. 
+            Defaults to ["Word", "Phone"].
+        target_tier (str, optional): The tier to target. 
+            Defaults to "Phone".
+        target_labels (str, optional): A regex that will match intervals to target. 
+            Defaults to "[AEIOU]".
+        min_duration (float, optional): Minimum vowel duration to mention.
+            Defaults to 0.05.
+        min_max_formant (float, optional): The lowest max-formant value to try. 
+            Defaults to 4000.
+        max_max_formant (float, optional): The highest max formant to try. 
+            Defaults to 7000.
+        nstep (int, optional): The number of steps from the min to the max max formant. 
+            Defaults to 20.
+        n_formants (int, optional): The number of formants to track. Defaults to 4.
+        window_length (float, optional): Window length of the formant analysis. 
+            Defaults to 0.025.
+        time_step (float, optional): Time step of the formant analyusis window. 
+            Defaults to 0.002.
+        pre_emphasis_from (float, optional): Pre-emphasis threshold. 
+            Defaults to 50.
+        smoother (Smoother, optional): The smoother method to use. 
+            Defaults to `Smoother()`.
+        loss_fun (Loss, optional): The loss function to use. 
+            Defaults to Loss().
+        agg_fun (Agg, optional): The loss aggregation function to use. 
+            Defaults to Agg().
+        heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
+            A list of formant tracking heuristics to use.
+        engine (Literal["praat", "numba"], optional): The formant
+            analysis engine. Defaults to "praat".
+        output (Literal["formants", "param", "log_param"] | None, optional):
+            The data that will be output, used to skip computing
+            what it doesn't need. Defaults to "formants".
+        keep_candidates (Literal["all", "winner"], optional): Whether to keep
+            all candidate tracks, or only the winner. Defaults to "all".
+        search (Literal["grid", "coarse_to_fine", "golden"], optional):
+            How to search the max formants. See
+            [](`~fasttrackpy.CandidateTracks`). Defaults to "grid".
+        resampler (Literal["token", "polyphase"], optional):
+            How to resample the audio for each max formant. `"token"`
+            resamples each token in its formant analysis. `"polyphase"`
+            resamples and pre-emphasizes each file once for each max formant
+            before cutting out the tokens, with a polyphase resampler whose
+            formants approximate the token resampling's. See
+            [](`~fasttrackpy.processors.prepare.prepare_windows`).
+            Defaults to "token".
+        n_jobs (int, optional): The number of workers. None uses every
+            core, and negative values count back from it, as in joblib.
+            Defaults to None.
+        backend (Literal["loky", "multiprocessing", "threading", "serial"], optional):
+            How to run the workers. `"serial"` processes everything in this
+            process. Defaults to "loky".
+        batch_size (int|Literal["auto"], optional): The number of tokens
+            sent to a worker at a time. Defaults to "auto".
+        blas_threads (int, optional): The number of threads numpy and scipy's
+            BLAS and OpenMP libraries can use in each loky worker. If None, the
+            cores divided by the workers. Defaults to None.
+        polars_threads (int, optional): The number of threads polars can use
+            in each loky worker. If None, the cores divided by the workers.
+            Defaults to None.
+        cache (TokenCache, optional): A
+            [](`~fasttrackpy.utils.cache.TokenCache`) of analyzed tokens.
+            Tokens it has are read from it instead of being analyzed,
+            and the others are added to it. Defaults to None.
+
+    Returns:
+        (list[CandidateTracks]): A list of candidate tracks.
+    """
+    return list(iter_corpus(
+        corpus_path = corpus_path,
+        entry_classes = entry_classes,
+        target_tier = target_tier,
+        target_labels = target_labels,
+        min_duration = min_duration,
+        min_max_formant = min_max_formant,
+        max_max_formant = max_max_formant,
+        nstep = nstep,
+        n_formants = n_formants,
+        window_length = window_length,
+        time_step = time_step,
+        pre_emphasis_from = pre_emphasis_from,
+        smoother = smoother,
+        loss_fun = loss_fun,
+        agg_fun = agg_fun,
+        heuristics = heuristics,
+        engine = engine,
+        output = output,
+        keep_candidates = keep_candidates,
+        search = search,
+        resampler = resampler,
+        n_jobs = n_jobs,
+        backend = backend,
+        batch_size = batch_size,
+        blas_threads = blas_threads,
+        polars_threads = polars_threads,
+        cache = cache
+    ))
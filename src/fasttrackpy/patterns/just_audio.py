@@ -1,7 +1,7 @@
 import warnings
 from pathlib import Path
-from typing import Union
-from collections.abc import Callable
+from typing import Union, Literal
+from collections.abc import Callable, Iterator
 import parselmouth as pm
 from fasttrackpy import CandidateTracks,\
                         Smoother,\
@@ -9,12 +9,13 @@ from fasttrackpy import CandidateTracks,\
                         Agg
 from fasttrackpy.processors.heuristic import MinMaxHeuristic, SpacingHeuristic
 from fasttrackpy.utils.safely import safely, filter_nones
+from fasttrackpy.utils.run_config import RunConfig, attach_config
+from fasttrackpy.utils.schedule import CostModel, iter_tasks
 
 import filetype
 
-from tqdm import tqdm
-from joblib import Parallel, cpu_count, delayed
 import os
+import wave
 import sys
 import logging
 logging.basicConfig(level=logging.INFO)
@@ -49,7 +50,12 @@ def process_audio_file(
         smoother: Smoother = Smoother(),
         loss_fun: Loss = Loss(),
         agg_fun: Agg = Agg(),
-        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = []
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+        engine: Literal["praat", "numba"] = "praat",
+        output: Literal["formants", "param", "log_param"] | None = "formants",
+        keep_candidates: Literal["all", "winner"] = "all",
+        search: Literal["grid", "coarse_to_fine", "golden"] = "grid",
+        n_jobs: int = 1
 )->CandidateTracks:
     """Given the path to a single audio file, return a candidates track object.
 
@@ -78,7 +84,19 @@ def process_audio_file(
         agg_fun (Agg, optional): The loss aggregation function to use. 
             Defaults to Agg().
         heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
-            A list of formant tracking heuristics to use.            
+            A list of formant tracking heuristics to use.
+        engine (Literal["praat", "numba"], optional): The formant
+            analysis engine. Defaults to "praat".
+        output (Literal["formants", "param", "log_param"] | None, optional):
+            The data that will be output, used to skip computing
+            what it doesn't need. Defaults to "formants".
+        keep_candidates (Literal["all", "winner"], optional): Whether to keep
+            all candidate tracks, or only the winner. Defaults to "all".
+        search (Literal["grid", "coarse_to_fine", "golden"], optional):
+            How to search the max formants. See
+            [](`~fasttrackpy.CandidateTracks`). Defaults to "grid".
+        n_jobs (int, optional): The number of workers to split the
+            candidates between. Defaults to 1.
 
     Returns:
         (CandidateTracks): A `CandidateTracks` object to use.
@@ -105,32 +123,61 @@ def process_audio_file(
         smoother=smoother,
         loss_fun=loss_fun,
         agg_fun=agg_fun,
-        heuristics=heuristics
+        heuristics=heuristics,
+        engine=engine,
+        output=output,
+        keep_candidates=keep_candidates,
+        search=search,
+        n_jobs=n_jobs
     )
     candidates.file_name = Path(str(path)).name
     return candidates
 
-@delayed
-@safely(message = "There was a problem processing an audio file.")
-def get_candidates_delayed(args_dict):
-    return process_audio_file(**args_dict)
-
 @safely(message = "There was a problem processing an audio file.")
 def get_candidates(args_dict):
-    return process_audio_file(**args_dict)
-
-def run_candidates(arg_list, parallel:bool):
-    if parallel:
-        n_jobs = cpu_count()
-        all_candidates = Parallel(n_jobs=n_jobs)(
-            get_candidates_delayed(args_dict=arg) for arg in tqdm(arg_list)
-            )
-        return all_candidates
-    
-    all_candidates = [get_candidates(args_dict=arg) for arg in tqdm(arg_list)]
-    return all_candidates
+    return process_audio_file(**attach_config(args_dict))
 
-def process_directory(
+def get_file_features(args_dict: dict):
+    """The cost features of an audio file's task, for scheduling.
+    The duration is read from the header of wav files, and guessed
+    from the size of others, as 16 bit samples at 44.1 kHz.
+    """
+    args_dict = attach_config(args_dict)
+    path = str(args_dict["path"])
+    try:
+        with wave.open(path) as w:
+            sampling_frequency = w.getframerate()
+            duration = w.getnframes() / sampling_frequency
+    except (wave.Error, EOFError, OSError):
+        sampling_frequency = 44100
+        duration = os.path.getsize(path) / (2 * sampling_frequency)
+    return CostModel.features(
+        duration = duration,
+        sampling_frequency = sampling_frequency,
+        nstep = args_dict.get("nstep", 20),
+        time_step = args_dict.get("time_step", 0.002)
+    )
+
+def iter_candidates(
+        arg_list,
+        parallel:bool,
+        run_config: RunConfig = None,
+        **kwargs
+    ):
+    return iter_tasks(
+        get_candidates,
+        arg_list,
+        get_file_features,
+        parallel,
+        run_config,
+        split_candidates = True,
+        **kwargs
+    )
+
+def run_candidates(arg_list, parallel:bool, run_config: RunConfig = None, **kwargs):
+    return list(iter_candidates(arg_list, parallel, run_config, **kwargs))
+
+def iter_directory(
         path: str|Path,
         min_max_formant:float = 4000,
         max_max_formant:float = 7000,
@@ -142,9 +189,19 @@ def process_directory(
         smoother: Smoother = Smoother(),
         loss_fun: Loss = Loss(),
         agg_fun: Agg = Agg(),
-        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = []
-)->list[CandidateTracks]:
-    """Given a path to a directoy of audio files, process them all.
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+        engine: Literal["praat", "numba"] = "praat",
+        output: Literal["formants", "param", "log_param"] | None = "formants",
+        keep_candidates: Literal["all", "winner"] = "all",
+        search: Literal["grid", "coarse_to_fine", "golden"] = "grid",
+        n_jobs: int = None,
+        backend: Literal["loky", "multiprocessing", "threading", "serial"] = "loky",
+        batch_size: int|Literal["auto"] = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None
+)->Iterator[CandidateTracks]:
+    """Given a path to a directoy of audio files, process them all,
+    yielding each file's candidates as they are done.
 
     Args:
         path (str|Path): Path to the directory to process.
@@ -168,10 +225,34 @@ def process_directory(
         agg_fun (Agg, optional): The loss aggregation function to use. 
             Defaults to Agg().
         heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
-            A list of formant tracking heuristics to use.            
+            A list of formant tracking heuristics to use.
+        engine (Literal["praat", "numba"], optional): The formant
+            analysis engine. Defaults to "praat".
+        output (Literal["formants", "param", "log_param"] | None, optional):
+            The data that will be output, used to skip computing
+            what it doesn't need. Defaults to "formants".
+        keep_candidates (Literal["all", "winner"], optional): Whether to keep
+            all candidate tracks, or only the winner. Defaults to "all".
+        search (Literal["grid", "coarse_to_fine", "golden"], optional):
+            How to search the max formants. See
+            [](`~fasttrackpy.CandidateTracks`). Defaults to "grid".
+        n_jobs (int, optional): The number of workers. None uses every
+            core, and negative values count back from it, as in joblib.
+            Defaults to None.
+        backend (Literal["loky", "multiprocessing", "threading", "serial"], optional):
+            How to run the workers. `"serial"` processes everything in this
+            process. Defaults to "loky".
+        batch_size (int|Literal["auto"], optional): The number of files
+            sent to a worker at a time. Defaults to "auto".
+        blas_threads (int, optional): The number of threads numpy and scipy's
+            BLAS and OpenMP libraries can use in each loky worker. If None, the
+            cores divided by the workers. Defaults to None.
+        polars_threads (int, optional): The number of threads polars can use
+            in each loky worker. If None, the cores divided by the workers.
+            Defaults to None.
 
-    Returns:
-        (list[CandidateTracks]): A list of `CandidateTracks` objects.
+    Yields:
+        (CandidateTracks): A `CandidateTracks` object for each audio file.
     """
     if not isinstance(path, Path) and isinstance(path, str):
         path = Path(path)
@@ -179,20 +260,28 @@ def process_directory(
     all_files = list(path.glob("*"))
     all_files = [x for x in all_files if x.is_file()]
     all_audio = [x for x in all_files if is_audio(x)]
+    # the settings every file shares
+    run_config = RunConfig(
+        min_max_formant = min_max_formant,
+        max_max_formant = max_max_formant,
+        nstep = nstep,
+        n_formants = n_formants,
+        window_length = window_length,
+        time_step = time_step,
+        pre_emphasis_from = pre_emphasis_from,
+        smoother = smoother,
+        loss_fun = loss_fun,
+        agg_fun = agg_fun,
+        heuristics = heuristics,
+        engine = engine,
+        output = output,
+        keep_candidates = keep_candidates,
+        search = search
+    )
+
     arg_list = [
-            {"path": x,
-            "min_max_formant": min_max_formant,
-            "max_max_formant":max_max_formant,
-            "nstep": nstep,
-            "n_formants": n_formants,
-            "window_length":window_length,
-            "time_step":time_step,
-            "pre_emphasis_from":pre_emphasis_from,
-            "smoother":smoother,
-            "loss_fun":loss_fun,
-            "agg_fun":agg_fun,
-            "heuristics":heuristics
-            }
+            {"config": run_config.id,
+            "path": x}
             for x in all_audio
     ]
 
@@ -200,14 +289,121 @@ def process_directory(
             sys.version_info.major == 3 and \
             sys.version_info.minor == 12
 
-    all_candidates = run_candidates(
-        arg_list, not windows_3_12
-    )
+    with run_config:
+        all_candidates = iter_candidates(
+            arg_list, not windows_3_12, run_config,
+            n_jobs = n_jobs,
+            backend = backend,
+            batch_size = batch_size,
+            blas_threads = blas_threads,
+            polars_threads = polars_threads
+        )
 
-    all_candidates, all_audio = filter_nones(all_candidates, [all_candidates, all_audio])
+        for x, path in zip(all_candidates, all_audio):
+            if x is None:
+                continue
+            x.file_name = Path(str(path)).name
+            yield x
 
-    for x, path in zip(all_candidates, all_audio):
-        x.file_name = Path(str(path)).name
+def process_directory(
+        path: str|Path,
+        min_max_formant:float = 4000,
+        max_max_formant:float = 7000,
+        nstep:int = 20,
+        n_formants: int = 4,
+        window_length: float = 0.05,
+        time_step: float = 0.002,
+        pre_emphasis_from: float = 50,
+        smoother: Smoother = Smoother(),
+        loss_fun: Loss = Loss(),
+        agg_fun: Agg = Agg(),
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+        engine: Literal["praat", "numba"] = "praat",
+        output: Literal["formants", "param", "log_param"] | None = "formants",
+        keep_candidates: Literal["all", "winner"] = "all",
+        search: Literal["grid", "coarse_to_fine", "golden"] = "grid",
+        n_jobs: int = None,
+        backend: Literal["loky", "multiprocessing", "threading", "serial"] = "loky",
+        batch_size: int|Literal["auto"] = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None
+)->list[CandidateTracks]:
+    """Given a path to a directoy of audio files, process them all.
+    To handle each file's candidates as they are done, without
+    keeping them all in memory, use
+    [](`~fasttrackpy.patterns.just_audio.iter_directory`).
 
-    return all_candidates
+    Args:
+        path (str|Path): Path to the directory to process.
+        min_max_formant (float, optional): The lowest max-formant value to try. 
+            Defaults to 4000.
+        max_max_formant (float, optional): The highest max formant to try. 
+            Defaults to 7000.
+        nstep (int, optional): The number of steps from the min to the max max formant. 
+            Defaults to 20.
+        n_formants (int, optional): The number of formants to track. Defaults to 4.
+        window_length (float, optional): Window length of the formant analysis. 
+            Defaults to 0.025.
+        time_step (float, optional): Time step of the formant analyusis window. 
+            Defaults to 0.002.
+        pre_emphasis_from (float, optional): Pre-emphasis threshold. 
+            Defaults to 50.
+        smoother (Smoother, optional): The smoother method to use. 
+            Defaults to `Smoother()`.
+        loss_fun (Loss, optional): The loss function to use. 
+            Defaults to Loss().
+        agg_fun (Agg, optional): The loss aggregation function to use. 
+            Defaults to Agg().
+        heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
+            A list of formant tracking heuristics to use.
+        engine (Literal["praat", "numba"], optional): The formant
+            analysis engine. Defaults to "praat".
+        output (Literal["formants", "param", "log_param"] | None, optional):
+            The data that will be output, used to skip computing
+            what it doesn't need. Defaults to "formants".
+        keep_candidates (Literal["all", "winner"], optional): Whether to keep
+            all candidate tracks, or only the winner. Defaults to "all".
+        search (Literal["grid", "coarse_to_fine", "golden"], optional):
+            How to search the max formants. See
+            [](`~fasttrackpy.CandidateTracks`). Defaults to "grid".
+        n_jobs (int, optional): The number of workers. None uses every
+            core, and negative values count back from it, as in joblib.
+            Defaults to None.
+        backend (Literal["loky", "multiprocessing", "threading", "serial"], optional):
+            How to run the workers. `"serial"` processes everything in this
+            process. Defaults to "loky".
+        batch_size (int|Literal["auto"], optional): The number of files
+            sent to a worker at a time. Defaults to "auto".
+        blas_threads (int, optional): The number of threads numpy and scipy's
+            BLAS and OpenMP libraries can use in each loky worker. If None, the
+            cores divided by the workers. Defaults to None.
+        polars_threads (int, optional): The number of threads polars can use
+            in each loky worker. If None, the cores divided by the workers.
+            Defaults to None.
 
+    Returns:
+        (list[CandidateTracks]): A list of `CandidateTracks` objects.
+    """
+    return list(iter_directory(
+        path = path,
+        min_max_formant = min_max_formant,
+        max_max_formant = max_max_formant,
+        nstep = nstep,
+        n_formants = n_formants,
+        window_length = window_length,
+        time_step = time_step,
+        pre_emphasis_from = pre_emphasis_from,
+        smoother = smoother,
+        loss_fun = loss_fun,
+        agg_fun = agg_fun,
+        heuristics = heuristics,
+        engine = engine,
+        output = output,
+        keep_candidates = keep_candidates,
+        search = search,
+        n_jobs = n_jobs,
+        backend = backend,
+        batch_size = batch_size,
+        blas_threads = blas_threads,
+        polars_threads = polars_threads
+    ))
@@ -7,6 +7,9 @@ class Agg:
 
     Args:
         method (Union[str, Callable], optional): _description_. Defaults to "agg_sum".
+            A custom aggregation can opt into batched scoring by having a
+            `batch` attribute, a function that takes the stacked errors of
+            every candidate and the same arguments as the aggregation.
     """
 
     def __init__(
@@ -15,6 +18,7 @@ class Agg:
         **kwargs
     ):
         self.method = self._get_method(method)
+        self.batch_method = getattr(self.method, "batch", None)
         self.method_args = kwargs
     
     def _get_method(
@@ -32,10 +36,46 @@ class Agg:
     ):
         return self.method(error, **self.method_args)
 
+    def aggregate_batch(
+        self,
+        error: np.ndarray
+    ) -> np.ndarray:
+        """Aggregate the errors of every candidate at once
+
+        If the aggregation function has no batched version, it is
+        applied to one candidate at a time.
+
+        Args:
+            error (np.ndarray): The errors of each candidate, stacked
+                along the first axis.
+
+        Returns:
+            (np.ndarray): The aggregated error of each candidate.
+        """
+        if self.batch_method is not None:
+            return self.batch_method(error, **self.method_args)
+
+        return np.array([
+            self.method(x, **self.method_args)
+            for x in error
+        ])
+
 def agg_sum(error, axis = 0):
     """
     Sum the error
     """
 
     agg_error = np.sum(error, axis = axis)
-    return agg_error
\ No newline at end of file
+    return agg_error
+
+def agg_sum_batch(error, axis = 0):
+    """
+    Sum the error of every candidate, where `axis`
+    counts the axes of one candidate.
+    """
+    if axis >= 0:
+        axis = axis + 1
+    agg_error = np.sum(error, axis = axis)
+    return agg_error
+
+agg_sum.batch = agg_sum_batch
@@ -0,0 +1,408 @@
+import numpy as np
+import polars as pl
+from pathlib import Path
+import json
+import os
+
+from fasttrackpy.tracks import CandidateTracks, CandidateRecord, RECORD_FIELDS
+from fasttrackpy.processors.smoothers import Smoother
+from fasttrackpy.processors.losses import Loss
+from fasttrackpy.processors.aggs import Agg
+from fasttrackpy.processors.heuristic import MinMaxHeuristic, SpacingHeuristic
+from fasttrackpy.processors.profile import ComputeProfile
+
+ARCHIVE_FORMAT = "fasttrackpy-archive"
+ARCHIVE_VERSION = 1
+
+INDEX_FILE = "archive.json"
+METADATA_FILE = "metadata.arrow"
+
+# The fields of a CandidateRecord that are arrays, and are
+# stored in the archive's ragged array files. The others are
+# columns of its metadata table.
+ARRAY_FIELDS = [
+    "kept",
+    "unsmoothed",
+    "n_frames",
+    "time_domains",
+    "formants",
+    "bandwidths",
+    "smoothed_formants",
+    "parameters",
+    "log_parameters",
+    "bandwidth_parameters",
+    "smooth_errors",
+    "heuristic_errors",
+    "total_errors"
+]
+
+SCALAR_FIELDS = [
+    field for field in RECORD_FIELDS
+    if field not in ARRAY_FIELDS and field != "profile"
+]
+
+PROFILE_COLUMNS = {
+    "profile_log_formants": "log_formants",
+    "profile_bandwidths": "bandwidths"
+}
+
+class ArchiveWriter:
+    """
+    Write candidate tracks to an archive, as they come in.
+
+    An archive is a directory with
+
+    - a raw binary file for each array of the candidates'
+      records (their formants, smooths, parameters, errors and
+      so on), which holds that array of every token one after
+      the other,
+    - an offset table and a shape table for each array, with
+      where each token's array starts in the file and its shape,
+    - a metadata table, `metadata.arrow`, with a row of settings
+      and file name, id, group and label for each token,
+    - an index, `archive.json`, with the format version and the
+      dtypes of the arrays, written when the archive is closed.
+
+    The arrays can be memory mapped, so that
+    [](`~fasttrackpy.processors.archive.CandidateArchive`) reads
+    a token without reading the rest of the archive.
+
+    Args:
+        path (str | Path): The archive directory. It is made if it
+            doesn't exist, and an archive that is there is replaced.
+        samples (bool, optional): Whether to also archive the
+            tokens' samples, which plots of their spectrograms need.
+            Defaults to False.
+
+    Attributes:
+        path (Path): The archive directory.
+        n_tokens (int): The number of tokens written so far.
+    """
+    def __init__(
+            self,
+            path: str|Path,
+            samples: bool = False
+        ):
+        self.path = Path(path)
+        self.samples = samples
+        self.n_tokens = 0
+        self.path.mkdir(parents = True, exist_ok = True)
+        # an archive without an index isn't read, so one that
+        # is being replaced isn't read half written.
+        self.path.joinpath(INDEX_FILE).unlink(missing_ok = True)
+
+        self._fields = ARRAY_FIELDS + (["samples"] if samples else [])
+        self._files = {
+            field: self.path.joinpath(f"{field}.bin").open("wb")
+            for field in self._fields
+        }
+        self._dtypes = {}
+        self._offsets = {field: [0] for field in self._fields}
+        self._shapes = {field: [] for field in self._fields}
+        self._rows = []
+
+    def write(self, candidates: CandidateTracks|CandidateRecord):
+        """Add a token to the archive.
+
+        Args:
+            candidates (CandidateTracks | CandidateRecord): The token's
+                candidate tracks, or their record.
+        """
+        if isinstance(candidates, CandidateRecord):
+            if self.samples:
+                raise ValueError(
+                    "Samples can only be archived from CandidateTracks"
+                )
+            record = candidates
+            values = record._asdict()
+        else:
+            record = candidates.to_record()
+            values = record._asdict()
+            if self.samples:
+                values["samples"] = candidates.samples
+
+        for field in self._fields:
+            self._write_array(field, values[field])
+
+        row = {field: values[field] for field in SCALAR_FIELDS}
+        for column, attribute in PROFILE_COLUMNS.items():
+            row[column] = getattr(record.profile, attribute)
+        self._rows.append(row)
+        self.n_tokens += 1
+
+    def _write_array(self, field: str, value):
+        offsets = self._offsets[field]
+        if value is None:
+            offsets.append(offsets[-1])
+            self._shapes[field].append(None)
+            return
+        value = np.ascontiguousarray(
+            value,
+            dtype = self._dtypes.setdefault(field, np.asarray(value).dtype)
+        )
+        value.tofile(self._files[field])
+        offsets.append(offsets[-1] + value.size)
+        self._shapes[field].append(value.shape)
+
+    def close(self):
+        """Write the offsets, shapes, metadata and index
+        of the archive, and close its files."""
+        arrays = {}
+        for field, file in self._files.items():
+            file.close()
+            if field not in self._dtypes:
+                # never set, like log parameters that weren't computed
+                self.path.joinpath(f"{field}.bin").unlink()
+                continue
+            ndim = max(len(x) for x in self._shapes[field] if x is not None)
+            shapes = np.array([
+                (-1,) * ndim if shape is None else shape
+                for shape in self._shapes[field]
+            ], dtype = np.int64).reshape(self.n_tokens, ndim)
+            np.save(
+                self.path.joinpath(f"{field}.offsets.npy"),
+                np.array(self._offsets[field], dtype = np.int64)
+            )
+            np.save(self.path.joinpath(f"{field}.shapes.npy"), shapes)
+            arrays[field] = {
+                "dtype": self._dtypes[field].str,
+                "ndim": ndim
+            }
+
+        metadata = pl.DataFrame(
+            self._rows,
+            schema = SCALAR_FIELDS + list(PROFILE_COLUMNS),
+            strict = False,
+            infer_schema_length = None
+        ) if self._rows else pl.DataFrame(
+            schema = SCALAR_FIELDS + list(PROFILE_COLUMNS)
+        )
+        metadata = metadata.with_columns(
+            pl.col(pl.Null).cast(pl.String)
+        )
+        # uncompressed, so it can be memory mapped
+        metadata.write_ipc(
+            self.path.joinpath(METADATA_FILE),
+            compression = "uncompressed"
+        )
+
+        index_path = self.path.joinpath(INDEX_FILE)
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        with tmp_path.open("w") as file:
+            json.dump(
+                {
+                    "format": ARCHIVE_FORMAT,
+                    "version": ARCHIVE_VERSION,
+                    "n_tokens": self.n_tokens,
+                    "arrays": arrays
+                },
+                file,
+                indent = 1
+            )
+        os.replace(tmp_path, index_path)
+
+    def abort(self):
+        """Close the archive's files without writing its index,
+        so that it is not read as a finished archive."""
+        for file in self._files.values():
+            file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        else:
+            # the arrays may be partway through a token
+            self.abort()
+
+
+def write_archive(
+        candidates: list[CandidateTracks|CandidateRecord],
+        path: str|Path,
+        samples: bool = False
+    ) -> Path:
+    """Write candidate tracks to an archive. See
+    [](`~fasttrackpy.processors.archive.ArchiveWriter`)
+    for its layout.
+
+    Args:
+        candidates (list[CandidateTracks|CandidateRecord]):
+            The candidate tracks, or their records. Any iterable
+            works, like the generator of
+            [](`~fasttrackpy.iter_corpus`).
+        path (str | Path): The archive directory.
+        samples (bool, optional): Whether to also archive the
+            tokens' samples. Defaults to False.
+
+    Returns:
+        (Path): The archive directory.
+    """
+    with ArchiveWriter(path, samples = samples) as writer:
+        for x in candidates:
+            writer.write(x)
+    return writer.path
+
+
+class CandidateArchive:
+    """
+    An archive written by
+    [](`~fasttrackpy.processors.archive.write_archive`).
+
+    Its arrays are memory mapped rather than read, so getting
+    a token's record only reads that token's arrays, however
+    big the archive is. Tokens are found with the metadata table.
+    The arrays are mapped copy-on-write: rebuilt candidates can
+    change them, as when they smooth rejected candidates, but the
+    changes are not written to the archive.
+
+    Args:
+        path (str | Path): The archive directory.
+
+    Attributes:
+        path (Path): The archive directory.
+        metadata (pl.DataFrame): The settings, file name, id, group
+            and label of each token, in the order they were written.
+    """
+    def __init__(self, path: str|Path):
+        self.path = Path(path)
+        index_path = self.path.joinpath(INDEX_FILE)
+        if not index_path.exists():
+            raise FileNotFoundError(
+                f"{self.path} is not a finished candidate archive"
+            )
+        with index_path.open() as file:
+            index = json.load(file)
+        if index.get("format") != ARCHIVE_FORMAT or \
+                index.get("version") != ARCHIVE_VERSION:
+            raise ValueError(
+                f"{self.path} is not a version {ARCHIVE_VERSION} "\
+                "candidate archive"
+            )
+
+        self.metadata = pl.read_ipc(
+            self.path.joinpath(METADATA_FILE),
+            memory_map = True
+        )
+        self._arrays = {
+            field: self._map_array(field, spec["dtype"])
+            for field, spec in index["arrays"].items()
+        }
+
+    def _map_array(self, field: str, dtype: str):
+        offsets = np.load(
+            self.path.joinpath(f"{field}.offsets.npy"),
+            mmap_mode = "r"
+        )
+        shapes = np.load(
+            self.path.joinpath(f"{field}.shapes.npy"),
+            mmap_mode = "r"
+        )
+        if offsets[-1] == 0:
+            # empty files can't be mapped
+            return np.empty(0, dtype = dtype), offsets, shapes
+        data = np.memmap(
+            self.path.joinpath(f"{field}.bin"),
+            dtype = dtype,
+            mode = "c",
+            shape = (int(offsets[-1]),)
+        )
+        return data, offsets, shapes
+
+    def __len__(self) -> int:
+        return self.metadata.height
+
+    def _array(self, field: str, idx: int) -> np.ndarray|None:
+        if field not in self._arrays:
+            return None
+        data, offsets, shapes = self._arrays[field]
+        shape = tuple(int(x) for x in shapes[idx])
+        if shape and shape[0] < 0:
+            return None
+        return data[offsets[idx]:offsets[idx + 1]].reshape(shape)
+
+    def record(self, idx: int) -> CandidateRecord:
+        """The record of a token.
+
+        Args:
+            idx (int): The token's index.
+
+        Returns:
+            (CandidateRecord): Its record, with arrays that
+                are views of the archive.
+        """
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("archive index out of range")
+        row = self.metadata.row(idx, named = True)
+        profile = ComputeProfile(**{
+            attribute: row.pop(column)
+            for column, attribute in PROFILE_COLUMNS.items()
+        })
+        return CandidateRecord(
+            profile = profile,
+            **row,
+            **{field: self._array(field, idx) for field in ARRAY_FIELDS}
+        )
+
+    def __getitem__(self, idx: int) -> CandidateRecord:
+        return self.record(idx)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self.record(idx)
+
+    def candidates(
+            self,
+            idx: int,
+            smoother: Smoother = Smoother(),
+            loss_fun: Loss = Loss(),
+            agg_fun: Agg = Agg(),
+            heuristics: list[MinMaxHeuristic|SpacingHeuristic] = []
+        ) -> CandidateTracks:
+        """Rebuild the candidate tracks of a token with
+        [](`~fasttrackpy.CandidateTracks.from_record`).
+
+        The smoother, loss, aggregation and heuristic objects
+        aren't archived, so the ones the tokens were analyzed
+        with need to be passed again.
+
+        Args:
+            idx (int): The token's index.
+            smoother (Smoother, optional): The smoother that was used.
+                Defaults to `Smoother()`.
+            loss_fun (Loss, optional): The loss function that was used.
+                Defaults to Loss().
+            agg_fun (Agg, optional): The loss aggregation function that
+                was used. Defaults to Agg().
+            heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
+                The heuristics that were used.
+
+        Returns:
+            (CandidateTracks): The candidate tracks. Their samples are
+                None if the archive was written without them.
+        """
+        return CandidateTracks.from_record(
+            self.record(idx),
+            samples = self._array("samples", idx),
+            smoother = smoother,
+            loss_fun = loss_fun,
+            agg_fun = agg_fun,
+            heuristics = heuristics
+        )
+
+    def select(self, **columns) -> np.ndarray:
+        """The indices of the tokens with metadata values.
+
+        Args:
+            **columns: Values of metadata columns, like
+                `file_name = "speaker1"` or `group = "A"`.
+
+        Returns:
+            (np.ndarray): The indices of the tokens that have them.
+        """
+        return self.metadata.with_row_index()\
+            .filter(**columns)["index"]\
+            .to_numpy()
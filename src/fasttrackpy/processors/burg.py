@@ -0,0 +1,460 @@
+import numpy as np
+from numba import njit
+
+SAFETY_MARGIN = 50.0
+RESAMPLE_PRECISION = 50
+ANTI_TURN_AROUND = 1000
+
+# The kernels release the GIL, so threads can analyze
+# different max formants at the same time.
+
+@njit(cache=True, nogil=True)
+def _interpolate_sinc(
+        y: np.ndarray,
+        x: float,
+        max_depth: int
+    ) -> float:
+    # x is a 1-based sample index, as in Praat's NUM_interpolate_sinc
+    n = y.size
+    if x > n:
+        return y[n-1]
+    if x < 1:
+        return y[0]
+    midleft = int(np.floor(x))
+    midright = midleft + 1
+    if x == midleft:
+        return y[midleft-1]
+    if max_depth > midright - 1:
+        max_depth = midright - 1
+    if max_depth > n - midleft:
+        max_depth = n - midleft
+    if max_depth <= 0:
+        return y[int(np.floor(x + 0.5))-1]
+    if max_depth == 1:
+        return y[midleft-1] + (x - midleft) * (y[midright-1] - y[midleft-1])
+    if max_depth == 2:
+        yl = y[midleft-1]
+        yr = y[midright-1]
+        dyl = 0.5 * (yr - y[midleft-2])
+        dyr = 0.5 * (y[midright] - yl)
+        fil = x - midleft
+        fir = midright - x
+        return yl * fir + yr * fil - fil * fir * (
+            0.5 * (dyr - dyl) + (fil - 0.5) * (dyl + dyr - 2 * (yr - yl))
+        )
+
+    left = midright - max_depth
+    right = midleft + max_depth
+    result = 0.0
+
+    a = np.pi * (x - midleft)
+    halfsina = 0.5 * np.sin(a)
+    aa = a / (x - left + 1)
+    daa = np.pi / (x - left + 1)
+    cosaa = np.cos(aa)
+    sinaa = np.sin(aa)
+    cosdaa = np.cos(daa)
+    sindaa = np.sin(daa)
+    for ix in range(midleft, left-1, -1):
+        d = halfsina / a * (1.0 + cosaa)
+        result += y[ix-1] * d
+        a += np.pi
+        help = cosaa * cosdaa - sinaa * sindaa
+        sinaa = cosaa * sindaa + sinaa * cosdaa
+        cosaa = help
+        halfsina = -halfsina
+
+    a = np.pi * (midright - x)
+    halfsina = 0.5 * np.sin(a)
+    aa = a / (right - x + 1)
+    daa = np.pi / (right - x + 1)
+    cosaa = np.cos(aa)
+    sinaa = np.sin(aa)
+    cosdaa = np.cos(daa)
+    sindaa = np.sin(daa)
+    for ix in range(midright, right+1):
+        d = halfsina / a * (1.0 + cosaa)
+        result += y[ix-1] * d
+        a += np.pi
+        help = cosaa * cosdaa - sinaa * sindaa
+        sinaa = cosaa * sindaa + sinaa * cosdaa
+        cosaa = help
+        halfsina = -halfsina
+
+    return result
+
+@njit(cache=True, nogil=True)
+def _resample(
+        y: np.ndarray,
+        x1: float,
+        dx: float,
+        new_x1: float,
+        new_dx: float,
+        n_new: int,
+        precision: int
+    ) -> np.ndarray:
+    out = np.empty(n_new)
+    for i in range(n_new):
+        x = new_x1 + i * new_dx
+        index = (x - x1) / dx + 1.0
+        out[i] = _interpolate_sinc(y, index, precision)
+    return out
+
+@njit(cache=True, nogil=True)
+def _pre_emphasize(
+        y: np.ndarray,
+        dx: float,
+        pre_emphasis_from: float
+    ):
+    if pre_emphasis_from >= 0.5 / dx:
+        return
+    pre_emphasis = np.exp(-2.0 * np.pi * pre_emphasis_from * dx)
+    for i in range(y.size-1, 0, -1):
+        y[i] -= pre_emphasis * y[i-1]
+
+@njit(cache=True, nogil=True)
+def _burg_lpc(
+        x: np.ndarray,
+        m: int
+    ) -> np.ndarray:
+    # Burg's method, after Praat's NUMburg_preallocated
+    n = x.size
+    a = np.zeros(m)
+    b1 = np.zeros(n)
+    b2 = np.zeros(n)
+    aa = np.zeros(m)
+
+    p = 0.0
+    for j in range(n):
+        p += x[j] * x[j]
+    if p <= 0.0:
+        return a
+
+    b1[0] = x[0]
+    b2[n-2] = x[n-1]
+    for j in range(1, n-1):
+        b1[j] = x[j]
+        b2[j-1] = x[j]
+
+    for i in range(1, m+1):
+        num = 0.0
+        denum = 0.0
+        for j in range(n-i):
+            num += b1[j] * b2[j]
+            denum += b1[j] * b1[j] + b2[j] * b2[j]
+        if denum <= 0.0:
+            return a
+        a[i-1] = 2.0 * num / denum
+        for j in range(1, i):
+            a[j-1] = aa[j-1] - a[i-1] * aa[i-j-1]
+        if i < m:
+            for j in range(i):
+                aa[j] = a[j]
+            for j in range(n-i-1):
+                b1[j] -= aa[i-1] * b2[j]
+                b2[j] = b2[j+1] - aa[i-1] * b1[j+1]
+    return a
+
+@njit(cache=True, nogil=True)
+def _lpc_roots_eig(
+        a: np.ndarray
+    ) -> np.ndarray:
+    # roots of z^m - a[0] z^(m-1) - ... - a[m-1]
+    # as eigenvalues of the companion matrix
+    m = a.size
+    companion = np.zeros((m, m), dtype=np.complex128)
+    for i in range(m):
+        companion[0, i] = a[i]
+    for i in range(1, m):
+        companion[i, i-1] = 1.0
+    return np.linalg.eigvals(companion)
+
+@njit(cache=True, nogil=True)
+def _lpc_roots(
+        a: np.ndarray,
+        start: np.ndarray,
+        max_iter: int = 100,
+        tol: float = 1e-13
+    ) -> np.ndarray:
+    # roots of z^m - a[0] z^(m-1) - ... - a[m-1]
+    # by Aberth-Ehrlich iteration from the `start` roots,
+    # reflected into the unit circle.
+    # Falls back to the companion matrix eigenvalues
+    # if the iteration doesn't converge.
+    m = a.size
+    roots = start.copy()
+    converged = False
+    for _ in range(max_iter):
+        max_step = 0.0
+        for k in range(m):
+            z = roots[k]
+            p = 1.0 + 0.0j
+            dp = 0.0 + 0.0j
+            for i in range(m):
+                dp = dp * z + p
+                p = p * z - a[i]
+            if dp == 0:
+                continue
+            ratio = p / dp
+            repulsion = 0.0 + 0.0j
+            for j in range(m):
+                if j != k:
+                    repulsion += 1.0 / (z - roots[j])
+            step = ratio / (1.0 - ratio * repulsion)
+            roots[k] = z - step
+            if np.abs(step) > max_step:
+                max_step = np.abs(step)
+        if max_step < tol:
+            converged = True
+            break
+
+    if not converged:
+        roots = _lpc_roots_eig(a)
+
+    for i in range(m):
+        if np.abs(roots[i]) > 1.0:
+            roots[i] = 1.0 / np.conj(roots[i])
+    return roots
+
+@njit(cache=True, nogil=True)
+def _initial_roots(
+        m: int
+    ) -> np.ndarray:
+    roots = np.empty(m, dtype=np.complex128)
+    for k in range(m):
+        roots[k] = 0.9 * np.exp(1j * (2.0 * np.pi * k / m + 0.4))
+    return roots
+
+@njit(cache=True, nogil=True)
+def _formant_frames(
+        y: np.ndarray,
+        dx: float,
+        x1: float,
+        n_poles: int,
+        n_formants: int,
+        window_length: float,
+        time_step: float,
+        safety_margin: float
+    ):
+    nx = y.size
+    nyquist = 0.5 / dx
+    duration = nx * dx
+    dt_window = 2.0 * window_length
+    n_frames = 1 + int(np.floor((duration - dt_window) / time_step))
+    nsamp_window = int(np.floor(dt_window / dx))
+    halfnsamp_window = nsamp_window // 2
+    t1 = x1 + 0.5 * (duration - dx - (n_frames - 1) * time_step)
+    if n_frames < 1:
+        n_frames = 1
+        t1 = x1 + 0.5 * duration
+        nsamp_window = nx
+
+    tracks = np.full((n_formants, n_frames), np.nan)
+    bandwidths = np.full((n_formants, n_frames), np.nan)
+    if nsamp_window < n_poles + 1:
+        return tracks, bandwidths, t1, n_frames
+
+    window = np.empty(nsamp_window)
+    imid = 0.5 * (nsamp_window + 1)
+    edge = np.exp(-12.0)
+    for i in range(1, nsamp_window+1):
+        window[i-1] = (
+            np.exp(
+                -48.0 * (i - imid) * (i - imid)
+                / (nsamp_window + 1) / (nsamp_window + 1)
+            ) - edge
+        ) / (1.0 - edge)
+
+    frame = np.empty(nsamp_window)
+    start_roots = _initial_roots(n_poles)
+    # small rotation so warm started roots
+    # aren't exact conjugate pairs
+    nudge = np.exp(1j * 1e-3)
+    freqs = np.empty(n_poles)
+    bands = np.empty(n_poles)
+    for iframe in range(n_frames):
+        t = t1 + iframe * time_step
+        left_sample = int(np.floor((t - x1) / dx)) + 1
+        right_sample = left_sample + 1
+        start_sample = max(right_sample - halfnsamp_window, 1)
+        end_sample = min(left_sample + halfnsamp_window, nx)
+
+        max_intensity = 0.0
+        for i in range(start_sample, end_sample+1):
+            value = y[i-1] * y[i-1]
+            if value > max_intensity:
+                max_intensity = value
+        if max_intensity == 0.0:
+            continue
+
+        for j in range(nsamp_window):
+            i = start_sample + j
+            frame[j] = y[i-1] * window[j] if i <= nx else 0.0
+
+        a = _burg_lpc(frame, n_poles)
+        roots = _lpc_roots(a, start_roots)
+        start_roots = roots * nudge
+
+        n_found = 0
+        for i in range(roots.size):
+            if roots[i].imag >= 0.0:
+                f = np.abs(np.arctan2(roots[i].imag, roots[i].real)) \
+                    * nyquist / np.pi
+                if f >= safety_margin and f <= nyquist - safety_margin:
+                    freqs[n_found] = f
+                    bands[n_found] = -np.log(np.abs(roots[i])**2) \
+                        * nyquist / np.pi
+                    n_found += 1
+
+        order = np.argsort(freqs[0:n_found])
+        for k in range(min(n_found, n_formants)):
+            tracks[k, iframe] = freqs[order[k]]
+            bandwidths[k, iframe] = bands[order[k]]
+
+    return tracks, bandwidths, t1, n_frames
+
+def _anti_alias(
+        spectrum: np.ndarray,
+        nfft: int,
+        upfactor: float
+    ) -> np.ndarray:
+    # zero out everything from the new nyquist up, following
+    # the packed real fft layout Praat's Sound_resample uses:
+    # [dc, nyquist, re(1), im(1), re(2), im(2), ...]
+    cut = int(np.floor(upfactor * nfft))
+    k = np.arange(spectrum.size)
+    real_zero = (2 * k + 1 >= cut) & (k > 0) & (k < nfft//2)
+    imag_zero = (2 * k + 2 >= cut) & (k > 0) & (k < nfft//2)
+    filtered = spectrum.copy()
+    filtered[real_zero] = 1j * filtered[real_zero].imag
+    filtered[imag_zero] = filtered[imag_zero].real
+    return filtered
+
+def burg_formants_batch(
+        samples: np.ndarray,
+        sampling_frequency: float,
+        max_formants: np.ndarray,
+        xmin: float = 0.0,
+        n_formants: int = 4,
+        window_length: float = 0.025,
+        time_step: float = 0.002,
+        pre_emphasis_from: float = 50,
+        max_number_of_formants: float = 5.5
+    ) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Burg formant analysis of one sound at many
+    max formant settings.
+
+    This follows the steps of Praat's `Sound: To Formant (burg)...`
+    (resampling to twice the max formant, pre-emphasis, Gaussian
+    windowing, Burg LPC and root solving) with numba compiled
+    kernels. The fft of the sound for the anti-aliasing filter
+    is only computed once for all max formant values.
+
+    Args:
+        samples (np.ndarray): A 1D array of audio samples.
+        sampling_frequency (float): The audio sampling frequency.
+        max_formants (np.ndarray): The max formant values to analyze.
+        xmin (float, optional): The time offset for the audio.
+            Defaults to 0.0.
+        n_formants (int, optional): The number of formants to return.
+            Defaults to 4.
+        window_length (float, optional): Window length of the formant analysis.
+            Defaults to 0.025.
+        time_step (float, optional): Time step of the formant analyusis window.
+            Defaults to 0.002.
+        pre_emphasis_from (float, optional): Pre-emphasis threshold.
+            Defaults to 50.
+        max_number_of_formants (float, optional): The number of formants
+            to look for, which sets the LPC order. Defaults to 5.5.
+
+    Returns:
+        (list[tuple[np.ndarray, np.ndarray, np.ndarray]]): For each max
+            formant, a tuple of the (formants, time) formant and bandwidth
+            arrays and the time domain.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.ndim > 1:
+        samples = samples.mean(axis = 0)
+    nx = samples.size
+    dx = 1/sampling_frequency
+    x1 = xmin + 0.5 * dx
+    xmax = xmin + nx * dx
+    nyquist = 0.5 / dx
+    n_poles = int(np.floor(2.0 * max_number_of_formants + 0.5))
+
+    nfft = 1
+    while nfft < nx + 2 * ANTI_TURN_AROUND:
+        nfft *= 2
+    spectrum = None
+
+    results = []
+    for max_formant in max_formants:
+        if np.abs(max_formant / nyquist - 1.0) < 1e-12:
+            y = samples.copy()
+            new_dx = dx
+            new_x1 = x1
+        else:
+            new_fs = 2.0 * max_formant
+            upfactor = new_fs * dx
+            if upfactor < 1.0:
+                if spectrum is None:
+                    padded = np.zeros(nfft)
+                    padded[ANTI_TURN_AROUND:ANTI_TURN_AROUND+nx] = samples
+                    spectrum = np.fft.rfft(padded)
+                filtered = np.fft.irfft(
+                    _anti_alias(spectrum, nfft, upfactor),
+                    n = nfft
+                )[ANTI_TURN_AROUND:ANTI_TURN_AROUND+nx]
+            else:
+                filtered = samples
+            n_new = int(np.floor((xmax - xmin) * new_fs + 0.5))
+            new_dx = 1.0 / new_fs
+            new_x1 = 0.5 * (xmin + xmax - (n_new - 1) / new_fs)
+            y = _resample(
+                filtered, x1, dx,
+                new_x1, new_dx, n_new,
+                RESAMPLE_PRECISION
+            )
+
+        _pre_emphasize(y, new_dx, pre_emphasis_from)
+        tracks, bandwidths, t1, n_frames = _formant_frames(
+            y, new_dx, new_x1,
+            n_poles, n_formants,
+            window_length, time_step,
+            SAFETY_MARGIN
+        )
+        time_domain = t1 + np.arange(n_frames) * time_step
+        results.append((tracks, bandwidths, time_domain))
+
+    return results
+
+def burg_formants(
+        samples: np.ndarray,
+        sampling_frequency: float,
+        maximum_formant: float,
+        xmin: float = 0.0,
+        n_formants: int = 4,
+        window_length: float = 0.025,
+        time_step: float = 0.002,
+        pre_emphasis_from: float = 50,
+        max_number_of_formants: float = 5.5
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Burg formant analysis of one sound at one max
+    formant setting. See
+    [](`~fasttrackpy.processors.burg.burg_formants_batch`).
+
+    Returns:
+        (tuple[np.ndarray, np.ndarray, np.ndarray]): The (formants, time)
+            formant and bandwidth arrays and the time domain.
+    """
+    return burg_formants_batch(
+        samples = samples,
+        sampling_frequency = sampling_frequency,
+        max_formants = np.array([maximum_formant]),
+        xmin = xmin,
+        n_formants = n_formants,
+        window_length = window_length,
+        time_step = time_step,
+        pre_emphasis_from = pre_emphasis_from,
+        max_number_of_formants = max_number_of_formants
+    )[0]
@@ -0,0 +1,292 @@
+import numpy as np
+import parselmouth as pm
+from parselmouth.praat import call
+from typing import Literal
+from joblib import Parallel, delayed
+
+def formant_arrays_by_time(
+        formant_obj: pm.Formant,
+        n_formants: int = 4,
+        return_bandwidths: bool = True
+    ) -> tuple[np.ndarray, np.ndarray|None]:
+    """Get formant and bandwidth values by querying
+    the `Formant` object at each frame time.
+
+    Args:
+        formant_obj (pm.Formant): A `parselmouth.Formant` object
+        n_formants (int, optional): The number of formants to get.
+            Defaults to 4.
+        return_bandwidths (bool, optional): Whether to get bandwidths.
+            If False, `None` is returned for the bandwidths.
+            Defaults to True.
+
+    Returns:
+        (tuple[np.ndarray, np.ndarray|None]): A tuple of (formants, time)
+            shaped arrays of formant frequencies and bandwidths.
+    """
+    time_domain = formant_obj.xs()
+    tracks = np.array(
+        [
+            [
+                formant_obj.get_value_at_time(i+1, x)
+                for x in time_domain
+            ]
+            for i in range(n_formants)
+        ]
+    )
+
+    if not return_bandwidths:
+        return tracks, None
+
+    bandwidths = np.array(
+        [
+            [
+                formant_obj.get_bandwidth_at_time(i+1, x)
+                for x in time_domain
+            ]
+            for i in range(n_formants)
+        ]
+    )
+
+    return tracks, bandwidths
+
+def formant_arrays(
+        formant_obj: pm.Formant,
+        n_formants: int = 4,
+        return_bandwidths: bool = True
+    ) -> tuple[np.ndarray, np.ndarray|None]:
+    """Get formant and bandwidth values from
+    a `Formant` object in one pass over its frames.
+
+    Parselmouth doesn't expose the frame values of a
+    `Formant` object directly, so they are read from
+    Praat's own conversions, in memory: the frequencies
+    of each formant from `To Matrix...`, and the bandwidths
+    from the `TableOfReal` of a `FormantTier`. The values
+    are the same as those returned by
+    [](`~fasttrackpy.processors.formants.formant_arrays_by_time`),
+    including `np.nan` where a frame has too few formants.
+
+    Args:
+        formant_obj (pm.Formant): A `parselmouth.Formant` object
+        n_formants (int, optional): The number of formants to get.
+            Defaults to 4.
+        return_bandwidths (bool, optional): Whether to get bandwidths.
+            If False, `None` is returned for the bandwidths.
+            Defaults to True.
+
+    Returns:
+        (tuple[np.ndarray, np.ndarray|None]): A tuple of (formants, time)
+            shaped arrays of formant frequencies and bandwidths.
+    """
+    tracks = np.array([
+        call(formant_obj, "To Matrix...", i+1).values[0]
+        for i in range(n_formants)
+    ]).reshape(n_formants, formant_obj.n_frames)
+    # frames without the formant are 0
+    missing = tracks == 0
+    tracks[missing] = np.nan
+    if not return_bandwidths:
+        return tracks, None
+
+    # (time, frequency, bandwidth, frequency, bandwidth...) rows
+    table = call(
+        call(
+            call(formant_obj, "Down to FormantTier"),
+            "Down to TableOfReal...", "yes", "yes"
+        ),
+        "To Matrix"
+    ).values
+    n_columns = min((table.shape[1] - 1) // 2, n_formants)
+    bandwidths = np.full(tracks.shape, np.nan)
+    bandwidths[0:n_columns] = table[:, 2:2 + 2*n_columns:2].T
+    # the table's cells for missing formants aren't set
+    bandwidths[missing] = np.nan
+
+    return tracks, bandwidths
+
+def praat_formants(
+        samples: np.ndarray,
+        sampling_frequency: float,
+        maximum_formant: float,
+        xmin: float = 0.0,
+        n_formants: int = 4,
+        window_length: float = 0.025,
+        time_step: float = 0.002,
+        pre_emphasis_from: float = 50,
+        return_bandwidths: bool = True
+    ) -> tuple[np.ndarray, np.ndarray|None, np.ndarray]:
+    """Formant analysis with parselmouth's `Sound.to_formant_burg()`.
+
+    Args:
+        samples (np.ndarray): A numpy array of audio samples.
+        sampling_frequency (float): The audio sampling frequency.
+        maximum_formant (float): The max formant.
+        xmin (float, optional): The time offset for the audio. Defaults to 0.0.
+        n_formants (int, optional): The number of formants to return.
+            Defaults to 4.
+        window_length (float, optional): Window length of the formant analysis.
+            Defaults to 0.025.
+        time_step (float, optional): Time step of the formant analyusis window.
+            Defaults to 0.002.
+        pre_emphasis_from (float, optional): Pre-emphasis threshold.
+            Defaults to 50.
+        return_bandwidths (bool, optional): Whether to get bandwidths.
+            If False, `None` is returned for the bandwidths.
+            Defaults to True.
+
+    Returns:
+        (tuple[np.ndarray, np.ndarray|None, np.ndarray]): The (formants, time)
+            formant and bandwidth arrays and the time domain.
+    """
+    sound = pm.Sound(
+        samples,
+        sampling_frequency = sampling_frequency,
+        start_time = xmin
+    )
+    formant_obj = sound.to_formant_burg(
+        time_step = time_step,
+        max_number_of_formants = 5.5,
+        maximum_formant = maximum_formant,
+        window_length = window_length,
+        pre_emphasis_from = pre_emphasis_from
+    )
+    time_domain = formant_obj.xs()
+    tracks, bandwidths = formant_arrays(
+        formant_obj,
+        n_formants = n_formants,
+        return_bandwidths = return_bandwidths
+    )
+    return tracks, bandwidths, time_domain
+
+def candidate_pool(
+        engine: Literal["praat", "numba"],
+        n_jobs: int
+    ) -> Parallel:
+    """The pool that one sound's max formant analyses are
+    split across.
+
+    The numba engine releases the GIL, so it uses threads. Praat
+    holds it, so the praat engine needs processes. Inside a loky
+    worker of the task pool, joblib runs a pool that only prefers
+    processes on threads, so the loky backend is named, which
+    starts a process pool of the worker's own.
+
+    Args:
+        engine (Literal["praat", "numba"]): The formant analysis engine.
+        n_jobs (int): The number of workers.
+
+    Returns:
+        (Parallel): A `joblib.Parallel`.
+    """
+    if engine == "numba":
+        return Parallel(n_jobs = n_jobs, prefer = "threads")
+    return Parallel(n_jobs = n_jobs, backend = "loky")
+
+def track_formants_batch(
+        samples: np.ndarray,
+        sampling_frequency: float,
+        max_formants: np.ndarray,
+        xmin: float = 0.0,
+        n_formants: int = 4,
+        window_length: float = 0.025,
+        time_step: float = 0.002,
+        pre_emphasis_from: float = 50,
+        engine: Literal["praat", "numba"] = "praat",
+        return_bandwidths: bool = True,
+        n_jobs: int = 1
+    ) -> list[tuple[np.ndarray, np.ndarray|None, np.ndarray]]:
+    """Formant analysis of one sound at many max formant
+    settings with the given engine.
+
+    Args:
+        samples (np.ndarray): A numpy array of audio samples.
+        sampling_frequency (float): The audio sampling frequency.
+        max_formants (np.ndarray): The max formant values to analyze.
+        xmin (float, optional): The time offset for the audio. Defaults to 0.0.
+        n_formants (int, optional): The number of formants to return.
+            Defaults to 4.
+        window_length (float, optional): Window length of the formant analysis.
+            Defaults to 0.025.
+        time_step (float, optional): Time step of the formant analyusis window.
+            Defaults to 0.002.
+        pre_emphasis_from (float, optional): Pre-emphasis threshold.
+            Defaults to 50.
+        engine (Literal["praat", "numba"], optional): The formant analysis
+            engine. `"praat"` uses parselmouth, one max formant at a time.
+            `"numba"` uses the compiled kernels in
+            [](`~fasttrackpy.processors.burg`) for all max formants at once.
+            Defaults to "praat".
+        return_bandwidths (bool, optional): Whether to get bandwidths.
+            If False, `None` is returned for the bandwidths.
+            Defaults to True.
+        n_jobs (int, optional): The number of workers to split the max
+            formants between, in a
+            [](`~fasttrackpy.processors.formants.candidate_pool`).
+            Defaults to 1.
+
+    Returns:
+        (list[tuple[np.ndarray, np.ndarray|None, np.ndarray]]): For each max
+            formant, a tuple of the (formants, time) formant and bandwidth
+            arrays and the time domain.
+    """
+    if n_jobs > 1 and len(max_formants) > 1:
+        chunks = np.array_split(
+            np.asarray(max_formants),
+            min(n_jobs, len(max_formants))
+        )
+        analyses = candidate_pool(engine, len(chunks))(
+            delayed(track_formants_batch)(
+                samples = samples,
+                sampling_frequency = sampling_frequency,
+                max_formants = chunk,
+                xmin = xmin,
+                n_formants = n_formants,
+                window_length = window_length,
+                time_step = time_step,
+                pre_emphasis_from = pre_emphasis_from,
+                engine = engine,
+                return_bandwidths = return_bandwidths
+            )
+            for chunk in chunks
+        )
+        return [x for chunk in analyses for x in chunk]
+
+    if engine == "praat":
+        return [
+            praat_formants(
+                samples = samples,
+                sampling_frequency = sampling_frequency,
+                maximum_formant = max_formant,
+                xmin = xmin,
+                n_formants = n_formants,
+                window_length = window_length,
+                time_step = time_step,
+                pre_emphasis_from = pre_emphasis_from,
+                return_bandwidths = return_bandwidths
+            )
+            for max_formant in max_formants
+        ]
+
+    if engine == "numba":
+        # numba is slow to import, so only import it when it's used
+        from fasttrackpy.processors.burg import burg_formants_batch
+        analyses = burg_formants_batch(
+            samples = samples,
+            sampling_frequency = sampling_frequency,
+            max_formants = max_formants,
+            xmin = xmin,
+            n_formants = n_formants,
+            window_length = window_length,
+            time_step = time_step,
+            pre_emphasis_from = pre_emphasis_from
+        )
+        if return_bandwidths:
+            return analyses
+        # the compiled kernels get bandwidths along with formants
+        return [
+            (tracks, None, time_domain)
+            for tracks, _, time_domain in analyses
+        ]
+
+    raise ValueError("engine must be 'praat' or 'numba'")
@@ -40,6 +40,16 @@ class MinMaxHeuristic:
     number: int = 1
     boundary: float|int|np.floating = 1200
 
+    @property
+    def requires(self) -> set[str]:
+        """
+        The smoothed track values this heuristic evaluates.
+        See [](`~fasttrackpy.processors.profile.get_profile`).
+        """
+        if self.measure == "bandwidth":
+            return {"bandwidths"}
+        return {"log_formants"}
+
     def eval(self, track: TrackType):
         """
         Evaluate whether or not the track passes the 
@@ -81,6 +91,52 @@ class MinMaxHeuristic:
         
         return 0
 
+    def eval_batch(
+            self,
+            n_formants: int,
+            log_parameters: np.ndarray|None = None,
+            bandwidth_parameters: np.ndarray|None = None
+        ) -> np.ndarray:
+        """
+        Evaluate the heuristic for many candidate tracks at once.
+
+        Args:
+            n_formants (int):
+                The number of formants tracked.
+            log_parameters (np.ndarray|None, optional):
+                A (candidates, formants, params) array of log formant
+                smoothing parameters. Needed for frequency heuristics.
+            bandwidth_parameters (np.ndarray|None, optional):
+                A (candidates, formants, params) array of log bandwidth
+                smoothing parameters. Needed for bandwidth heuristics.
+
+        Returns:
+            (np.ndarray):
+                For each candidate, 0 if it passes the heuristic,
+                and `np.inf` if it doesn't.
+        """
+        parameters = log_parameters
+        if self.measure == "bandwidth":
+            parameters = bandwidth_parameters
+
+        errors = np.zeros(parameters.shape[0])
+        if self.number > n_formants:
+            return errors
+
+        mean_value = np.exp(
+            parameters[:, self.number-1, 0]
+            *np.sqrt(2)
+        )
+
+        check = np.zeros(errors.shape, dtype=bool)
+        if self.edge == "max":
+            check = mean_value > float(self.boundary)
+        if self.edge == "min":
+            check = mean_value < float(self.boundary)
+
+        errors[check] = np.inf
+        return errors
+
 
 @dataclass
 class SpacingHeuristic:
@@ -107,6 +163,14 @@ class SpacingHeuristic:
         self.top = np.array(self.top)
         self.bottom = np.array(self.bottom)
 
+    @property
+    def requires(self) -> set[str]:
+        """
+        The smoothed track values this heuristic evaluates.
+        See [](`~fasttrackpy.processors.profile.get_profile`).
+        """
+        return {"log_formants"}
+
     def eval(self, track:TrackType):
         """
         Evaluate whether or not the track passes
@@ -148,6 +212,91 @@ class SpacingHeuristic:
         
         return 0
 
+    def eval_batch(
+            self,
+            n_formants: int,
+            log_parameters: np.ndarray|None = None,
+            bandwidth_parameters: np.ndarray|None = None
+        ) -> np.ndarray:
+        """
+        Evaluate the heuristic for many candidate tracks at once.
+
+        Args:
+            n_formants (int):
+                The number of formants tracked.
+            log_parameters (np.ndarray|None, optional):
+                A (candidates, formants, params) array of log formant
+                smoothing parameters.
+            bandwidth_parameters (np.ndarray|None, optional):
+                Not used.
+
+        Returns:
+            (np.ndarray):
+                For each candidate, 0 if it passes the heuristic,
+                and `np.inf` if it doesn't.
+        """
+        errors = np.zeros(log_parameters.shape[0])
+        if n_formants < self.top.max():
+            return errors
+
+        top_values = np.exp(
+            log_parameters[:, self.top-1, 0]*np.sqrt(2)
+        )
+        bottom_values = np.exp(
+            log_parameters[:, self.bottom-1, 0]*np.sqrt(2)
+        )
+
+        if self.top.size == 1:
+            top_spacing = top_values[:, 0]
+        else:
+            top_spacing = np.diff(top_values, axis = 1)[:, 0]
+
+        bottom_spacing = np.diff(bottom_values, axis = 1)[:, 0]
+
+        check = (top_spacing < self.top_diff) & \
+            (bottom_spacing < self.bottom_diff)
+        errors[check] = np.inf
+        return errors
+
+def eval_heuristics(
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic],
+        n_formants: int,
+        log_parameters: np.ndarray|None = None,
+        bandwidth_parameters: np.ndarray|None = None
+    ) -> np.ndarray:
+    """
+    Evaluate a list of heuristics for many candidate tracks at once.
+    Every heuristic must have an `eval_batch()` method.
+
+    Args:
+        heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
+            The heuristics to evaluate.
+        n_formants (int):
+            The number of formants tracked.
+        log_parameters (np.ndarray|None, optional):
+            A (candidates, formants, params) array of log formant
+            smoothing parameters.
+        bandwidth_parameters (np.ndarray|None, optional):
+            A (candidates, formants, params) array of log bandwidth
+            smoothing parameters.
+
+    Returns:
+        (np.ndarray):
+            The summed heuristic errors of each candidate.
+    """
+    parameters = log_parameters
+    if parameters is None:
+        parameters = bandwidth_parameters
+
+    errors = np.zeros(parameters.shape[0])
+    for heuristic in heuristics:
+        errors += heuristic.eval_batch(
+            n_formants,
+            log_parameters = log_parameters,
+            bandwidth_parameters = bandwidth_parameters
+        )
+    return errors
+
 F1_Max: Annotated[
     MinMaxHeuristic, 
     "F1 should not be greater than 1200 Hz"
@@ -224,4 +373,4 @@ F3_F4_Sep: Annotated[
 )
 """
 [](`~fasttrackpy.processors.heuristic.SpacingHeuristic`): If F4 - F3 < 500 Hz, F2-F1 > 1500.
-"""
\ No newline at end of file
+"""
@@ -6,6 +6,9 @@ class Loss:
 
     Args:
         method (Union[str, Callable], optional): _description_. Defaults to "lmse".
+            A custom loss can opt into batched scoring by having a `batch`
+            attribute, a function that takes `(candidates, formants, time)`
+            arrays and the same arguments as the loss.
     """
 
     def __init__(
@@ -14,6 +17,7 @@ class Loss:
         **kwargs
     ):
         self.method = self._get_fun(method)
+        self.batch_method = getattr(self.method, "batch", None)
         self.method_args = kwargs
     
     def _get_fun(
@@ -33,7 +37,42 @@ class Loss:
         smoothed: np.ndarray
     ):
         return self.method(formants, smoothed, **self.method_args)
-    
+
+    def calculate_loss_batch(
+        self,
+        formants: np.ndarray,
+        smoothed: np.ndarray,
+        n_frames: np.ndarray = None
+    ) -> np.ndarray:
+        """Calculate the loss for every candidate at once
+
+        If the loss function has no batched version, it is applied
+        to one candidate at a time.
+
+        Args:
+            formants (np.ndarray): A `(candidates, formants, time)` array
+                of formant values, `np.nan` padded along time.
+            smoothed (np.ndarray): A `(candidates, formants, time)` array
+                of smoothed formant values.
+            n_frames (np.ndarray, optional): The number of frames of each
+                candidate, used to drop the padding before applying a
+                loss with no batched version. Defaults to all frames.
+
+        Returns:
+            (np.ndarray): The losses of each candidate stacked along
+                the first axis.
+        """
+        if self.batch_method is not None:
+            return self.batch_method(formants, smoothed, **self.method_args)
+
+        if n_frames is None:
+            n_frames = np.full(formants.shape[0], formants.shape[-1])
+
+        return np.array([
+            self.method(f[..., 0:n], s[..., 0:n], **self.method_args)
+            for f, s, n in zip(formants, smoothed, n_frames)
+        ])
+
 def lmse(
         formants: np.ndarray, 
         smoothed: np.ndarray, 
@@ -70,4 +109,54 @@ def mse(
     """
     sqe = np.power(formants - smoothed, 2)
     mse = np.nanmean(sqe, axis = axis)
-    return mse
\ No newline at end of file
+    return mse
+
+def _batch_axis(axis: int) -> int:
+    # `axis` counts the axes of one candidate,
+    # so it moves over one for a stack of candidates.
+    if axis < 0:
+        return axis
+    return axis + 1
+
+def lmse_batch(
+        formants: np.ndarray,
+        smoothed: np.ndarray,
+        axis: int = 1
+    ) -> np.ndarray:
+    """Log mean squared error of every candidate at once.
+
+    Args:
+        formants (np.ndarray): A `(candidates, formants, time)` array.
+        smoothed (np.ndarray): A `(candidates, formants, time)` array.
+        axis (int, optional): The axis of one candidate to average over,
+            as in [](`~fasttrackpy.processors.losses.lmse`). Defaults to 1.
+
+    Returns:
+        np.ndarray: A `(candidates, formants)` array of errors.
+    """
+    sqe = np.square(np.log(formants) - np.log(smoothed))
+    mse = np.nanmean(sqe, axis = _batch_axis(axis))
+    return mse
+
+def mse_batch(
+        formants: np.ndarray,
+        smoothed: np.ndarray,
+        axis: int = 1
+    ) -> np.ndarray:
+    """Mean squared error of every candidate at once.
+
+    Args:
+        formants (np.ndarray): A `(candidates, formants, time)` array.
+        smoothed (np.ndarray): A `(candidates, formants, time)` array.
+        axis (int, optional): The axis of one candidate to average over,
+            as in [](`~fasttrackpy.processors.losses.mse`). Defaults to 1.
+
+    Returns:
+        np.ndarray: A `(candidates, formants)` array of errors.
+    """
+    sqe = np.square(formants - smoothed)
+    mse = np.nanmean(sqe, axis = _batch_axis(axis))
+    return mse
+
+lmse.batch = lmse_batch
+mse.batch = mse_batch
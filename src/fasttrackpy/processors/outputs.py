@@ -2,12 +2,36 @@ import numpy as np
 import cloudpickle
 import parselmouth as pm
 import polars as pl
+from polars.io.plugins import register_io_source
 from aligned_textgrid import SequenceInterval
+from aligned_textgrid.sequences.tiers import TierGroup
 from pathlib import Path
+from typing import Literal
 import matplotlib.pyplot as mp
+from collections import namedtuple
 import copy
+import json
 import logging
+import queue
 import sys
+import threading
+import urllib.parse
+
+OUTPUT_FORMATS = ["csv", "parquet", "ipc"]
+OUTPUT_SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "ipc": ".arrow"}
+
+# Columns with few distinct values over many rows,
+# written with dictionary encoding.
+DICTIONARY_COLUMNS = ["file_name", "group", "label"]
+
+# The directory levels of partitioned output, and the
+# directory name of missing values, as polars writes them.
+PARTITION_KEYS = ["file_name", "group"]
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+
+# The number of data frames waiting to be written to a
+# parquet or ipc file before writing them blocks.
+SINK_QUEUE_SIZE = 64
 
 ptolmap = {"F1" :"#4477AA",
            "F1_s": "#4477AA",
@@ -18,6 +42,42 @@ ptolmap = {"F1" :"#4477AA",
            "F4": "#CCBB44",
            "F4_s": "#CCBB44"}
 
+class TokenInterval(namedtuple(
+    "TokenInterval",
+    field_names = ["start", "end", "label", "id", "group", "n_entries"]
+)):
+    """
+    The parts of a textgrid interval a token's data uses, which,
+    unlike the interval, are cheap to send to a worker. Like the
+    interval, it is false if it has no sub-intervals.
+    """
+    __slots__ = ()
+
+    def __bool__(self):
+        return self.n_entries > 0
+
+def token_interval(interval: SequenceInterval) -> TokenInterval:
+    """The `TokenInterval` of a textgrid interval.
+
+    Args:
+        interval (SequenceInterval): The interval.
+
+    Returns:
+        (TokenInterval): Its start, end, label, id, the name
+            of its tier group and its number of sub-intervals.
+    """
+    within = interval.within
+    while not isinstance(within, TierGroup):
+        within = within.within
+    return TokenInterval(
+        start = interval.start,
+        end = interval.end,
+        label = interval.label,
+        id = interval.id,
+        group = within.name,
+        n_entries = len(interval)
+    )
+
 def add_metadata(self, out_df):
     if self.file_name:
         out_df = out_df.with_columns(
@@ -34,7 +94,7 @@ def add_metadata(self, out_df):
             group = pl.lit(self.group)
         )
 
-    if isinstance(self.interval, SequenceInterval) :
+    if isinstance(self.interval, (SequenceInterval, TokenInterval)) :
         out_df = out_df.with_columns(
             label = pl.lit(self.interval.label)
         )
@@ -59,20 +119,23 @@ def formant_to_dataframe(self):
 
     orig_df = pl.DataFrame(
         data = self.formants[0:self.n_formants],
-        schema=orig_names
+        schema=orig_names,
+        orient = "col"
     )
 
     smooth_df = pl.DataFrame(
         data = self.smoothed_formants[0:self.n_formants],
-        schema=smooth_names
+        schema=smooth_names,
+        orient = "col"
     )
 
     bandwidth_df = pl.DataFrame(
         data = np.exp(self.smoothed_bandwidths[0:self.n_formants]),
-        schema = bandwidth_names
+        schema = bandwidth_names,
+        orient = "col"
     )
 
-    out_df = pl.concat([orig_df, smooth_df, bandwidth_df], how = "horizontal")
+    out_df = orig_df.hstack(smooth_df).hstack(bandwidth_df)
 
     out_df = out_df.with_columns(
         error = pl.lit(self.smooth_error),
@@ -98,7 +161,8 @@ def param_to_dataframe(self):
         np.arange(self.parameters.shape[0])+1
     ]
     param_df = pl.DataFrame(
-        data = self.parameters,schema=schema
+        data = self.parameters,schema=schema,
+        orient = "col"
     )
 
     param_df = param_df.with_columns(
@@ -121,7 +185,8 @@ def log_param_to_dataframe(self):
         np.arange(self.log_parameters.shape[0])+1
     ]
     param_df = pl.DataFrame(
-        data = self.log_parameters,schema=schema
+        data = self.log_parameters,schema=schema,
+        orient = "col"
     )
 
     param_df = param_df.with_columns(
@@ -132,17 +197,195 @@ def log_param_to_dataframe(self):
 
     return param_df
 
-def get_big_df(self, output):
-        all_df = [x.to_df(output = output) for x in self.candidates]
-        all_df = [
-            x.with_columns(
-                candidate = idx+1
+# The columns every track's data frame may have, after its values.
+METADATA_COLUMNS = ["file_name", "id", "group", "label"]
+
+def _lit_dtype(value) -> pl.DataType:
+    # the type of a column made with pl.lit(value)
+    return pl.select(pl.lit(value)).dtypes[0]
+
+def _track_metadata(track) -> dict:
+    metadata = {
+        "file_name": track.file_name or None,
+        "id": track.id or None,
+        "group": track.group or None,
+        "label": None
+    }
+    if isinstance(track.interval, (SequenceInterval, TokenInterval)):
+        metadata["label"] = track.interval.label
+    return metadata
+
+def tracks_to_dataframe(
+        tracks: list,
+        output: Literal["formants", "param", "log_param"] = "formants",
+        candidates: list[int] = None
+) -> pl.DataFrame:
+    """Make one data frame of the data of many tracks, the same as
+    concatenating their `to_df()` data frames, in a single pass.
+
+    Each track's values are copied into column buffers made for all
+    the tracks' rows, and the values each track has one of, like its
+    error, max formant and metadata, are repeated to its rows in one
+    step, rather than making a data frame for each track.
+
+    Args:
+        tracks (list[OneTrack]): The tracks, for instance the candidates
+            of many tokens.
+        output (Literal["formants", "param", "log_param"], optional):
+            Whether to make the formant values or the smoothing
+            parameters. Defaults to "formants".
+        candidates (list[int], optional): A `candidate` number for each
+            track. If None, there is no `candidate` column.
+            Defaults to None.
+
+    Returns:
+        (pl.DataFrame): A `polars.DataFrame`.
+    """
+    if output not in ["formants", "param", "log_param"]:
+        raise ValueError("output must be 'formants', 'param', or 'log_param'")
+    if len(tracks) < 1:
+        return pl.DataFrame()
+
+    if output == "formants":
+        n_formants = tracks[0].n_formants
+        if any(track.n_formants != n_formants for track in tracks):
+            return _concat_tracks(tracks, output, candidates)
+        formant_names = [
+            f"F{x}" for x in np.arange(n_formants)+1
+        ]
+        names = formant_names + \
+            [f"{x}_s" for x in formant_names] + \
+            [f"B{x}" for x in np.arange(n_formants)+1]
+        blocks = [
+            (
+                track.formants[0:n_formants],
+                track.smoothed_formants[0:n_formants],
+                np.exp(track.smoothed_bandwidths[0:n_formants]),
+                track.time_domain
             )
-            for idx, x in enumerate(all_df)
+            for track in tracks
+        ]
+        n_rows = np.array([block[3].size for block in blocks])
+        offsets = np.concatenate([[0], np.cumsum(n_rows)])
+        buffer = np.empty((3 * n_formants + 1, offsets[-1]))
+        for (formants, smoothed, bandwidths, time), start, end in zip(
+            blocks, offsets[:-1], offsets[1:]
+        ):
+            buffer[0:n_formants, start:end] = formants
+            buffer[n_formants:2*n_formants, start:end] = smoothed
+            buffer[2*n_formants:3*n_formants, start:end] = bandwidths
+            buffer[-1, start:end] = time
+        values = {name: buffer[idx] for idx, name in enumerate(names)}
+        values["time"] = buffer[-1]
+        per_track = {
+            "error": [track.smooth_error for track in tracks],
+            "max_formant": [track.maximum_formant for track in tracks],
+            "n_formant": [track.n_formants for track in tracks],
+            "smooth_method": [
+                track.smoother.smooth_fun.__name__ for track in tracks
+            ]
+        }
+        order = names + ["error", "time", "max_formant", "n_formant", "smooth_method"]
+    else:
+        params = [
+            track.parameters if output == "param" else track.log_parameters
+            for track in tracks
         ]
+        shape = params[0].shape
+        if any(x.shape != shape for x in params):
+            return _concat_tracks(tracks, output, candidates)
+        names = [f"F{x}" for x in np.arange(shape[0])+1]
+        n_params = shape[1]
+        n_rows = np.full(len(tracks), n_params)
+        buffer = np.empty((len(names), n_params * len(tracks)))
+        for idx, x in enumerate(params):
+            buffer[:, idx*n_params:(idx+1)*n_params] = x
+        values = {
+            "param": np.tile(np.arange(n_params, dtype = np.uint32), len(tracks))
+        }
+        values.update({name: buffer[idx] for idx, name in enumerate(names)})
+        per_track = {"error": [track.smooth_error for track in tracks]}
+        order = ["param"] + names + ["error"]
+
+    metadata = [_track_metadata(track) for track in tracks]
+    for name in METADATA_COLUMNS:
+        column = [x[name] for x in metadata]
+        if any(x is not None for x in column):
+            per_track[name] = column
+    if candidates is not None:
+        per_track["candidate"] = list(candidates)
+    # columns go in the order they first come in the
+    # tracks' data frames, as a diagonal concat puts them
+    for x in metadata:
+        columns = [name for name in METADATA_COLUMNS if x[name] is not None]
+        if candidates is not None:
+            columns.append("candidate")
+        order.extend(name for name in columns if name not in order)
+
+    track_df = pl.DataFrame({
+        name: pl.Series(
+            name,
+            column,
+            dtype = _lit_dtype(next(
+                (x for x in column if x is not None), ""
+            ))
+        )
+        for name, column in per_track.items()
+    })
+    # each track's row, repeated for each of its rows
+    track_rows = np.repeat(np.arange(len(tracks)), n_rows)
+    df = pl.DataFrame(values).hstack(track_df[track_rows])
+    return df.select(order)
+
+def _concat_tracks(tracks, output, candidates = None) -> pl.DataFrame:
+    # tracks with different columns, one data frame at a time
+    all_df = [x.to_df(output = output) for x in tracks]
+    if candidates is not None:
+        all_df = [
+            x.with_columns(candidate = idx)
+            for idx, x in zip(candidates, all_df)
+        ]
+    return pl.concat(all_df, how = "diagonal")
+
+def candidates_to_dataframe(
+        candidates: list,
+        which: Literal["winner", "all"] = "winner",
+        output: Literal["formants", "param", "log_param"] = "formants"
+) -> pl.DataFrame:
+    """Make one data frame of the data of many tokens' candidates,
+    the same as concatenating their `to_df()` data frames, with
+    [](`~fasttrackpy.processors.outputs.tracks_to_dataframe`).
+
+    Args:
+        candidates (list[CandidateTracks]): The candidate tracks of
+            each token.
+        which (Literal["winner", "all"], optional): Whether to make the
+            winners' data, or all candidates'. Defaults to "winner".
+        output (Literal["formants", "param", "log_param"], optional):
+            Whether to make the formant values or the smoothing
+            parameters. Defaults to "formants".
 
-        big_df = pl.concat(all_df, how = "diagonal")
-        return big_df
+    Returns:
+        (pl.DataFrame): A `polars.DataFrame`.
+    """
+    if which == "winner":
+        return tracks_to_dataframe(
+            [cand.winner for cand in candidates],
+            output = output
+        )
+    tracks = []
+    numbers = []
+    for cand in candidates:
+        tracks.extend(cand.candidates)
+        numbers.extend(range(1, len(cand) + 1))
+    return tracks_to_dataframe(tracks, output = output, candidates = numbers)
+
+def get_big_df(self, output):
+        return tracks_to_dataframe(
+            self.candidates,
+            output = output,
+            candidates = range(1, len(self.candidates) + 1)
+        )
 
 def write_data(
         candidates,
@@ -150,8 +393,26 @@ def write_data(
         destination: Path = None,
         which: str = "winner",
         output: str = "formants",
-        separate: bool = False
+        separate: bool = False,
+        format: Literal["csv", "parquet", "ipc"] = "csv",
+        partition: bool = False
 ):
+    if format != "csv" or partition:
+        # streamed, without concatenating the data frames
+        if type(candidates) is not list:
+            candidates = [candidates]
+        write_data_iter(
+            candidates,
+            file = file,
+            destination = destination,
+            which = which,
+            output = output,
+            separate = separate,
+            format = format,
+            partition = partition
+        )
+        return
+
     if destination and not isinstance(destination, Path):
         destination = Path(destination)
 
@@ -159,10 +420,7 @@ def write_data(
         file = Path(file)
 
     if type(candidates) is list:
-        df = pl.concat(
-            [x.to_df(which = which, output = output) for x in candidates],
-            how = "diagonal"
-        )
+        df = candidates_to_dataframe(candidates, which = which, output = output)
     else:
         df = candidates.to_df(which = which, output = output)
 
@@ -178,27 +436,18 @@ def write_data(
         return
 
     if destination and "file_name" in df.columns:
-        unique_entries = df \
-            .select("file_name", "group")\
-            .unique()\
-            .with_columns(
-                pl.concat_str(
-                    [pl.col("file_name"),
-                     pl.col("group")],
-                     separator="_"
-                ).alias("newname")
-            ) \
-            .rows_by_key("newname", named = True)
-
-        for newname in unique_entries:
-            out_df = df \
-                .filter(
-                    (pl.col("file_name") == unique_entries[newname][0]["file_name"]) &
-                    (pl.col("group") == unique_entries[newname][0]["group"])
-                )
-
+        # one pass over the rows, rather than a filter per group
+        partitions = df.partition_by(
+            [key for key in PARTITION_KEYS if key in df.columns],
+            as_dict = True
+        )
+        for (file_name, *group), out_df in partitions.items():
             out_df.write_csv(
-                file = str(destination.joinpath(newname).with_suffix(".csv").resolve())
+                file = str(
+                    destination.joinpath(
+                        _separate_name(file_name, group[0] if group else None)
+                    ).with_suffix(".csv").resolve()
+                )
             )
         return
 
@@ -210,6 +459,443 @@ def write_data(
     raise ValueError("Either 'file' or 'destination' needs to be set")
 
 
+def _check_columns(df: pl.DataFrame, columns: list[str], path: Path):
+    # a streamed file's columns are set by its first data, so
+    # data with more columns can't be written to it.
+    extra = [col for col in df.columns if col not in columns]
+    if extra:
+        raise ValueError(
+            f"Data with columns {extra} can't be added to {path}, "\
+            f"whose columns are {list(columns)}. Write all the "\
+            "candidates at once with write_data() instead."
+        )
+
+class FrameSink:
+    """
+    Stream data frames to a Parquet or Arrow IPC file with zstd
+    compression as they are written, without keeping them in memory.
+
+    The first data frame sets the file's columns and types. Later
+    ones are cast to them, with nulls for missing columns, and ones
+    with other columns raise a `ValueError`. `file_name`, `group` and
+    `label` are written as categoricals, with dictionary encoding.
+
+    The file is written by polars' streaming engine in a background
+    thread, and is complete once the sink is closed.
+
+    Args:
+        path (Path): The file to write.
+        format (Literal["parquet", "ipc"], optional): The file format.
+            Defaults to "parquet".
+        row_group_size (int, optional): The number of rows in each
+            Parquet row group. If None, polars' default. Defaults to None.
+
+    Attributes:
+        schema (pl.Schema): The file's columns and types, once the
+            first data frame is written.
+    """
+    def __init__(
+            self,
+            path: Path,
+            format: Literal["parquet", "ipc"] = "parquet",
+            row_group_size: int = None
+        ):
+        if format not in ["parquet", "ipc"]:
+            raise ValueError("format must be 'parquet' or 'ipc'")
+        self.path = Path(path)
+        self.format = format
+        self.row_group_size = row_group_size
+        self.schema = None
+        self._queue = queue.Queue(maxsize = SINK_QUEUE_SIZE)
+        self._thread = None
+        self._error = None
+
+    def _conform(self, df: pl.DataFrame) -> pl.DataFrame:
+        if self.schema is None:
+            df = df.with_columns(
+                pl.col(pl.Null).cast(pl.String)
+            ).with_columns(
+                pl.col(col).cast(pl.String).cast(pl.Categorical())
+                for col in DICTIONARY_COLUMNS
+                if col in df.columns
+            )
+            self.schema = df.schema
+            return df
+
+        _check_columns(df, self.schema.names(), self.path)
+        return df.select([
+            pl.col(col).cast(dtype)
+            if col in df.columns
+            else pl.lit(None, dtype = dtype).alias(col)
+            for col, dtype in self.schema.items()
+        ])
+
+    def _frames(self, with_columns, predicate, n_rows, batch_size):
+        while True:
+            df = self._queue.get()
+            if df is None:
+                return
+            if with_columns is not None:
+                df = df.select(with_columns)
+            if predicate is not None:
+                df = df.filter(predicate)
+            yield df
+
+    def _run(self):
+        frames = register_io_source(self._frames, schema = self.schema)
+        try:
+            if self.format == "parquet":
+                frames.sink_parquet(
+                    self.path,
+                    compression = "zstd",
+                    row_group_size = self.row_group_size
+                )
+            else:
+                frames.sink_ipc(self.path, compression = "zstd")
+        except BaseException as error:
+            self._error = error
+            # so that writing doesn't block
+            while self._queue.get() is not None:
+                pass
+
+    def write(self, df: pl.DataFrame):
+        """Add a data frame to the file.
+
+        Args:
+            df (pl.DataFrame): The data frame.
+        """
+        if self._error is not None:
+            raise self._error
+        df = self._conform(df)
+        if self._thread is None:
+            self._thread = threading.Thread(target = self._run, daemon = True)
+            self._thread.start()
+        self._queue.put(df)
+
+    def close(self):
+        """Finish writing the file."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def _separate_name(file_name: str, group: str|None) -> str:
+    # the name of a file name and group's separate output,
+    # which is just the file name for tokens without a group
+    if group is None:
+        return str(file_name)
+    return f"{file_name}_{group}"
+
+def _output_path(
+        df: pl.DataFrame,
+        file: Path = None,
+        destination: Path = None,
+        separate: bool = False,
+        suffix: str = ".csv"
+) -> Path:
+    if file:
+        return file
+
+    if destination and "file_name" in df.columns and not separate:
+        return destination.joinpath(
+            df["file_name"][0]
+        ).with_suffix(suffix)
+
+    if destination and "file_name" in df.columns:
+        group = df["group"][0] if "group" in df.columns else None
+        return destination.joinpath(
+            _separate_name(df["file_name"][0], group)
+        ).with_suffix(suffix)
+
+    if destination:
+        return destination.joinpath("output").with_suffix(suffix)
+
+    raise ValueError("Either 'file' or 'destination' needs to be set")
+
+def partition_dir(destination: Path, df: pl.DataFrame) -> Path:
+    """The Hive-style partition directory of a data frame's
+    file name and group, like `file_name=<file>/group=<group>`,
+    with their values percent-encoded.
+
+    Args:
+        destination (Path): The output directory.
+        df (pl.DataFrame): The data frame of a token.
+
+    Returns:
+        (Path): The directory.
+    """
+    path = Path(destination)
+    for key in PARTITION_KEYS:
+        value = df[key][0] if key in df.columns else None
+        value = HIVE_NULL if value is None \
+            else urllib.parse.quote(str(value), safe = "")
+        path = path.joinpath(f"{key}={value}")
+    return path
+
+class PartitionWriter:
+    """
+    Writes the data frames of a chunk of tokens to Hive-style
+    partitions, like `partition=True` in
+    [](`~fasttrackpy.processors.outputs.write_data_iter`), from the
+    worker that analyzed them. Only the paths and row counts of the
+    files it wrote go back to the main process.
+
+    Each chunk's data goes into a file named after the chunk's
+    `part` number in each of its partitions, so chunks of the same
+    file don't write to the same files.
+
+    Args:
+        destination (Path): The output directory.
+        format (Literal["csv", "parquet", "ipc"], optional): The file
+            format. Defaults to "parquet".
+        which (str, optional): Whether to write the winner or all
+            candidates. Defaults to "winner".
+        output (str, optional): Whether to write formants, parameters
+            or log parameters. Defaults to "formants".
+    """
+    def __init__(
+            self,
+            destination: Path,
+            format: Literal["csv", "parquet", "ipc"] = "parquet",
+            which: str = "winner",
+            output: str = "formants"
+        ):
+        if format not in OUTPUT_FORMATS:
+            raise ValueError(f"format must be one of {OUTPUT_FORMATS}")
+        self.destination = Path(destination)
+        self.format = format
+        self.which = which
+        self.output = output
+
+    def write(self, dfs: list[pl.DataFrame], part: int) -> list[dict]:
+        """Write a chunk's data frames to their partitions.
+
+        Args:
+            dfs (list[pl.DataFrame]): The data frames of the chunk's tokens.
+            part (int): The chunk's number among its file's chunks.
+
+        Returns:
+            (list[dict]): The `path` and number of `rows` of each
+                file written.
+        """
+        if not dfs:
+            return []
+        df = pl.concat(dfs, how = "diagonal")
+        keys = [key for key in PARTITION_KEYS if key in df.columns]
+        part_dfs = df.partition_by(keys) if keys else [df]
+
+        parts = []
+        for part_df in part_dfs:
+            directory = partition_dir(self.destination, part_df)
+            directory.mkdir(parents = True, exist_ok = True)
+            path = directory.joinpath(
+                f"{part:08}{OUTPUT_SUFFIXES[self.format]}"
+            )
+            if self.format == "csv":
+                part_df.write_csv(path)
+            else:
+                with FrameSink(path, format = self.format) as sink:
+                    sink.write(part_df)
+            parts.append({"path": str(path), "rows": part_df.height})
+        return parts
+
+    @property
+    def index_path(self) -> Path:
+        """The file listing the files of a run."""
+        return self.destination.joinpath("fasttrack_parts.json")
+
+    def save_index(self, parts: list[dict]):
+        """Write the list of files of a run to `index_path`.
+
+        Args:
+            parts (list[dict]): The files, as returned by `write()`.
+        """
+        with self.index_path.open("w") as file:
+            json.dump(
+                {
+                    "format": self.format,
+                    "rows": sum(x["rows"] for x in parts),
+                    "parts": parts
+                },
+                file,
+                indent = 1
+            )
+
+def write_data_iter(
+        candidates,
+        file: Path = None,
+        destination: Path = None,
+        which: str = "winner",
+        output: str = "formants",
+        separate: bool = False,
+        manifest = None,
+        format: Literal["csv", "parquet", "ipc"] = "csv",
+        partition: bool = False
+):
+    """Write candidates to csv, Parquet or Arrow IPC files as they
+    come in, without keeping them all in memory. The files are the
+    same that `write_data()` would write for a list of the candidates.
+    A file's columns are those of the first data written to it, and
+    later data with columns it doesn't have raises a `ValueError`
+    rather than being dropped. Candidates from the same kind of input,
+    like the tokens of a corpus, always have the same columns.
+
+    Args:
+        candidates (Iterable[CandidateTracks]): An iterable of
+            candidate tracks, like a generator from
+            [](`~fasttrackpy.patterns.corpus.iter_corpus`).
+        file (Path, optional): A file to write all the data to.
+            Defaults to None.
+        destination (Path, optional): A directory to write files to.
+            Defaults to None.
+        which (str, optional): Whether to write the winner or all
+            candidates. Defaults to "winner".
+        output (str, optional): Whether to write formants, parameters
+            or log parameters. Defaults to "formants".
+        separate (bool, optional): Whether to write a file for each
+            file name and group. Defaults to False.
+        manifest (Manifest, optional): A
+            [](`~fasttrackpy.utils.manifest.Manifest`) to record the
+            outputs in, shared with
+            [](`~fasttrackpy.patterns.corpus.iter_corpus`). Outputs it
+            already has are appended to, and if writing stops with an
+            error or an interrupt, the rows of the unfinished file are
+            removed. Only for csv files. Defaults to None.
+        format (Literal["csv", "parquet", "ipc"], optional): The file
+            format. Parquet and Arrow IPC files are streamed with a
+            [](`~fasttrackpy.processors.outputs.FrameSink`), and if
+            writing stops, they are closed with the rows written so far.
+            Defaults to "csv".
+        partition (bool, optional): Whether to write a Hive-style
+            directory tree in `destination`, with a directory for each
+            file name and group, that polars can scan with
+            `pl.scan_parquet(destination)`. A file name's partitions are
+            closed when the next file name comes, and a partition that
+            comes back gets another file. Only for parquet and ipc files.
+            Defaults to False.
+    """
+    if format not in OUTPUT_FORMATS:
+        raise ValueError(f"format must be one of {OUTPUT_FORMATS}")
+
+    if partition and (format == "csv" or not destination or file):
+        raise ValueError(
+            "Partitioned output needs a destination and "\
+            "the parquet or ipc format."
+        )
+
+    if manifest is not None and format != "csv":
+        raise ValueError("A manifest can only be kept for csv files.")
+
+    if destination and not isinstance(destination, Path):
+        destination = Path(destination)
+
+    if file and not isinstance(file, Path):
+        file = Path(file)
+
+    if not file and not destination:
+        raise ValueError("Either 'file' or 'destination' needs to be set")
+
+    suffix = OUTPUT_SUFFIXES[format]
+    # the columns written to each file, in order.
+    headers = {}
+    # the parquet or ipc writer of each file.
+    sinks = {}
+    # the number of files written to each partition,
+    # and the file name of the open partitions.
+    n_parts = {}
+    open_file_name = None
+    # the first file of a single output is named after
+    # the first data, and all the data goes into it.
+    single_path = None
+    if manifest is not None:
+        # the outputs of the run being resumed
+        headers = {
+            Path(path): output["columns"]
+            for path, output in manifest.outputs.items()
+        }
+        if headers and not separate:
+            single_path = next(iter(headers))
+
+    try:
+        for cand in candidates:
+            df = cand.to_df(which = which, output = output)
+            if partition:
+                file_name = df["file_name"][0] \
+                    if "file_name" in df.columns else None
+                if file_name != open_file_name:
+                    # a file's tokens come together, so its
+                    # partitions are done
+                    for sink in sinks.values():
+                        sink.close()
+                    sinks = {}
+                    open_file_name = file_name
+                directory = partition_dir(destination, df)
+                if directory not in sinks:
+                    directory.mkdir(parents = True, exist_ok = True)
+                    part = n_parts.get(directory, 0)
+                    n_parts[directory] = part + 1
+                    sinks[directory] = FrameSink(
+                        directory.joinpath(f"{part:08}{suffix}"),
+                        format = format
+                    )
+                sinks[directory].write(df)
+                continue
+
+            if single_path is not None:
+                path = single_path
+            else:
+                path = _output_path(df, file, destination, separate, suffix)
+                if manifest is not None:
+                    path = path.resolve()
+                if not separate:
+                    single_path = path
+
+            if format != "csv":
+                if path not in sinks:
+                    sinks[path] = FrameSink(path, format = format)
+                sinks[path].write(df)
+                continue
+
+            if path in headers:
+                _check_columns(df, headers[path], path)
+                df = df.select([
+                    pl.col(col) if col in df.columns else pl.lit(None).alias(col)
+                    for col in headers[path]
+                ])
+                with open(path, "a") as out_file:
+                    df.write_csv(out_file, include_header = False)
+            else:
+                headers[path] = df.columns
+                with open(path, "w") as out_file:
+                    df.write_csv(out_file)
+
+            if manifest is not None:
+                manifest.written(path, headers[path])
+    except BaseException:
+        if manifest is not None:
+            # stop the workers before the outputs are cut back
+            if hasattr(candidates, "close"):
+                candidates.close()
+            manifest.rollback()
+        for sink in sinks.values():
+            try:
+                sink.close()
+            except Exception:
+                pass
+        raise
+
+    for sink in sinks.values():
+        sink.close()
+
 def spectrogram(
         self,
         formants:int = 3,
@@ -425,6 +1111,12 @@ def pickle_candidates(
     objects are handled, only use `unpickle_candidates()`
     to re-load the pickle object.
 
+    The pickle holds the whole object, with its samples
+    and TextGrid interval, and is loaded whole. To save the
+    candidates of many tokens, use
+    [](`~fasttrackpy.processors.archive.write_archive`),
+    which can read one token without loading the rest.
+
     Args:
         candidates (CandidateTracks):
             A CandidateTracks object to pickle.
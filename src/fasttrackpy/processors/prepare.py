@@ -0,0 +1,300 @@
+import numpy as np
+import parselmouth as pm
+import scipy.signal
+from fractions import Fraction
+from typing import Literal
+from joblib import delayed
+
+from fasttrackpy.processors.formants import track_formants_batch,\
+                                            candidate_pool
+
+# The largest denominator of the up/down ratio of the
+# polyphase resampler. The resampled rate is within
+# about a millionth of the target rate.
+POLYPHASE_MAX_DENOMINATOR = 1000
+
+class PreparedWindow:
+    """
+    One token's window cut from a sound that was already
+    resampled to twice each max formant and pre-emphasized.
+    Made by [](`~fasttrackpy.processors.prepare.prepare_windows`).
+
+    Args:
+        max_formants (np.ndarray):
+            The max formants the window was prepared for.
+        signals (list[tuple[np.ndarray, float, float]]):
+            For each max formant, the window's samples, their sampling
+            frequency and their start time, relative to the window start.
+    """
+    def __init__(
+            self,
+            max_formants: np.ndarray,
+            signals: list[tuple[np.ndarray, float, float]]
+        ):
+        self.max_formants = np.asarray(max_formants)
+        self.signals = signals
+
+    def _signal_indices(self, max_formants: np.ndarray) -> list[int]:
+        indices = []
+        for max_formant in max_formants:
+            idx = np.flatnonzero(np.isclose(self.max_formants, max_formant))
+            if idx.size < 1:
+                raise ValueError(
+                    f"The window wasn't prepared for a max formant of {max_formant}"
+                )
+            indices.append(idx[0])
+        return indices
+
+    def select(self, max_formants: np.ndarray) -> "PreparedWindow":
+        """The window prepared for only some of its max formants.
+
+        Args:
+            max_formants (np.ndarray): The max formants to keep.
+                Each must be one the window was prepared for.
+
+        Returns:
+            (PreparedWindow): A window with just their signals.
+        """
+        indices = self._signal_indices(max_formants)
+        return PreparedWindow(
+            self.max_formants[indices],
+            [self.signals[idx] for idx in indices]
+        )
+
+    def track_formants(
+            self,
+            max_formants: np.ndarray,
+            n_formants: int = 4,
+            window_length: float = 0.025,
+            time_step: float = 0.002,
+            engine: Literal["praat", "numba"] = "praat",
+            return_bandwidths: bool = True,
+            n_jobs: int = 1
+        ) -> list[tuple[np.ndarray, np.ndarray|None, np.ndarray]]:
+        """Formant analysis of the prepared window at
+        each of the max formants.
+
+        Args:
+            max_formants (np.ndarray): The max formant values to analyze.
+                Each must be one the window was prepared for.
+            n_formants (int, optional): The number of formants to return.
+                Defaults to 4.
+            window_length (float, optional): Window length of the formant
+                analysis. Defaults to 0.025.
+            time_step (float, optional): Time step of the formant analyusis
+                window. Defaults to 0.002.
+            engine (Literal["praat", "numba"], optional): The formant
+                analysis engine. Defaults to "praat".
+            return_bandwidths (bool, optional): Whether to get bandwidths.
+                Defaults to True.
+            n_jobs (int, optional): The number of workers to split the
+                max formants between, as in
+                [](`~fasttrackpy.processors.formants.track_formants_batch`).
+                Defaults to 1.
+
+        Returns:
+            (list[tuple[np.ndarray, np.ndarray|None, np.ndarray]]): For
+                each max formant, a tuple of the (formants, time) formant
+                and bandwidth arrays and the time domain.
+        """
+        if n_jobs > 1 and len(max_formants) > 1:
+            chunks = np.array_split(
+                np.asarray(max_formants),
+                min(n_jobs, len(max_formants))
+            )
+            # each chunk only gets the signals it analyzes
+            analyses = candidate_pool(engine, len(chunks))(
+                delayed(self.select(chunk).track_formants)(
+                    max_formants = chunk,
+                    n_formants = n_formants,
+                    window_length = window_length,
+                    time_step = time_step,
+                    engine = engine,
+                    return_bandwidths = return_bandwidths
+                )
+                for chunk in chunks
+            )
+            return [x for chunk in analyses for x in chunk]
+
+        results = []
+        for idx in self._signal_indices(max_formants):
+            samples, sampling_frequency, xmin = self.signals[idx]
+            # At the prepared rate, the analysis doesn't resample,
+            # and an infinite pre-emphasis frequency leaves the
+            # already pre-emphasized samples as they are.
+            results += track_formants_batch(
+                samples = samples,
+                sampling_frequency = sampling_frequency,
+                max_formants = [sampling_frequency / 2],
+                xmin = xmin,
+                n_formants = n_formants,
+                window_length = window_length,
+                time_step = time_step,
+                pre_emphasis_from = np.inf,
+                engine = engine,
+                return_bandwidths = return_bandwidths
+            )
+        return results
+
+def _window_range(
+        x1: float,
+        dx: float,
+        n: int,
+        start: float,
+        end: float
+    ) -> tuple[int, int]:
+    # the samples whose centers are in the window,
+    # as in `Sound.extract_part()`
+    first = max(int(np.ceil((start - x1) / dx)), 0)
+    last = min(int(np.floor((end - x1) / dx)), n - 1)
+    return first, last
+
+def _cut_windows(
+        samples: np.ndarray,
+        sampling_frequency: float,
+        x1: float,
+        windows: list[tuple[float, float]],
+        pre_emphasis_from: float
+    ) -> list[tuple[np.ndarray, float, float]]:
+    dx = 1 / sampling_frequency
+    cuts = []
+    for start, end in windows:
+        first, last = _window_range(x1, dx, samples.size, start, end)
+        # the sample before the window is needed for its pre-emphasis
+        context = max(first - 1, 0)
+        emphasized = pre_emphasize(
+            samples[context:last+1],
+            sampling_frequency,
+            pre_emphasis_from
+        )
+        cuts.append((
+            emphasized[first-context:],
+            sampling_frequency,
+            x1 + first * dx - 0.5 * dx - start
+        ))
+    return cuts
+
+def resample_polyphase(
+        samples: np.ndarray,
+        sampling_frequency: float,
+        xmin: float,
+        new_frequency: float,
+        windows: list[tuple[float, float]],
+        pre_emphasis_from: float = 50
+    ) -> list[tuple[np.ndarray, float, float]]:
+    """Resample a mono sound with a polyphase filter, and cut
+    out and pre-emphasize its windows.
+
+    The up and down factors are a rational approximation of
+    the rate change, so the sampling frequency can be very
+    slightly off from `new_frequency`. The filter isn't the
+    one Praat uses, so the formants are an approximation of
+    those of each token's own resampling.
+
+    Args:
+        samples (np.ndarray): A 1D array of samples.
+        sampling_frequency (float): The sampling frequency.
+        xmin (float): The start time of the sound.
+        new_frequency (float): The new sampling frequency.
+        windows (list[tuple[float, float]]): The start and
+            end times of each window.
+        pre_emphasis_from (float, optional): Pre-emphasis threshold.
+            Defaults to 50.
+    Returns:
+        (list[tuple[np.ndarray, float, float]]): For each window, the
+            resampled samples, their sampling frequency, and their start
+            time relative to the window start.
+    """
+    ratio = Fraction(new_frequency / sampling_frequency)\
+        .limit_denominator(POLYPHASE_MAX_DENOMINATOR)
+    resampled = scipy.signal.resample_poly(
+        samples,
+        ratio.numerator,
+        ratio.denominator
+    )
+    # the first resampled sample lines up with the first original one
+    return _cut_windows(
+        resampled,
+        float(sampling_frequency * ratio),
+        xmin + 0.5 / sampling_frequency,
+        windows,
+        pre_emphasis_from
+    )
+
+def pre_emphasize(
+        samples: np.ndarray,
+        sampling_frequency: float,
+        pre_emphasis_from: float = 50
+    ) -> np.ndarray:
+    """Pre-emphasize samples the way Praat's formant analysis does.
+
+    Args:
+        samples (np.ndarray): A 1D array of samples.
+        sampling_frequency (float): The sampling frequency.
+        pre_emphasis_from (float, optional): Pre-emphasis threshold.
+            Defaults to 50.
+
+    Returns:
+        (np.ndarray): The pre-emphasized samples.
+    """
+    pre_emphasis = np.exp(-2.0 * np.pi * pre_emphasis_from / sampling_frequency)
+    emphasized = samples.copy()
+    emphasized[1:] -= pre_emphasis * samples[:-1]
+    return emphasized
+
+def prepare_windows(
+        sound: pm.Sound,
+        windows: list[tuple[float, float]],
+        max_formants: np.ndarray,
+        pre_emphasis_from: float = 50,
+        resampler: Literal["polyphase"] = "polyphase"
+    ) -> list[PreparedWindow]:
+    """Resample and pre-emphasize a sound once for each max
+    formant, and cut out the token windows.
+
+    This replaces the resampling and pre-emphasis that the formant
+    analysis of each token would otherwise repeat for every max
+    formant. Since the windows are cut from the prepared sound,
+    their edges see the sound around them, and their samples can be
+    offset from a separately extracted token by less than one sample.
+
+    Args:
+        sound (pm.Sound): The `parselmouth.Sound` of a whole file.
+        windows (list[tuple[float, float]]): The start and end times
+            of each token window.
+        max_formants (np.ndarray): The max formants to prepare for.
+        pre_emphasis_from (float, optional): Pre-emphasis threshold.
+            Defaults to 50.
+        resampler (Literal["polyphase"], optional): The resampler to
+            use. `"polyphase"` is
+            [](`~fasttrackpy.processors.prepare.resample_polyphase`),
+            whose formants approximate each token's own resampling.
+            Defaults to "polyphase".
+
+    Returns:
+        (list[PreparedWindow]): A prepared window for each token window.
+    """
+    if resampler != "polyphase":
+        raise ValueError("resampler must be 'polyphase'")
+
+    samples = np.asarray(sound.values, dtype=np.float64)
+    if samples.ndim > 1:
+        samples = samples.mean(axis = 0)
+
+    signals = [[] for _ in windows]
+    for max_formant in max_formants:
+        cuts = resample_polyphase(
+            samples = samples,
+            sampling_frequency = sound.sampling_frequency,
+            xmin = sound.xmin,
+            new_frequency = 2 * max_formant,
+            windows = windows,
+            pre_emphasis_from = pre_emphasis_from
+        )
+        for window_signals, cut in zip(signals, cuts):
+            window_signals.append(cut)
+
+    return [
+        PreparedWindow(max_formants, window_signals)
+        for window_signals in signals
+    ]
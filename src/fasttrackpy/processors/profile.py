@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from typing import Literal
+
+@dataclass
+class ComputeProfile:
+    """
+    What a set of formant tracks needs to compute beyond
+    the formants and their smoothed values, which every
+    loss function needs.
+
+    Args:
+        log_formants (bool):
+            Whether the log formants are smoothed, for
+            log parameter outputs and frequency heuristics.
+        bandwidths (bool):
+            Whether bandwidths are extracted and their logs
+            smoothed, for formant outputs and bandwidth heuristics.
+    """
+    log_formants: bool = True
+    bandwidths: bool = True
+
+def get_profile(
+        output: Literal["formants", "param", "log_param"] | None = "formants",
+        heuristics: list = []
+    ) -> ComputeProfile:
+    """
+    Get the compute profile for an output and set of heuristics.
+
+    Heuristics declare what they use with a `requires` property,
+    a set of `"log_formants"` and/or `"bandwidths"`. Heuristics
+    without one are assumed to need everything.
+
+    Args:
+        output (Literal["formants", "param", "log_param"] | None, optional):
+            The data that will be output. If None, everything is
+            computed. Defaults to "formants".
+        heuristics (list[MinMaxHeuristic|SpacingHeuristic], optional):
+            The heuristics that will be evaluated. Defaults to [].
+
+    Returns:
+        (ComputeProfile): The compute profile.
+    """
+    if output is None:
+        return ComputeProfile()
+
+    required = set()
+    if output == "formants":
+        required.add("bandwidths")
+    if output == "log_param":
+        required.add("log_formants")
+
+    for heuristic in heuristics:
+        required |= getattr(
+            heuristic,
+            "requires",
+            {"log_formants", "bandwidths"}
+        )
+
+    return ComputeProfile(
+        log_formants = "log_formants" in required,
+        bandwidths = "bandwidths" in required
+    )
@@ -1,5 +1,7 @@
 import numpy as np
 import scipy.fft
+import scipy.linalg
+from functools import lru_cache
 from typing import Union
 from collections.abc import Callable
 
@@ -28,7 +30,11 @@ class Smoother:
         method (Union[str, Callable], optional): The smoothing method to use.
             Defaults to "dct_smooth".
             Can be a custom smoother such that it takes a 1D array as input
-            and returns a `Smoothed` class.
+            and returns a `Smoothed` class. A custom smoother can opt into
+            batched smoothing by having a `batch` attribute, a function
+            that takes an `(..., time)` array and a `mask` argument, and
+            returns a `Smoothed` class of `(..., time)` smoothed values and
+            `(..., params)` parameters.
         kwargs : Any additional arguments or parameters for the `method`.
     """
     def __init__(
@@ -37,6 +43,7 @@ class Smoother:
         **kwargs
     ):
         self.smooth_fun = self._get_fun(method)
+        self.batch_fun = self._get_batch_fun(self.smooth_fun)
         self.method_args = kwargs
     
     def _get_fun(self, method):
@@ -46,6 +53,9 @@ class Smoother:
             return dct_smooth
         if method == "dct_smooth_regression":
             return dct_smooth_regression
+
+    def _get_batch_fun(self, smooth_fun):
+        return getattr(smooth_fun, "batch", None)
         
     def smooth(
             self, 
@@ -61,6 +71,43 @@ class Smoother:
         """
         return self.smooth_fun(x, **self.method_args)
 
+    def smooth_batch(
+            self,
+            X: np.ndarray,
+            mask: np.ndarray = None
+        ) -> Smoothed:
+        """Apply the smoother function to every series in an array
+
+        If the smoother function has no batched version, it is applied
+        to one series at a time.
+
+        Args:
+            X (np.ndarray): An `(..., time)` shaped array, e.g.
+                `(formants, time)` or `(candidates, formants, time)`.
+            mask (np.ndarray, optional): A boolean array the shape of `X`
+                that is `True` for values to leave out of the fit.
+                Defaults to `np.isnan(X)`.
+
+        Returns:
+            (Smoothed): A `Smoothed` object with `(..., time)` smoothed
+                values and `(..., params)` parameters.
+        """
+        X = np.asarray(X, dtype=float)
+        if self.batch_fun is not None:
+            return self.batch_fun(X, mask=mask, **self.method_args)
+
+        if mask is not None:
+            X = np.where(mask, np.nan, X)
+
+        rows = X.reshape(-1, X.shape[-1])
+        smoothed_list = [self.smooth(x) for x in rows]
+        smoothed = np.array([x.smoothed for x in smoothed_list])
+        params = np.array([x.params for x in smoothed_list])
+        return Smoothed(
+            smoothed = smoothed.reshape(X.shape[:-1] + smoothed.shape[1:]),
+            params = params.reshape(X.shape[:-1] + params.shape[1:])
+        )
+
 def dct_smooth(
         x:np.array, 
         order:int = 5
@@ -82,6 +129,134 @@ def dct_smooth(
         params=coef_subset
     )
 
+def dct_smooth_batch(
+        X: np.ndarray,
+        mask: np.ndarray = None,
+        order: int = 5
+    ) -> Smoothed:
+    """A batched DCT Smoother
+
+    Args:
+        X (np.ndarray): An `(..., time)` array of values to smooth.
+        mask (np.ndarray, optional): A boolean array the shape of `X`
+            that is `True` for values to leave out. Masked values
+            are set to `np.nan`. Defaults to None.
+        order (int, optional): DCT Order. Defaults to 5.
+
+    Returns:
+        (Smoothed): See `Smoothed`
+    """
+    X = np.asarray(X, dtype=float)
+    if mask is not None:
+        X = np.where(mask, np.nan, X)
+    coefs = scipy.fft.dct(X, axis=-1)
+    coef_subset = coefs[..., 0:order]
+    smooth = scipy.fft.idct(coef_subset, n = X.shape[-1], axis=-1)
+    return Smoothed(
+        smoothed=smooth,
+        params=coef_subset
+    )
+
+dct_smooth.batch = dct_smooth_batch
+
+@lru_cache(maxsize=64)
+def _dct_basis(N: int, order: int) -> np.ndarray:
+    """The (order, N) DCT regression predictors"""
+    predictors = (scipy.fft.dct(
+        np.eye(N), 
+        orthogonalize=True,
+        norm = "backward"
+    )[:,0:order]).T
+    predictors.flags.writeable = False
+    return predictors
+
+@lru_cache(maxsize=256)
+def _dct_solver(
+        N: int,
+        order: int,
+        missing: bytes = b""
+    ) -> Union[np.ndarray, None]:
+    """The (order, n_present) least squares solution matrix
+    for the DCT predictors at the non-missing frames, from a
+    Cholesky factorization of the normal equations. `missing`
+    is the packed bits of the missing value mask. Returns
+    `None` if the normal equations can't be solved.
+    """
+    predictors = _dct_basis(N, order)
+    present = ~np.unpackbits(
+        np.frombuffer(missing, dtype=np.uint8),
+        count = N
+    ).astype(bool) if missing else np.ones(N, dtype=bool)
+    predictors_to_use = predictors[:, present].T
+
+    try:
+        factor = scipy.linalg.cho_factor(
+            np.dot(predictors_to_use.T, predictors_to_use)
+        )
+        solver = scipy.linalg.cho_solve(factor, predictors_to_use.T)
+    except (np.linalg.LinAlgError, ValueError):
+        return None
+
+    solver.flags.writeable = False
+    return solver
+
+def dct_smooth_regression_batch(
+        X: np.ndarray,
+        mask: np.ndarray = None,
+        order: int = 5
+    ) -> Smoothed:
+    """A batched DCT Smoother using regression
+
+    Every series with the same missing values shares one
+    cached factorization, and all of them are fit with one
+    matrix product.
+
+    Args:
+        X (np.ndarray): An `(..., time)` array to smooth
+        mask (np.ndarray, optional): A boolean array the shape of `X`
+            that is `True` for values to leave out of the fit.
+            Defaults to `np.isnan(X)`.
+        order (int, optional): Order of the DCT smoother.
+             Defaults to 5.
+
+    Returns:
+        (Smoothed): See `smoothed`
+    """
+    X = np.asarray(X, dtype=float)
+    N = X.shape[-1]
+    if mask is None:
+        mask = np.isnan(X)
+    else:
+        mask = np.asarray(mask, dtype=bool) | np.isnan(X)
+
+    rows = X.reshape(-1, N)
+    row_masks = mask.reshape(-1, N)
+    predictors = _dct_basis(N, order)
+    n_params = predictors.shape[0]
+    smooth = np.full(rows.shape, np.nan)
+    coefs = np.full((rows.shape[0], n_params), np.nan)
+
+    patterns, pattern_idx = np.unique(
+        row_masks,
+        axis = 0,
+        return_inverse = True
+    )
+    pattern_idx = pattern_idx.reshape(-1)
+
+    for i, pattern in enumerate(patterns):
+        missing = np.packbits(pattern).tobytes() if pattern.any() else b""
+        solver = _dct_solver(N, order, missing)
+        if solver is None:
+            continue
+        in_pattern = pattern_idx == i
+        pattern_coefs = np.dot(rows[in_pattern][:, ~pattern], solver.T)
+        coefs[in_pattern] = pattern_coefs
+        smooth[in_pattern] = np.dot(pattern_coefs, predictors)
+
+    return Smoothed(
+        smoothed = smooth.reshape(X.shape),
+        params = coefs.reshape(X.shape[:-1] + (n_params,))
+    )
 
 def dct_smooth_regression(
         x:np.array, 
@@ -98,35 +273,13 @@ def dct_smooth_regression(
         (Smoothed): See `smoothed`
     """
 
-    y = np.array (x)
-    N = x.size
-    predictors = (scipy.fft.dct(
-        np.eye(N), 
-        orthogonalize=True,
-        norm = "backward"
-    )[:,0:order]).T
-
-    nan_entries = np.isnan(y)
-    
-    y_to_fit = y[~nan_entries]
-    predictors_to_use = predictors[:,~nan_entries].T
-
-    try:
-        coefs = np.dot(
-            (np.linalg.inv(
-                np.dot(predictors_to_use.T,
-                    predictors_to_use)
-                )
-            ), 
-            np.dot(
-                predictors_to_use.T,
-                y_to_fit)
-            )
-        smooth = np.dot(predictors.T, coefs)
-    except:
-        smooth = np.full(y.shape, np.nan)
-        coefs = np.full((order,), np.nan)
+    smoothed = dct_smooth_regression_batch(
+        np.asarray(x)[None, :],
+        order = order
+    )
     return Smoothed(
-        smoothed=smooth,
-        params = coefs
-    )
\ No newline at end of file
+        smoothed=smoothed.smoothed[0],
+        params = smoothed.params[0]
+    )
+
+dct_smooth_regression.batch = dct_smooth_regression_batch
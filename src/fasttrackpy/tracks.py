@@ -1,18 +1,23 @@
 import parselmouth as pm
 import numpy as np
-from fasttrackpy.processors.smoothers import Smoother
+from fasttrackpy.processors.smoothers import Smoother, Smoothed
 from fasttrackpy.processors.losses import Loss
 from fasttrackpy.processors.aggs import Agg
+from fasttrackpy.processors.formants import track_formants_batch
+from fasttrackpy.processors.prepare import PreparedWindow
 from fasttrackpy.processors.outputs import formant_to_dataframe,\
                                            param_to_dataframe,\
                                            log_param_to_dataframe,\
                                            get_big_df,\
                                            spectrogram,\
-                                           candidate_spectrograms
+                                           candidate_spectrograms,\
+                                           TokenInterval
 from fasttrackpy.processors.heuristic import (
     MinMaxHeuristic,
-    SpacingHeuristic
+    SpacingHeuristic,
+    eval_heuristics
 )
+from fasttrackpy.processors.profile import get_profile
 
 import matplotlib.pyplot as mp
 from aligned_textgrid import SequenceInterval
@@ -20,21 +25,117 @@ from aligned_textgrid.sequences.tiers import TierGroup
 
 import polars as pl
 from collections.abc import Sequence
+from collections import namedtuple
 
 from typing import Union, Literal
 import warnings
 import logging
 
 
-def _make_candidate(args_dict):
-    track = OneTrack(**args_dict)
-    return track
+# The error over max formants can have more than one dip, so
+# coarse to fine searches refine around this many of the best
+# candidates, not just the best one.
+REFINE_AROUND = 3
+
+# The fields of a CandidateRecord, and the CandidateTracks
+# attributes they hold.
+RECORD_FIELDS = {
+    "sampling_frequency": "_sampling_frequency",
+    "xmin": "_xmin",
+    "min_max_formant": "min_max_formant",
+    "max_max_formant": "max_max_formant",
+    "nstep": "nstep",
+    "n_formants": "n_formants",
+    "window_length": "window_length",
+    "time_step": "time_step",
+    "pre_emphasis_from": "pre_emphasis_from",
+    "engine": "engine",
+    "profile": "profile",
+    "keep_candidates": "keep_candidates",
+    "search": "search",
+    "search_tolerance": "search_tolerance",
+    "n_analyses": "n_analyses",
+    "kept": "_kept",
+    "unsmoothed": "_unsmoothed",
+    "n_frames": "n_frames",
+    "time_domains": "time_domains",
+    "formants": "formants",
+    "bandwidths": "bandwidths",
+    "smoothed_formants": "_smoothed_formants",
+    "parameters": "_parameters",
+    "log_parameters": "log_parameters",
+    "bandwidth_parameters": "bandwidth_parameters",
+    "smooth_errors": "_smooth_errors",
+    "heuristic_errors": "heuristic_errors",
+    "total_errors": "total_errors",
+    "winner_idx": "winner_idx",
+    "file_name": "_file_name",
+    "id": "_id",
+    "group": "_group",
+    "label": "label"
+}
+
+# The arrays and settings of a CandidateTracks, without its
+# samples, processing objects or cached values, to return
+# from worker processes.
+CandidateRecord = namedtuple(
+    "CandidateRecord",
+    field_names = list(RECORD_FIELDS)
+)
+
+def _pad_frames(arrays: list[np.ndarray]) -> np.ndarray:
+    """Stack arrays with different numbers of frames (the last axis)
+    into one array, filling the missing frames with `np.nan`.
+    """
+    n_frames = max(x.shape[-1] for x in arrays)
+    stacked = np.full(
+        (len(arrays),) + arrays[0].shape[0:-1] + (n_frames,),
+        np.nan
+    )
+    for idx, x in enumerate(arrays):
+        stacked[idx, ..., 0:x.shape[-1]] = x
+    return stacked
+
+def _split_smoothed(smoothed: Smoothed) -> list[Smoothed]:
+    """Split a batch of smooths into a `Smoothed` per series."""
+    params = smoothed.params
+    if params is None:
+        params = [None] * len(smoothed.smoothed)
+    return [Smoothed(x, p) for x, p in zip(smoothed.smoothed, params)]
+
+def _concat_frames(
+        a: np.ndarray|None,
+        b: np.ndarray|None,
+        order: np.ndarray
+    ) -> np.ndarray|None:
+    """Concatenate two stacks of candidates with `_pad_frames()`
+    padding and put them in `order`.
+    """
+    if b is None:
+        return None
+    if a is None:
+        return b[order]
+    return _pad_frames([*a, *b])[order]
 
 class Track:
     """
     A generic track class to set up attribute values
     """
 
+    __slots__ = (
+        "_samples",
+        "_sampling_frequency",
+        "_xmin",
+        "_n_formants",
+        "window_length",
+        "time_step",
+        "pre_emphasis_from",
+        "_smoother",
+        "_loss_fun",
+        "_agg_fun",
+        "_sound"
+    )
+
     def __init__(
             self,
             sound: pm.Sound = None,
@@ -50,6 +151,7 @@ class Track:
             agg_fun: Agg = Agg()
     ):
         #self.sound = sound
+        self._sound = None
         if sound:
             self.samples = sound.values
             self.sampling_frequency = sound.sampling_frequency
@@ -66,14 +168,98 @@ class Track:
         self.loss_fun = loss_fun
         self.agg_fun = agg_fun
         
+    def _clear_cache(self):
+        """Drop the values derived from the track's inputs,
+        so they are recomputed on next access."""
+        self._sound = None
+
+    def __getstate__(self):
+        state = dict(getattr(self, "__dict__", {}))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        # parselmouth Sounds can't be pickled,
+        # and are rebuilt from the samples.
+        state["_sound"] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    @property
+    def samples(self):
+        return self._samples
+
+    @samples.setter
+    def samples(self, x):
+        self._samples = x
+        self._clear_cache()
+
+    @property
+    def sampling_frequency(self):
+        return self._sampling_frequency
+
+    @sampling_frequency.setter
+    def sampling_frequency(self, x):
+        self._sampling_frequency = x
+        self._clear_cache()
+
+    @property
+    def xmin(self):
+        return self._xmin
+
+    @xmin.setter
+    def xmin(self, x):
+        self._xmin = x
+        self._clear_cache()
+
+    @property
+    def n_formants(self):
+        return self._n_formants
+
+    @n_formants.setter
+    def n_formants(self, x):
+        self._n_formants = x
+        self._clear_cache()
+
+    @property
+    def smoother(self):
+        return self._smoother
+
+    @smoother.setter
+    def smoother(self, x):
+        self._smoother = x
+        self._clear_cache()
+
+    @property
+    def loss_fun(self):
+        return self._loss_fun
+
+    @loss_fun.setter
+    def loss_fun(self, x):
+        self._loss_fun = x
+        self._clear_cache()
+
+    @property
+    def agg_fun(self):
+        return self._agg_fun
+
+    @agg_fun.setter
+    def agg_fun(self, x):
+        self._agg_fun = x
+        self._clear_cache()
+
     @property
     def sound(self):
-        sound_obj = pm.Sound(
-            self.samples, 
-            sampling_frequency = self.sampling_frequency,
-            start_time = self.xmin
-        )
-        return sound_obj        
+        if self._sound is None:
+            self._sound = pm.Sound(
+                self.samples,
+                sampling_frequency = self.sampling_frequency,
+                start_time = self.xmin
+            )
+        return self._sound
 
 
 class OneTrack(Track):
@@ -113,19 +299,38 @@ class OneTrack(Track):
             Defaults to Agg().
         heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
             A list of formant tracking heuristics to use.
+        engine (Literal["praat", "numba"], optional): The formant
+            analysis engine. Defaults to "praat".
+        formants (np.ndarray, optional): Already estimated (formants, time)
+            formant values. If passed, along with `time_domain`, no formant
+            analysis is run.
+        bandwidths (np.ndarray, optional): Already estimated (formants, time)
+            bandwidth values. If `formants` are passed without bandwidths,
+            the formant analysis is only run if bandwidths are needed.
+        time_domain (np.ndarray, optional): The analysis frame times of
+            already estimated formants.
+        prepared (PreparedWindow, optional): The sound's window, already
+            resampled and pre-emphasized for the max formant. If passed,
+            it is analyzed instead of the samples. See
+            [](`~fasttrackpy.processors.prepare.prepare_windows`).
 
     Attributes:
         maximum_formant (float): The max formant
         time_domain (np.array): The time domain of the formant estimates
         formants (np.ndarray): A (formants, time) array of values. The formants
             as initially estimated by praat-parselmouth
+        bandwidths (np.ndarray): A (formants, time) array of bandwidths.
         smoothed_formants (np.ndarray): The smoothed formant values, using
             the method passed to `smoother`.
         parameters (np.ndarray): The smoothing parameters.
+        smoothed_list (list[Smoothed]): Deprecated. The smooth of
+            each formant, split from `smoothed`. `smoothed_log_list`,
+            `smoothed_b_list` and `smoothed_b_log_list` are the same
+            for `smoothed_log`, `smoothed_b` and `smoothed_b_log`.
         smooth_error (float): The error term between formants and
             smoothed formants.
         file_name (str): The filename of the audio file, if set.
-        interval (aligned_textgrid.SequenceInterval): The textgrid interval of the sound, if set.
+        interval (aligned_textgrid.SequenceInterval|TokenInterval): The textgrid interval of the sound, if set.
         id (str): The interval id of the sound, if set.
         group (str): The tier group name of the sound, if set.
     """
@@ -145,6 +350,11 @@ class OneTrack(Track):
             loss_fun: Loss = Loss(),
             agg_fun: Agg = Agg(),
             heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+            engine: Literal["praat", "numba"] = "praat",
+            formants: np.ndarray = None,
+            bandwidths: np.ndarray = None,
+            time_domain: np.ndarray = None,
+            prepared: PreparedWindow = None
         ):
         super().__init__(
             sound=sound,
@@ -160,84 +370,164 @@ class OneTrack(Track):
             agg_fun=agg_fun
         )
         self.maximum_formant = maximum_formant
+        self.engine = engine
+        self.prepared = prepared
 
-        self.formants, self.bandwidths, self._time_domain = self._track_formants()
-        self.smoothed_list = self._smooth_formants()
-        self.smoothed_b_list = self._smooth_bandwidths()
-        self.smoothed_b_log_list = self._smooth_log_bandwidths()
-        self.smoothed_log_list = self._smooth_log_formants()
-        self.heuristics = heuristics
         self._file_name = None
         self._id = None
         self._group = None
-        self._formant_df = None
-        self._param_df = None
-        self._log_param_df = None
         self._interval = None
+        if formants is not None:
+            if time_domain is None:
+                raise ValueError(
+                    "time_domain must be passed with formants"
+                )
+            self._formants = formants
+            self._bandwidths = bandwidths
+            self._time_domain = time_domain
+        else:
+            self._formants, self._bandwidths, self._time_domain = self._track_formants()
+        self.heuristics = heuristics
+        self._clear_cache()
 
     def __repr__(self):
         return f"A formant track object. {self.formants.shape}"
 
-    def _track_formants(self)->tuple[np.array, np.array, np.array]:
-        formant_obj = self.sound.to_formant_burg(
-            time_step = self.time_step,
-            max_number_of_formants = 5.5,
-            maximum_formant = self.maximum_formant,
+    def _track_formants(
+            self,
+            return_bandwidths: bool = True
+        )->tuple[np.array, np.array, np.array]:
+        if self.prepared is not None:
+            return self.prepared.track_formants(
+                max_formants = [self.maximum_formant],
+                n_formants = int(np.floor(self.n_formants)),
+                window_length = self.window_length,
+                time_step = self.time_step,
+                engine = self.engine,
+                return_bandwidths = return_bandwidths
+            )[0]
+
+        tracks, bandwidths, time_domain = track_formants_batch(
+            samples = self.samples,
+            sampling_frequency = self.sampling_frequency,
+            max_formants = [self.maximum_formant],
+            xmin = self.xmin,
+            n_formants = int(np.floor(self.n_formants)),
             window_length = self.window_length,
-            pre_emphasis_from = self.pre_emphasis_from
-        )
+            time_step = self.time_step,
+            pre_emphasis_from = self.pre_emphasis_from,
+            engine = self.engine,
+            return_bandwidths = return_bandwidths
+        )[0]
 
-        time_domain = formant_obj.xs()
-        tracks = np.array(
-            [
-                [
-                    formant_obj.get_value_at_time(i+1, x)
-                    for x in time_domain
-                ]
-                for i in range(int(np.floor(self.n_formants)))
-            ]
-        )
+        return tracks, bandwidths, time_domain
 
-        bandwidths = np.array(
-            [
-                [
-                    formant_obj.get_bandwidth_at_time(i+1, x)
-                    for x in time_domain
-                ]
-                for i in range(int(np.floor(self.n_formants)))
-            ]
+    def _clear_cache(self):
+        super()._clear_cache()
+        self._smoothed = None
+        self._smoothed_b = None
+        self._smoothed_b_log = None
+        self._smoothed_log = None
+        self._log_parameters = None
+        self._bandwidth_parameters = None
+        self._smooth_error = None
+        self._heuristic_error = None
+        self._clear_dfs()
+
+    def _clear_dfs(self):
+        self._formant_df = None
+        self._param_df = None
+        self._log_param_df = None
+
+    @property
+    def formants(self):
+        return self._formants
+
+    @formants.setter
+    def formants(self, x):
+        self._formants = x
+        self._clear_cache()
+
+    @property
+    def bandwidths(self):
+        if self._bandwidths is None:
+            _, self._bandwidths, _ = self._track_formants()
+        return self._bandwidths
+
+    @bandwidths.setter
+    def bandwidths(self, x):
+        self._bandwidths = x
+        self._clear_cache()
+
+    @property
+    def heuristics(self):
+        return self._heuristics
+
+    @heuristics.setter
+    def heuristics(self, x):
+        self._heuristics = x
+        self._heuristic_error = None
+
+    @property
+    def smoothed(self):
+        if self._smoothed is None:
+            self._smoothed = self._smooth_formants()
+        return self._smoothed
+
+    @property
+    def smoothed_log(self):
+        if self._smoothed_log is None:
+            self._smoothed_log = self._smooth_log_formants()
+        return self._smoothed_log
+
+    @property
+    def smoothed_b(self):
+        if self._smoothed_b is None:
+            self._smoothed_b = self._smooth_bandwidths()
+        return self._smoothed_b
+
+    @property
+    def smoothed_b_log(self):
+        if self._smoothed_b_log is None:
+            self._smoothed_b_log = self._smooth_log_bandwidths()
+        return self._smoothed_b_log
+
+    def _smoothed_list(self, name: str, replacement: str) -> list[Smoothed]:
+        warnings.warn(
+            f"OneTrack.{name} is deprecated, use OneTrack.{replacement}, "\
+            "which smooths all formants at once.",
+            DeprecationWarning,
+            stacklevel = 3
         )
+        return _split_smoothed(getattr(self, replacement))
 
-        return tracks, bandwidths, time_domain
+    @property
+    def smoothed_list(self) -> list[Smoothed]:
+        return self._smoothed_list("smoothed_list", "smoothed")
+
+    @property
+    def smoothed_log_list(self) -> list[Smoothed]:
+        return self._smoothed_list("smoothed_log_list", "smoothed_log")
+
+    @property
+    def smoothed_b_list(self) -> list[Smoothed]:
+        return self._smoothed_list("smoothed_b_list", "smoothed_b")
+
+    @property
+    def smoothed_b_log_list(self) -> list[Smoothed]:
+        return self._smoothed_list("smoothed_b_log_list", "smoothed_b_log")
 
     def _smooth_formants(self):
-        smoothed_list = [
-          self.smoother.smooth(x)
-            for x in self.formants
-        ]
-        return smoothed_list
+        return self.smoother.smooth_batch(self.formants)
     
     def _smooth_log_formants(self):
-        smoothed_list = [
-            self.smoother.smooth(x)
-            for x in np.log(self.formants)
-        ]
-
-        return smoothed_list
+        return self.smoother.smooth_batch(np.log(self.formants))
 
     def _smooth_bandwidths(self):
-        smoothed_b_list = [
-          self.smoother.smooth(x)
-            for x in self.bandwidths
-        ]
-        return smoothed_b_list
+        return self.smoother.smooth_batch(self.bandwidths)
     
     def _smooth_log_bandwidths(self):
-        smoothed_b_list = [
-            self.smoother.smooth(x)
-            for x in np.log(self.bandwidths)
-        ]
-        return smoothed_b_list
+        return self.smoother.smooth_batch(np.log(self.bandwidths))
 
     @property
     def time_domain(self):
@@ -249,52 +539,48 @@ class OneTrack(Track):
 
     @property
     def smoothed_formants(self):
-        return np.array(
-            [x.smoothed for x in self.smoothed_list]
-        )
+        return self.smoothed.smoothed
 
     @property
     def smoothed_bandwidths(self):
-        return np.array(
-            [x.smoothed for x in self.smoothed_b_log_list]
-        )
+        return self.smoothed_b_log.smoothed
 
     @property
     def parameters(self):
-        return np.array(
-            [x.params for x in self.smoothed_list]
-        )
+        return self.smoothed.params
     
     @property
     def log_parameters(self):
-        return np.array([
-            x.params for x in self.smoothed_log_list
-        ])
+        if self._log_parameters is None:
+            self._log_parameters = self.smoothed_log.params
+        return self._log_parameters
     
     @property
     def bandwidth_parameters(self):
-        return np.array(
-            [x.params for x in self.smoothed_b_log_list]
-        )
+        if self._bandwidth_parameters is None:
+            self._bandwidth_parameters = self.smoothed_b_log.params
+        return self._bandwidth_parameters
 
     @property
     def smooth_error(self):
-        msqe =  self.loss_fun.calculate_loss(
-            self.formants[0:self.n_formants],
-            self.smoothed_formants[0:self.n_formants]
-        )
-        error = self.agg_fun.aggregate(msqe)
-        return error
+        if self._smooth_error is None:
+            msqe =  self.loss_fun.calculate_loss(
+                self.formants[0:self.n_formants],
+                self.smoothed_formants[0:self.n_formants]
+            )
+            self._smooth_error = self.agg_fun.aggregate(msqe)
+        return self._smooth_error
     
     @property
     def heuristic_error(self):
-        error = 0
-        if len(self.heuristics) < 1:
-            return error
+        if self._heuristic_error is not None:
+            return self._heuristic_error
 
+        error = 0
         for heuristic in self.heuristics:
             error += heuristic.eval(self)
-        
+
+        self._heuristic_error = error
         return error
     
     @property
@@ -308,6 +594,7 @@ class OneTrack(Track):
     @file_name.setter
     def file_name(self, x):
         self._file_name = x
+        self._clear_dfs()
 
     @property
     def id(self):
@@ -316,6 +603,7 @@ class OneTrack(Track):
     @id.setter
     def id(self, x):
         self._id = x
+        self._clear_dfs()
 
     @property
     def interval(self):
@@ -328,13 +616,17 @@ class OneTrack(Track):
     @group.setter
     def group(self, groupname):
         self._group = groupname
+        self._clear_dfs()
 
     @interval.setter
     def interval(self, interval: SequenceInterval):
         self._interval = interval
+        self._clear_dfs()
         self.label = interval.label
         self.id = interval.id
-        self.group = self.__get_group(self._interval)
+        self.group = interval.group \
+            if isinstance(interval, TokenInterval) \
+            else self.__get_group(self._interval)
 
     def __get_group(self, interval):
         if isinstance(interval.within, TierGroup):
@@ -466,18 +758,126 @@ class CandidateTracks(Track, Sequence):
             Defaults to Agg().
         heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
             A list of formant tracking heuristics to use.
+        engine (Literal["praat", "numba"], optional): The formant
+            analysis engine. `"numba"` analyzes all max formants
+            in one batched call, and, where numba can vectorize them,
+            scores the built in losses with compiled kernels.
+            Defaults to "praat".
+        output (Literal["formants", "param", "log_param"] | None, optional):
+            The data that will be output. Along with the `heuristics`,
+            this decides what is computed up front, and bandwidths are
+            only extracted if something uses them. Other outputs are
+            still available, computed when asked for. If None,
+            everything is computed. Defaults to "formants".
+        keep_candidates (Literal["all", "winner"], optional): Whether to
+            keep the data of all candidates, or to drop everything but
+            the winner once the candidates are scored. If only the winner
+            is kept, it is the only item in the sequence.
+            Defaults to "all".
+        search (Literal["grid", "coarse_to_fine", "golden"], optional):
+            How to search the max formants. `"grid"` analyzes every
+            max formant. `"coarse_to_fine"` analyzes a sparse grid, then
+            repeatedly halves the spacing around the best few candidates so far.
+            `"golden"` analyzes a sparse grid, then narrows in around the
+            best candidate with a golden section search, which assumes the
+            error has a single dip there. Only the analyzed candidates are
+            kept.
+            Defaults to "grid".
+        search_tolerance (float, optional): For `"coarse_to_fine"` and
+            `"golden"` searches, stop refining once the spacing around
+            the best candidate is this many Hz or less. Defaults to 0,
+            which refines down to the grid spacing.
+        prepared (PreparedWindow, optional): The sound's window, already
+            resampled and pre-emphasized for every max formant. If passed,
+            it is analyzed instead of the samples, which are still used
+            for spectrograms. See
+            [](`~fasttrackpy.processors.prepare.prepare_windows`).
+        n_jobs (int, optional): The number of workers to split the
+            max formant analyses between. Use it when there are fewer
+            sounds to process than cores, since each worker gets a
+            share of the candidates. Defaults to 1.
+
+    The candidates are stored as `(candidates, formants, time)` arrays,
+    padded with `np.nan` when candidates have different numbers of frames.
+    `OneTrack` objects for them are made the first time they are
+    indexed, and kept, so changes made to them persist.
 
     Attributes:
         candidates (list[OneTrack,...]): A list of `OneTrack` tracks.
-        smooth_errors (np.array): The error terms for each treack in `candidates`
+        max_formants (np.array): The max formant of each candidate.
+        n_frames (np.array): The number of frames of each kept candidate.
+        time_domains (np.ndarray): A (candidates, time) array of
+            frame times.
+        formants (np.ndarray): A (candidates, formants, time) array
+            of formant values.
+        bandwidths (np.ndarray|None): A (candidates, formants, time)
+            array of bandwidths, if they were needed.
+        smoothed_formants (np.ndarray): A (candidates, formants, time)
+            array of smoothed formants.
+        parameters (np.ndarray): A (candidates, formants, params) array
+            of smoothing parameters.
+        log_parameters (np.ndarray|None): A (candidates, formants, params)
+            array of log formant smoothing parameters, if they were needed.
+        bandwidth_parameters (np.ndarray|None): A (candidates, formants, params)
+            array of log bandwidth smoothing parameters, if they were needed.
+        smooth_errors (np.array): The error terms for each max formant,
+            `np.nan` for any that weren't analyzed.
+        heuristic_errors (np.array): The heuristic error terms for each max formant.
+        total_errors (np.array): The total error terms for each max formant.
         winner_idx (int): The candidate track with the smallest error term
-        winner (OneTrack): The winning `OneTrack` track.
+        winner (OneTrack): The winning `OneTrack` track. It can be reassigned.
+        n_analyses (int): The number of max formants analyzed.
+        analyses_saved (int): The number of formant analyses saved
+            compared to analyzing every max formant.
+        profile (ComputeProfile): What is computed for the candidates.
         file_name (str): The filename of the audio file, if set.
-        interval (aligned_textgrid.SequenceInterval): The textgrid interval of the sound, if set.
+        interval (aligned_textgrid.SequenceInterval|TokenInterval): The textgrid interval of the sound, if set.
         id (str): The interval id of the sound, if set.
         group (str): The tier group name of the sound, if set.
     """
 
+    __slots__ = (
+        "min_max_formant",
+        "max_max_formant",
+        "nstep",
+        "max_formants",
+        "heuristics",
+        "engine",
+        "prepared",
+        "profile",
+        "keep_candidates",
+        "n_frames",
+        "time_domains",
+        "formants",
+        "bandwidths",
+        "_smoothed_formants",
+        "_parameters",
+        "log_parameters",
+        "bandwidth_parameters",
+        "_smooth_errors",
+        "_unsmoothed",
+        "heuristic_errors",
+        "total_errors",
+        "winner_idx",
+        "search",
+        "search_tolerance",
+        "n_jobs",
+        "n_analyses",
+        "label",
+        "_kept",
+        "_winner",
+        "_views",
+        "_file_name",
+        "_id",
+        "_label",
+        "_group",
+        "_formant_df",
+        "_param_df",
+        "_log_param_df",
+        "_interval",
+        "__dict__"
+    )
+
     def __init__(
         self,
         sound: pm.Sound = None,
@@ -494,7 +894,14 @@ class CandidateTracks(Track, Sequence):
         smoother: Smoother = Smoother(),
         loss_fun: Loss = Loss(),
         agg_fun: Agg = Agg(),
-        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = []
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+        engine: Literal["praat", "numba"] = "praat",
+        output: Literal["formants", "param", "log_param"] | None = "formants",
+        keep_candidates: Literal["all", "winner"] = "all",
+        search: Literal["grid", "coarse_to_fine", "golden"] = "grid",
+        search_tolerance: float = 0,
+        prepared: PreparedWindow = None,
+        n_jobs: int = 1
     ):
         super().__init__(
             sound=sound,
@@ -510,6 +917,9 @@ class CandidateTracks(Track, Sequence):
             agg_fun=agg_fun
         )
 
+        if keep_candidates not in ["all", "winner"]:
+            raise ValueError("keep_candidates must be 'all' or 'winner'")
+
         self.min_max_formant = min_max_formant
         self.max_max_formant = max_max_formant
         self.nstep = nstep
@@ -519,6 +929,19 @@ class CandidateTracks(Track, Sequence):
             num = self.nstep
         )
         self.heuristics = heuristics
+        self.engine = engine
+        self.prepared = prepared
+        self.keep_candidates = keep_candidates
+        self.search = search
+        self.search_tolerance = search_tolerance
+        self.n_jobs = n_jobs
+        self.profile = get_profile(
+            output = output,
+            heuristics = self.heuristics
+        )
+        self.label = None
+        self._winner = None
+        self._views = {}
         self._file_name = None
         self._id = None
         self._label = None
@@ -528,48 +951,524 @@ class CandidateTracks(Track, Sequence):
         self._log_param_df = None
         self._interval = None
 
-        to_process = [
-            {
-                "samples": self.samples,
-                "sampling_frequency": self.sampling_frequency,
-                "xmin": self.xmin,
-                "maximum_formant": max_formant,
-                "n_formants": self.n_formants,
-                "window_length": self.window_length,
-                "time_step": self.time_step,
-                "pre_emphasis_from": self.pre_emphasis_from,
-                "smoother": self.smoother,
-                "loss_fun": self.loss_fun,
-                "agg_fun": self.agg_fun,
-                "heuristics": self.heuristics
-            }
-            for max_formant in self.max_formants
-        ]
+        self._kept = np.array([], dtype=int)
+        self.n_frames = np.array([], dtype=int)
+        self.time_domains = None
+        self.formants = None
+        self.bandwidths = None
+        self._unsmoothed = np.array([], dtype=bool)
+        self._smoothed_formants = None
+        self._parameters = None
+        self.log_parameters = None
+        self.bandwidth_parameters = None
+        self._smooth_errors = np.full(self.nstep, np.nan)
+        self.heuristic_errors = np.full(self.nstep, np.nan)
+
+        if self.search == "grid":
+            self._evaluate(np.arange(self.nstep))
+        elif self.search == "coarse_to_fine":
+            self._coarse_to_fine_search()
+        elif self.search == "golden":
+            self._golden_search()
+        else:
+            raise ValueError(
+                "search must be 'grid', 'coarse_to_fine' or 'golden'"
+            )
+        self.n_analyses = self._kept.size
+
+        self.total_errors = self._total_errors()
+        self.winner_idx = self._best_idx()
+
+        if self.keep_candidates == "winner":
+            self._keep_winner()
+
+    def to_record(self) -> CandidateRecord:
+        """A compact record of the candidates' arrays, errors,
+        settings and metadata, without the samples, the smoother,
+        loss, aggregation and heuristic objects, or any cached
+        tracks and data frames. It is cheap to pickle, and the
+        candidates can be rebuilt from it with
+        [](`~fasttrackpy.CandidateTracks.from_record`)
+        without analyzing them again.
 
-        self.candidates = [
-            _make_candidate(x) for x in to_process
+        Returns:
+            (CandidateRecord): The record of the candidates.
+        """
+        return CandidateRecord(**{
+            field: getattr(self, name)
+            for field, name in RECORD_FIELDS.items()
+        })
+
+    @classmethod
+    def from_record(
+        cls,
+        record: CandidateRecord,
+        samples: np.ndarray,
+        smoother: Smoother = Smoother(),
+        loss_fun: Loss = Loss(),
+        agg_fun: Agg = Agg(),
+        heuristics: list[MinMaxHeuristic|SpacingHeuristic] = [],
+        prepared: PreparedWindow = None
+    ) -> "CandidateTracks":
+        """Rebuild candidate tracks from a record made by
+        [](`~fasttrackpy.CandidateTracks.to_record`). Nothing is
+        analyzed again, and tracks and data frames are made when
+        they are asked for, as usual.
+
+        Args:
+            record (CandidateRecord): The record of the candidates.
+            samples (np.ndarray): The samples the candidates were
+                analyzed from.
+            smoother (Smoother, optional): The smoother that was used.
+                Defaults to `Smoother()`.
+            loss_fun (Loss, optional): The loss function that was used.
+                Defaults to Loss().
+            agg_fun (Agg, optional): The loss aggregation function that
+                was used. Defaults to Agg().
+            heuristics (list[MinMaxHeuristic|SpacingHeuristic]):
+                The heuristics that were used.
+            prepared (PreparedWindow, optional): The prepared window
+                that was analyzed, if any.
+
+        Returns:
+            (CandidateTracks): The candidate tracks.
+        """
+        self = cls.__new__(cls)
+        for field, name in RECORD_FIELDS.items():
+            setattr(self, name, getattr(record, field))
+        self._samples = samples
+        self._sound = None
+        self._smoother = smoother
+        self._loss_fun = loss_fun
+        self._agg_fun = agg_fun
+        self.heuristics = heuristics
+        self.prepared = prepared
+        self.n_jobs = 1
+        self.max_formants = np.linspace(
+            start = self.min_max_formant,
+            stop = self.max_max_formant,
+            num = self.nstep
+        )
+        self._winner = None
+        self._views = {}
+        self._label = None
+        self._interval = None
+        self._clear_dfs()
+        return self
+
+    def _evaluate(self, grid_idx: np.ndarray):
+        """Analyze, smooth and score the candidates at
+        `grid_idx` of `max_formants` that haven't been yet.
+        """
+        new = np.setdiff1d(grid_idx, self._kept)
+        if new.size < 1:
+            return
+
+        if self.prepared is not None:
+            analyses = self.prepared.track_formants(
+                max_formants = self.max_formants[new],
+                n_formants = int(np.floor(self.n_formants)),
+                window_length = self.window_length,
+                time_step = self.time_step,
+                engine = self.engine,
+                return_bandwidths = self.profile.bandwidths,
+                n_jobs = self.n_jobs
+            )
+        else:
+            analyses = track_formants_batch(
+                samples = self.samples,
+                sampling_frequency = self.sampling_frequency,
+                max_formants = self.max_formants[new],
+                xmin = self.xmin,
+                n_formants = int(np.floor(self.n_formants)),
+                window_length = self.window_length,
+                time_step = self.time_step,
+                pre_emphasis_from = self.pre_emphasis_from,
+                engine = self.engine,
+                return_bandwidths = self.profile.bandwidths,
+                n_jobs = self.n_jobs
+            )
+
+        n_frames = np.array(
+            [time_domain.size for _, _, time_domain in analyses]
+        )
+        time_domains = _pad_frames(
+            [time_domain for _, _, time_domain in analyses]
+        )
+        formants = _pad_frames(
+            [tracks for tracks, _, _ in analyses]
+        )
+        bandwidths = None
+        if self.profile.bandwidths:
+            bandwidths = _pad_frames(
+                [bandwidths for _, bandwidths, _ in analyses]
+            )
+
+        # only the parameters of the log smooths are
+        # used for scoring, so the smoothed values aren't kept
+        log_parameters = None
+        if self.profile.log_formants:
+            _, log_parameters = self._smooth(np.log(formants), n_frames)
+
+        bandwidth_parameters = None
+        if self.profile.bandwidths:
+            _, bandwidth_parameters = self._smooth(
+                np.log(bandwidths),
+                n_frames
+            )
+
+        # heuristics with a batch method are checked before
+        # smoothing the formants, so that candidates that fail
+        # them don't get smoothed or scored unless they're needed.
+        batch_heuristics = [
+            x for x in self.heuristics if hasattr(x, "eval_batch")
+        ]
+        other_heuristics = [
+            x for x in self.heuristics if not hasattr(x, "eval_batch")
         ]
+        heuristic_errors = np.zeros(new.size)
+        if len(batch_heuristics) > 0:
+            heuristic_errors = eval_heuristics(
+                batch_heuristics,
+                n_formants = self.n_formants,
+                log_parameters = log_parameters,
+                bandwidth_parameters = bandwidth_parameters
+            )
+
+        rejected = np.zeros(new.size, dtype=bool)
+        if len(other_heuristics) < 1:
+            rejected = ~np.isfinite(heuristic_errors)
+
+        smoothed_formants = np.full(formants.shape, np.nan)
+        if np.all(rejected):
+            # a heuristic rejected them, so there are heuristic
+            # parameters to get the parameter shape from
+            heuristic_parameters = log_parameters
+            if heuristic_parameters is None:
+                heuristic_parameters = bandwidth_parameters
+            parameters = np.full(heuristic_parameters.shape, np.nan)
+        else:
+            passed = ~rejected
+            smoothed_passed, parameters_passed, errors_passed = \
+                self._smooth_and_score(formants[passed], n_frames[passed])
+            smoothed_formants[passed] = smoothed_passed
+            parameters = np.full(
+                formants.shape[0:2] + parameters_passed.shape[2:],
+                np.nan
+            )
+            parameters[passed] = parameters_passed
+            self._smooth_errors[new[passed]] = errors_passed
+
+        kept = np.concatenate([self._kept, new])
+        order = np.argsort(kept)
+        self._kept = kept[order]
+        self._unsmoothed = np.concatenate([self._unsmoothed, rejected])[order]
+        self.n_frames = np.concatenate([self.n_frames, n_frames])[order]
+        self.time_domains = _concat_frames(
+            self.time_domains, time_domains, order
+        )
+        self.formants = _concat_frames(self.formants, formants, order)
+        self.bandwidths = _concat_frames(self.bandwidths, bandwidths, order)
+        self._smoothed_formants = _concat_frames(
+            self._smoothed_formants, smoothed_formants, order
+        )
+        self._parameters = _concat_frames(self._parameters, parameters, order)
+        self.log_parameters = _concat_frames(
+            self.log_parameters, log_parameters, order
+        )
+        self.bandwidth_parameters = _concat_frames(
+            self.bandwidth_parameters, bandwidth_parameters, order
+        )
 
-        self.smooth_errors = np.array(
-            [x.smooth_error for x in self.candidates]
+        self.heuristic_errors[new] = heuristic_errors
+        if len(other_heuristics) > 0:
+            for idx, pos in zip(new, np.searchsorted(self._kept, new)):
+                track = self._view(pos)
+                self.heuristic_errors[idx] += np.sum([
+                    heuristic.eval(track) for heuristic in other_heuristics
+                ])
+
+    def _smooth_and_score(
+            self,
+            formants: np.ndarray,
+            n_frames: np.ndarray
+        ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Smooth (candidates, formants, time) formants and
+        get their smoothing errors.
+        """
+        smoothed_formants, parameters = self._smooth(formants, n_frames)
+        smooth_errors = self._score(
+            formants[:, 0:self.n_formants],
+            smoothed_formants[:, 0:self.n_formants],
+            n_frames
+        )
+        return smoothed_formants, parameters, smooth_errors
+
+    def _score(
+            self,
+            formants: np.ndarray,
+            smoothed: np.ndarray,
+            n_frames: np.ndarray
+        ) -> np.ndarray:
+        """Get the smoothing error of (candidates, formants, time)
+        formants. The `np.nan` padding past each candidate's frames
+        is left out by the NaN aware built in losses.
+        """
+        losses = self.loss_fun.calculate_loss_batch(
+            formants,
+            smoothed,
+            n_frames
+        )
+        return self.agg_fun.aggregate_batch(losses)
+
+    def _smooth_rejected(self):
+        """Smooth and score the candidates that were rejected
+        by the heuristics before they were smoothed."""
+        if not np.any(self._unsmoothed):
+            return
+        pos = np.flatnonzero(self._unsmoothed)
+        smoothed, parameters, errors = self._smooth_and_score(
+            self.formants[pos],
+            self.n_frames[pos]
+        )
+        self._smoothed_formants[pos] = smoothed
+        self._parameters[pos] = parameters
+        self._smooth_errors[self._kept[pos]] = errors
+        self._unsmoothed[pos] = False
+
+    @property
+    def smoothed_formants(self) -> np.ndarray:
+        self._smooth_rejected()
+        return self._smoothed_formants
+
+    @property
+    def parameters(self) -> np.ndarray:
+        self._smooth_rejected()
+        return self._parameters
+
+    @property
+    def smooth_errors(self) -> np.ndarray:
+        self._smooth_rejected()
+        return self._smooth_errors
+
+    def _total_errors(self) -> np.ndarray:
+        if not np.any(np.isfinite(self.heuristic_errors)):
+            return np.copy(self.smooth_errors)
+
+        # candidates that were rejected without being scored
+        # have a nan smooth error, but an infinite total error
+        return np.where(
+            np.isinf(self.heuristic_errors),
+            np.inf,
+            self._smooth_errors + self.heuristic_errors
+        )
+
+    def _best_idx(self) -> int:
+        """The index of the evaluated candidate with the smallest error."""
+        total_errors = self._total_errors()
+        return self._kept[np.argmin(total_errors[self._kept])]
+
+    def _coarse_to_fine_search(self):
+        """Evaluate a sparse grid of max formants, then halve the
+        grid spacing around the best few candidates so far until it
+        reaches `search_tolerance` or the full grid spacing.
+        """
+        max_idx = self.nstep-1
+        stride = self._coarse_grid()
+        while stride > 1 and stride * self._grid_spacing() > self.search_tolerance:
+            stride //= 2
+            total_errors = self._total_errors()[self._kept]
+            best = self._kept[
+                np.argsort(total_errors, kind = "stable")[0:REFINE_AROUND]
+            ]
+            self._evaluate(
+                np.clip(
+                    np.concatenate([best - stride, best + stride]),
+                    0,
+                    max_idx
+                )
+            )
+
+    def _coarse_grid(self) -> int:
+        """Evaluate every few max formants, including the
+        first and last, and return the index stride.
+        """
+        max_idx = self.nstep-1
+        stride = int(2 ** np.floor(np.log2(max(max_idx/4, 1))))
+        self._evaluate(
+            np.unique(np.append(np.arange(0, max_idx, stride), max_idx))
+        )
+        return stride
+
+    def _golden_search(self):
+        """Evaluate a sparse grid of max formants, then narrow the
+        bracket around the best one by golden section search until
+        it is `search_tolerance` wide or has no interior points,
+        and evaluate the rest of the bracket.
+        """
+        inv_phi = (np.sqrt(5) - 1)/2
+        stride = self._coarse_grid()
+        best = self._best_idx()
+        lower = max(best - stride, 0)
+        upper = min(best + stride, self.nstep-1)
+        while upper - lower > 2 and \
+                (upper - lower) * self._grid_spacing() > self.search_tolerance:
+            left = int(np.round(upper - (upper - lower) * inv_phi))
+            right = int(np.round(lower + (upper - lower) * inv_phi))
+            if right <= left:
+                right = left + 1
+            self._evaluate(np.array([left, right]))
+            total_errors = self._total_errors()
+            if total_errors[left] <= total_errors[right]:
+                upper = right
+            else:
+                lower = left
+        self._evaluate(np.arange(lower, upper+1))
+
+    def _grid_spacing(self) -> float:
+        if self.nstep < 2:
+            return 0.0
+        return (self.max_max_formant - self.min_max_formant)/(self.nstep - 1)
+
+    @property
+    def analyses_saved(self) -> int:
+        """The number of formant analyses the search
+        saved compared to the full grid of max formants.
+        """
+        return self.nstep - self.n_analyses
+
+    def _smooth(
+            self,
+            X: np.ndarray,
+            n_frames: np.ndarray
+        ) -> tuple[np.ndarray, np.ndarray]:
+        """Smooth (candidates, formants, time) values, batching
+        together candidates with the same number of frames.
+        """
+        smoothed = np.full(X.shape, np.nan)
+        params = None
+        for n in np.unique(n_frames):
+            idx = np.flatnonzero(n_frames == n)
+            batch = self.smoother.smooth_batch(X[idx, :, 0:n])
+            smoothed[idx, :, 0:n] = batch.smoothed
+            if params is None:
+                params = np.full(
+                    X.shape[0:2] + batch.params.shape[2:],
+                    np.nan
+                )
+            params[idx] = batch.params
+        return smoothed, params
+
+    def _keep_winner(self):
+        """Drop the arrays of every candidate but the winner."""
+        pos = int(np.flatnonzero(self._kept == self.winner_idx)[0])
+        keep = slice(pos, pos+1)
+        self._kept = self._kept[keep]
+        self.n_frames = self.n_frames[keep]
+        self._views = {
+            idx: track for idx, track in self._views.items()
+            if idx == self.winner_idx
+        }
+        for name in [
+            "time_domains",
+            "formants",
+            "bandwidths",
+            "_smoothed_formants",
+            "_parameters",
+            "_unsmoothed",
+            "log_parameters",
+            "bandwidth_parameters"
+        ]:
+            values = getattr(self, name)
+            if values is not None:
+                setattr(self, name, values[keep].copy())
+
+    def _clear_dfs(self):
+        self._formant_df = None
+        self._param_df = None
+        self._log_param_df = None
+
+    def _view(self, pos: int) -> OneTrack:
+        """Materialize the `OneTrack` for one of the kept candidates."""
+        n = self.n_frames[pos]
+        bandwidths = None
+        if self.bandwidths is not None:
+            bandwidths = self.bandwidths[pos, :, 0:n]
+
+        track = OneTrack(
+            maximum_formant = self.max_formants[self._kept[pos]],
+            samples = self.samples,
+            sampling_frequency = self.sampling_frequency,
+            xmin = self.xmin,
+            n_formants = self.n_formants,
+            window_length = self.window_length,
+            time_step = self.time_step,
+            pre_emphasis_from = self.pre_emphasis_from,
+            smoother = self.smoother,
+            loss_fun = self.loss_fun,
+            agg_fun = self.agg_fun,
+            heuristics = self.heuristics,
+            engine = self.engine,
+            prepared = self.prepared,
+            formants = self.formants[pos, :, 0:n],
+            bandwidths = bandwidths,
+            time_domain = self.time_domains[pos, 0:n]
         )
-        self.heuristic_errors = np.array(
-            [x.heuristic_error for x in self.candidates]
+        if self._unsmoothed[pos]:
+            self._smooth_rejected()
+        track._smoothed = Smoothed(
+            smoothed = self._smoothed_formants[pos, :, 0:n],
+            params = self._parameters[pos]
         )
+        track._smooth_error = self._smooth_errors[self._kept[pos]]
+        track._sound = self._sound
+        if self.log_parameters is not None:
+            track._log_parameters = self.log_parameters[pos]
+        if self.bandwidth_parameters is not None:
+            track._bandwidth_parameters = self.bandwidth_parameters[pos]
+
+        if self._interval is not None:
+            track.interval = self._interval
+        track.file_name = self._file_name
+        if self._id is not None:
+            track.id = self._id
+        if self._group is not None:
+            track.group = self._group
+        return track
 
-        self.total_errors = np.copy(self.smooth_errors)
+    @property
+    def winner(self) -> OneTrack:
+        if self._winner is None:
+            pos = int(np.flatnonzero(self._kept == self.winner_idx)[0])
+            return self[pos]
+        return self._winner
 
-        if np.any(np.isfinite(self.heuristic_errors)):
-            self.total_errors += self.heuristic_errors        
+    @winner.setter
+    def winner(self, track: OneTrack):
+        self._winner = track
 
-        self.winner_idx = np.argmin(self.total_errors)
-        self.winner = self.candidates[self.winner_idx]
+    @property
+    def candidates(self) -> list[OneTrack]:
+        return [self[idx] for idx in range(len(self))]
     
     def __getitem__(self, idx:int) -> OneTrack:
-        return self.candidates[idx]
+        pos = range(len(self))[idx]
+        grid_idx = int(self._kept[pos])
+        if grid_idx not in self._views:
+            self._views[grid_idx] = self._view(pos)
+        return self._views[grid_idx]
+
+    def _tracks(self) -> list[OneTrack]:
+        """The `OneTrack` tracks made so far, including
+        an assigned winner."""
+        tracks = list(self._views.values())
+        if self._winner is not None \
+            and not any(x is self._winner for x in tracks):
+            tracks.append(self._winner)
+        return tracks
     
     def __len__(self) -> int:
-        return len(self.candidates)
+        return self._kept.size
 
     @property
     def file_name(self):
@@ -578,8 +1477,9 @@ class CandidateTracks(Track, Sequence):
     @file_name.setter
     def file_name(self, x):
         self._file_name = x
-        for c in self.candidates:
-            c.file_name = x
+        self._clear_dfs()
+        for track in self._tracks():
+            track.file_name = x
 
     @property
     def id(self):
@@ -588,8 +1488,9 @@ class CandidateTracks(Track, Sequence):
     @id.setter
     def id(self, x):
         self._id = x
-        for c in self.candidates:
-            c.id = x
+        self._clear_dfs()
+        for track in self._tracks():
+            track.id = x
 
     @property
     def group(self):
@@ -598,6 +1499,9 @@ class CandidateTracks(Track, Sequence):
     @group.setter
     def group(self, name):
         self._group = name
+        self._clear_dfs()
+        for track in self._tracks():
+            track.group = name
 
     def __get_group(self, interval):
         if isinstance(interval.within, TierGroup):
@@ -615,9 +1519,11 @@ class CandidateTracks(Track, Sequence):
         self._interval = interval
         self.id = interval.id
         self.label = interval.label
-        self.group = self.__get_group(interval)
-        for c in self.candidates:
-            c.interval = interval
+        self.group = interval.group \
+            if isinstance(interval, TokenInterval) \
+            else self.__get_group(interval)
+        for track in self._tracks():
+            track.interval = interval
 
     def to_df(
             self,
@@ -692,6 +1598,11 @@ class CandidateTracks(Track, Sequence):
                 If the plot is being saved, its image resolution in 
                 dots per inch. Defaults to 75
         """
+        if len(self) < self.nstep:
+            raise ValueError(
+                "Candidate spectrograms need all candidates. "
+                "Use keep_candidates = 'all'."
+            )
 
         candidate_spectrograms(self, **kwargs)
 
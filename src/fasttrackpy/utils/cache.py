@@ -0,0 +1,286 @@
+import numpy as np
+from pathlib import Path
+from contextlib import contextmanager
+from importlib.metadata import version, PackageNotFoundError
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# 1 GiB
+DEFAULT_CACHE_BYTES = 2**30
+
+# The share of the size limit left after evicting, so that
+# a full cache isn't evicted from on every write.
+EVICT_TO = 0.9
+
+# Arguments that don't change a token's results.
+UNKEYED_ARGS = {"samples", "prepared", "n_jobs", "cache"}
+
+try:
+    CACHE_VERSION = version("fasttrackpy")
+except PackageNotFoundError:
+    CACHE_VERSION = None
+
+def _code_parts(code) -> list:
+    """The parts of a code object that decide what it does:
+    its bytecode, constants (with nested functions' code)
+    and the names it uses.
+    """
+    def const(x):
+        if hasattr(x, "co_code"):
+            return _code_parts(x)
+        if isinstance(x, tuple):
+            return [const(y) for y in x]
+        if isinstance(x, frozenset):
+            return sorted(repr(y) for y in x)
+        return repr(x)
+    return [
+        code.co_code.hex(),
+        [const(x) for x in code.co_consts],
+        list(code.co_names)
+    ]
+
+def describe(value, _seen: frozenset = frozenset()):
+    """A json-serializable description of a setting, like
+    a smoother, loss function or heuristic, that is the same
+    for equal settings in any process.
+
+    Python functions are described by their code, defaults
+    and closure, as well as their names, so that two lambdas,
+    or two closures made by the same function, aren't taken
+    for each other.
+    """
+    if id(value) in _seen:
+        # a function in its own closure
+        return "<recursive>"
+    if hasattr(value, "py_func"):
+        # numba kernels
+        return describe(value.py_func, _seen)
+    if hasattr(value, "__func__") and hasattr(value, "__self__"):
+        # bound methods
+        return {
+            "method": describe(value.__func__, _seen),
+            "self": describe(value.__self__, _seen)
+        }
+    if hasattr(value, "__code__"):
+        seen = _seen | {id(value)}
+        closure = []
+        for cell in value.__closure__ or ():
+            try:
+                closure.append(describe(cell.cell_contents, seen))
+            except ValueError:
+                # a cell that hasn't been set
+                closure.append(None)
+        return {
+            "function": f"{value.__module__}.{value.__qualname__}",
+            "code": _code_parts(value.__code__),
+            "defaults": describe(value.__defaults__, seen),
+            "kwdefaults": describe(value.__kwdefaults__, seen),
+            "closure": closure
+        }
+    if hasattr(value, "__qualname__"):
+        # classes and builtins
+        return f"{getattr(value, '__module__', '')}.{value.__qualname__}"
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [describe(x, _seen) for x in value]
+    if isinstance(value, dict):
+        return {str(k): describe(v, _seen) for k, v in value.items()}
+    if hasattr(value, "__dict__"):
+        return {
+            "class": describe(type(value), _seen),
+            **describe(vars(value), _seen)
+        }
+    return value
+
+@contextmanager
+def _locked(path: Path):
+    with open(path, "a+b") as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+class TokenCache:
+    """
+    An on-disk cache of the compact records of analyzed tokens,
+    keyed on a hash of the token's samples and the settings that
+    were used to analyze it. A token that was analyzed before,
+    by this run or an earlier one, is read back from the cache
+    instead of being analyzed again.
+
+    Records are written to a temporary file and moved into place,
+    so they can be read while other processes write to the cache.
+    The total size is kept under `max_bytes` by removing the records
+    that were used longest ago, with a lock file so that processes
+    sharing the cache don't evict at the same time.
+
+    Args:
+        path (str | Path): The cache directory. It is made
+            if it doesn't exist.
+        max_bytes (int, optional): The size limit of the cache.
+            Defaults to `DEFAULT_CACHE_BYTES`, 1 GiB.
+
+    Attributes:
+        path (Path): The cache directory.
+        max_bytes (int): The size limit.
+    """
+    def __init__(
+            self,
+            path: str|Path,
+            max_bytes: int = DEFAULT_CACHE_BYTES
+        ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents = True, exist_ok = True)
+        # the limit may be lower than the one it was filled to
+        with _locked(self._lock_path):
+            if self._read_size() > self.max_bytes:
+                size = self._evict(int(self.max_bytes * EVICT_TO))
+                self._size_path.write_text(str(size))
+
+    @property
+    def _lock_path(self) -> Path:
+        return self.path.joinpath(".lock")
+
+    @property
+    def _size_path(self) -> Path:
+        return self.path.joinpath(".size")
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path.joinpath(key[0:2], key).with_suffix(".pkl")
+
+    def key(self, args_dict: dict) -> str:
+        """The key of a token's analysis.
+
+        Args:
+            args_dict (dict): Keyword arguments for `CandidateTracks`,
+                with the token's `samples`.
+
+        Returns:
+            (str): The key.
+        """
+        settings = {
+            k: describe(v)
+            for k, v in args_dict.items()
+            if k not in UNKEYED_ARGS
+        }
+        digest = hashlib.blake2b(digest_size = 20)
+        digest.update(json.dumps(
+            [CACHE_VERSION, settings],
+            sort_keys = True,
+            default = str
+        ).encode())
+        samples = np.ascontiguousarray(args_dict["samples"])
+        digest.update(str((samples.dtype, samples.shape)).encode())
+        digest.update(samples)
+        # prepared windows were cut from the resampled file,
+        # so their signals are analyzed rather than the samples
+        prepared = args_dict.get("prepared")
+        if prepared is not None:
+            digest.update(prepared.max_formants.tobytes())
+            for signal, sampling_frequency, start in prepared.signals:
+                digest.update(np.ascontiguousarray(signal))
+                digest.update(np.array([sampling_frequency, start]).tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """Read a record from the cache.
+
+        Args:
+            key (str): The record's key.
+
+        Returns:
+            (CandidateRecord): The record, or None if it isn't cached.
+        """
+        path = self._entry_path(key)
+        try:
+            with path.open("rb") as file:
+                record = pickle.load(file)
+            # marks it as recently used
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        return record
+
+    def put(self, key: str, record):
+        """Write a record to the cache, and evict the least
+        recently used records if it is over its size limit.
+
+        Args:
+            key (str): The record's key.
+            record (CandidateRecord): The record.
+        """
+        path = self._entry_path(key)
+        path.parent.mkdir(exist_ok = True)
+        with tempfile.NamedTemporaryFile(
+            dir = path.parent, suffix = ".tmp", delete = False
+        ) as file:
+            pickle.dump(record, file, protocol = pickle.HIGHEST_PROTOCOL)
+            entry_size = file.tell()
+
+        with _locked(self._lock_path):
+            # another worker, or an earlier run, may have
+            # already written it
+            try:
+                entry_size -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(file.name, path)
+            size = self._read_size() + entry_size
+            if size > self.max_bytes:
+                size = self._evict(int(self.max_bytes * EVICT_TO))
+            self._size_path.write_text(str(size))
+
+    def _read_size(self) -> int:
+        try:
+            return int(self._size_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _evict(self, target: int) -> int:
+        entries = []
+        for path in self.path.glob("*/*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        size = sum(x[1] for x in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= target:
+                break
+            path.unlink(missing_ok = True)
+            size -= entry_size
+        return size
+
+    def size(self) -> int:
+        """The total size of the cached records, in bytes."""
+        return sum(x.stat().st_size for x in self.path.glob("*/*.pkl"))
+
+    def clear(self):
+        """Remove every record from the cache."""
+        with _locked(self._lock_path):
+            for path in self.path.glob("*/*.pkl"):
+                path.unlink(missing_ok = True)
+            self._size_path.write_text("0")
@@ -0,0 +1,267 @@
+import polars as pl
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+
+MANIFEST_VERSION = 1
+
+def file_fingerprint(path: str|Path) -> dict:
+    """The path, modification time and size of a file,
+    which change when the file is replaced or edited.
+
+    Args:
+        path (str | Path): The file.
+
+    Returns:
+        (dict): The fingerprint, or None if the
+            file doesn't exist.
+    """
+    path = Path(path).resolve()
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return {
+        "path": str(path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size
+    }
+
+def config_digest(config: dict) -> str:
+    """A hash of a run's settings.
+
+    Args:
+        config (dict): The settings that change the output,
+            as json-serializable values.
+
+    Returns:
+        (str): The hash.
+    """
+    text = json.dumps(config, sort_keys = True, default = str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def manifest_path(
+        file: str|Path = None,
+        destination: str|Path = None
+    ) -> Path:
+    """The manifest of a run writing to `file` or `destination`.
+
+    Args:
+        file (str | Path, optional): The output file. Defaults to None.
+        destination (str | Path, optional): The output directory.
+            Defaults to None.
+
+    Returns:
+        (Path): The manifest file.
+    """
+    if file:
+        return Path(file).with_suffix(".manifest.json")
+    if destination:
+        return Path(destination).joinpath("fasttrack_manifest.json")
+    raise ValueError("Either 'file' or 'destination' needs to be set")
+
+class Manifest:
+    """
+    A record of the audio and TextGrid files a corpus run has
+    finished and of the output files it has written to, saved
+    after each file. A killed run can be resumed from it: the
+    files it finished are skipped, and rows written for a file
+    that wasn't finished are removed from the outputs.
+
+    Files are keyed on their audio path, and an entry is only
+    used while the audio and TextGrid files have the same
+    modification times and sizes, and the run has the same
+    settings, as when it was written. Otherwise the file is
+    processed again, and its old rows removed.
+
+    Args:
+        path (str | Path): The manifest file.
+        config (dict): The settings that change the output,
+            as json-serializable values.
+        resume (bool, optional): Whether to resume from the manifest
+            at `path`, if there is one. If False, a new manifest is
+            started. Defaults to False.
+
+    Attributes:
+        files (dict): The entries of the finished files, by audio path.
+        outputs (dict): The columns of each output file, and its size
+            when the last file was finished.
+    """
+    def __init__(
+            self,
+            path: str|Path,
+            config: dict,
+            resume: bool = False
+        ):
+        self.path = Path(path)
+        self.config = config_digest(config)
+        self.files = {}
+        self.outputs = {}
+        # outputs written to since the last finished file
+        self._touched = set()
+
+        if resume and self.path.exists():
+            self._load()
+        self.save()
+
+    def _load(self):
+        with self.path.open() as file:
+            manifest = json.load(file)
+
+        if manifest.get("version") != MANIFEST_VERSION or \
+                manifest.get("config") != self.config:
+            logging.info(
+                f"{self.path} is from a run with other settings, "\
+                "starting over."
+            )
+            return
+
+        self.files = manifest["files"]
+        self.outputs = manifest["outputs"]
+        # files whose rows were in a deleted output are done again
+        missing = {
+            path for path in self.outputs if not Path(path).exists()
+        }
+        for path in missing:
+            del self.outputs[path]
+        self.rollback()
+
+        stale = [
+            key for key, entry in self.files.items()
+            if not self._is_current(entry) or missing & set(entry["outputs"])
+        ]
+        for key in stale:
+            logging.info(f"{key} has changed, processing it again.")
+            self._remove_rows(self.files.pop(key))
+        if stale:
+            self.save()
+
+    def _is_current(self, entry: dict) -> bool:
+        return entry["audio"] == file_fingerprint(entry["audio"]["path"]) and \
+            entry["textgrid"] == file_fingerprint(entry["textgrid"]["path"])
+
+    def _remove_rows(self, entry: dict):
+        for path in entry["outputs"]:
+            if path not in self.outputs:
+                continue
+            shared = any(
+                path in other["outputs"] for other in self.files.values()
+            )
+            if not shared:
+                Path(path).unlink(missing_ok = True)
+                del self.outputs[path]
+                continue
+            # read as text, so the other rows are written back as they were
+            df = pl.read_csv(path, infer_schema_length = 0)\
+                .filter(pl.col("file_name") != entry["file_name"])
+            df.write_csv(path)
+            self.outputs[path]["size"] = Path(path).stat().st_size
+
+    def is_done(self, pair) -> bool:
+        """Whether a file was finished with these settings
+        and hasn't changed since.
+
+        Args:
+            pair (CorpusPair): The audio and TextGrid files.
+
+        Returns:
+            (bool): Whether it is done.
+        """
+        entry = self.files.get(str(Path(pair.wav).resolve()))
+        return entry is not None and \
+            entry["textgrid"]["path"] == str(Path(pair.tg).resolve()) and \
+            self._is_current(entry)
+
+    def written(self, path: str|Path, columns: list[str]):
+        """Note that rows of the current file were written to an output.
+
+        Args:
+            path (str | Path): The output file.
+            columns (list[str]): Its columns.
+        """
+        path = str(path)
+        self._touched.add(path)
+        if path not in self.outputs:
+            # saved right away, so an output a killed run
+            # started is known when it is resumed.
+            self.outputs[path] = {"columns": list(columns), "size": 0}
+            self.save()
+
+    def finish(self, pair, n_tokens: int):
+        """Record that all rows of a file have been written.
+
+        Args:
+            pair (CorpusPair): The audio and TextGrid files.
+            n_tokens (int): The number of tokens of the file.
+        """
+        for path in self._touched:
+            self.outputs[path]["size"] = Path(path).stat().st_size
+        audio = file_fingerprint(pair.wav)
+        self.files[audio["path"]] = {
+            "audio": audio,
+            "textgrid": file_fingerprint(pair.tg),
+            "file_name": Path(pair.wav).stem,
+            "tokens": n_tokens,
+            "outputs": sorted(self._touched)
+        }
+        self._touched = set()
+        self.save()
+
+    def skip(self, pair, failed: bool = False):
+        """Record a file that has no rows to write, because it has no
+        target tokens or because reading it failed, so that it isn't
+        read again when the run is resumed.
+
+        Unlike `finish()`, it leaves the outputs as they were, so it
+        can be recorded while another file's rows are being written.
+
+        Args:
+            pair (CorpusPair): The audio and TextGrid files.
+            failed (bool, optional): Whether reading the file failed.
+                Defaults to False.
+        """
+        audio = file_fingerprint(pair.wav)
+        self.files[audio["path"]] = {
+            "audio": audio,
+            "textgrid": file_fingerprint(pair.tg),
+            "file_name": Path(pair.wav).stem,
+            "tokens": 0,
+            "failed": failed,
+            "outputs": []
+        }
+        self.save()
+
+    def rollback(self):
+        """Remove the rows written since the last finished file
+        from the outputs.
+        """
+        for path, output in list(self.outputs.items()):
+            if output["size"] == 0:
+                Path(path).unlink(missing_ok = True)
+                del self.outputs[path]
+                continue
+            if not Path(path).exists():
+                continue
+            with open(path, "r+b") as file:
+                file.truncate(output["size"])
+        self._touched = set()
+        self.save()
+
+    def save(self):
+        """Write the manifest."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w") as file:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "config": self.config,
+                    "files": self.files,
+                    "outputs": self.outputs
+                },
+                file,
+                indent = 1
+            )
+        # replaced in one step, so an interrupted save
+        # leaves the last manifest
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,78 @@
+from uuid import uuid4
+
+# The settings of the runs this process takes part in, by id.
+_RUN_CONFIGS = {}
+
+def init_worker(config_id: str, settings: dict):
+    """A worker pool initializer that registers a run's
+    settings in the worker, and warms what they will use.
+
+    Args:
+        config_id (str): The id of the run's settings.
+        settings (dict): The run's settings.
+    """
+    _RUN_CONFIGS[config_id] = settings
+    if settings.get("engine") == "numba":
+        # import numba and the kernels before the first task
+        import fasttrackpy.processors.burg
+
+class RunConfig:
+    """
+    Settings shared by every task of a run, like the smoother,
+    loss, aggregation and heuristic objects and the analysis
+    settings. They are sent to each worker once by a pool
+    initializer, and tasks only carry their id under the
+    `"config"` key, which
+    [](`~fasttrackpy.utils.run_config.attach_config`) replaces
+    with the settings.
+
+    The settings are registered in this process while the run
+    config is used in a `with` block, for tasks that don't run
+    in a worker process.
+
+    Args:
+        **settings: Keyword arguments shared by every task.
+
+    Attributes:
+        id (str): The id tasks refer to the settings by.
+        settings (dict): The shared settings.
+    """
+    def __init__(self, **settings):
+        self.id = uuid4().hex
+        self.settings = settings
+
+    def __enter__(self):
+        _RUN_CONFIGS[self.id] = self.settings
+        return self
+
+    def __exit__(self, *args):
+        _RUN_CONFIGS.pop(self.id, None)
+
+    @property
+    def pool_kwargs(self) -> dict:
+        """Keyword arguments for `joblib.Parallel` to send
+        the settings to each worker when it starts.
+        """
+        return {
+            "initializer": init_worker,
+            "initargs": (self.id, self.settings)
+        }
+
+def attach_config(args_dict: dict) -> dict:
+    """Replace the `"config"` id of a task's arguments
+    with the settings it refers to.
+
+    Args:
+        args_dict (dict): A task's keyword arguments.
+
+    Returns:
+        (dict): The shared settings, updated with the
+            task's own arguments.
+    """
+    if "config" not in args_dict:
+        return args_dict
+    args_dict = dict(args_dict)
+    config_id = args_dict.pop("config")
+    if config_id not in _RUN_CONFIGS:
+        raise KeyError(f"No run config with id {config_id} is registered.")
+    return {**_RUN_CONFIGS[config_id], **args_dict}
@@ -1,4 +1,5 @@
 import warnings
+from functools import wraps
 from typing import Callable
 from typing import Sequence
 
@@ -18,6 +19,9 @@ def safely(
             Defaults to `f"There was a problem a function's application."`.
     """
     def decorator(func:Callable):
+        # wrapped, so the decorated function has the name it's
+        # bound to, and can be pickled by name for workers.
+        @wraps(func)
         def safe_func(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
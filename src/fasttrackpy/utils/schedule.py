@@ -0,0 +1,327 @@
+import numpy as np
+from scipy.optimize import nnls
+from joblib import Parallel, delayed
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from fasttrackpy.utils.workers import BACKENDS,\
+                                      resolve_n_jobs,\
+                                      get_backend,\
+                                      supports_generator
+from tqdm import tqdm
+from typing import Literal
+import threading
+import time
+
+# Seconds per task, per analysis frame of all candidates,
+# and per sample of all candidates, measured with the
+# numba engine. They are only used until the model has
+# seen enough of a run's tasks to fit its own.
+PRIOR_COEFS = np.array([1e-3, 3.5e-5, 1.4e-7])
+
+# The number of upcoming tasks that are sorted by cost together.
+SCHEDULE_CHUNK = 256
+
+class CostModel:
+    """
+    A linear model of how long a task takes, from the number of
+    analysis frames and samples of all of its candidates. Its
+    coefficients are refit to the timings of the tasks it has
+    been shown with `observe()`.
+
+    Args:
+        prior (np.ndarray, optional): The coefficients to use before
+            there are `min_observations` timings. Defaults to
+            `PRIOR_COEFS`.
+        min_observations (int, optional): The number of timings needed
+            to fit the coefficients. Defaults to 8.
+        max_observations (int, optional): The number of most recent
+            timings the coefficients are fit to. Defaults to 1024.
+
+    Attributes:
+        coefs (np.ndarray): The current coefficients.
+    """
+    def __init__(
+            self,
+            prior: np.ndarray = PRIOR_COEFS,
+            min_observations: int = 8,
+            max_observations: int = 1024
+        ):
+        self.prior = np.asarray(prior, dtype = np.float64)
+        self.min_observations = min_observations
+        self._features = deque(maxlen = max_observations)
+        self._seconds = deque(maxlen = max_observations)
+        self._coefs = self.prior
+        self._stale = False
+        # timings are added by the thread reading results while
+        # the thread dispatching tasks predicts with them
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def features(
+            duration: float,
+            sampling_frequency: float,
+            nstep: int = 20,
+            time_step: float = 0.002
+        ) -> np.ndarray:
+        """The cost features of a task.
+
+        Args:
+            duration (float): The duration of the audio, in seconds.
+            sampling_frequency (float): Its sampling frequency.
+            nstep (int, optional): The number of candidates.
+                Defaults to 20.
+            time_step (float, optional): The analysis time step.
+                Defaults to 0.002.
+
+        Returns:
+            (np.ndarray): A constant, the number of frames and the
+                number of samples of all candidates.
+        """
+        return np.array([
+            1.0,
+            nstep * duration / time_step,
+            nstep * duration * sampling_frequency
+        ])
+
+    @property
+    def coefs(self) -> np.ndarray:
+        with self._lock:
+            if self._stale:
+                self._stale = False
+                coefs, _ = nnls(
+                    np.array(self._features),
+                    np.array(self._seconds)
+                )
+                # too few distinct tasks to say anything
+                if coefs.any():
+                    self._coefs = coefs
+            return self._coefs
+
+    def observe(self, features: np.ndarray, seconds: float):
+        """Add the timing of a task.
+
+        Args:
+            features (np.ndarray): The task's cost features.
+            seconds (float): How long it took.
+        """
+        with self._lock:
+            self._features.append(features)
+            self._seconds.append(seconds)
+            if len(self._seconds) >= self.min_observations:
+                self._stale = True
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Predict how long tasks will take.
+
+        Args:
+            features (np.ndarray): One task's cost features, or
+                an array of them, one per row.
+
+        Returns:
+            (np.ndarray): The predicted seconds.
+        """
+        return np.asarray(features) @ self.coefs
+
+def longest_first(
+        tasks: Iterable,
+        task_features: Callable,
+        cost_model: CostModel,
+        chunk_size: int = SCHEDULE_CHUNK
+    ) -> Iterator[tuple[int, object, np.ndarray]]:
+    """Reorder tasks so that, within each chunk of upcoming tasks,
+    the ones predicted to take longest come first. Tasks are read
+    one chunk at a time, and each chunk is sorted with the cost
+    model's coefficients at the time.
+
+    Args:
+        tasks (Iterable): The tasks.
+        task_features (Callable): A function returning a task's
+            cost features.
+        cost_model (CostModel): The cost model.
+        chunk_size (int, optional): The number of tasks sorted
+            together. Defaults to `SCHEDULE_CHUNK`.
+
+    Yields:
+        (tuple[int, object, np.ndarray]): The index, task and cost
+            features of each task.
+    """
+    tasks = iter(tasks)
+    index = 0
+    while True:
+        chunk = []
+        for task in tasks:
+            chunk.append((index, task, task_features(task)))
+            index += 1
+            if len(chunk) == chunk_size:
+                break
+        if not chunk:
+            return
+        cost = cost_model.predict(np.array([x[2] for x in chunk]))
+        for i in np.argsort(-cost, kind = "stable"):
+            yield chunk[i]
+
+def split_jobs(n_tasks: int, n_jobs: int) -> tuple[int, int]:
+    """Split workers between tasks and the candidates inside
+    each task. With at least as many tasks as workers, every
+    worker takes whole tasks. With fewer, each task gets an
+    equal share of the workers for its candidates, so that no
+    more than `n_jobs` analyses run at once.
+
+    Args:
+        n_tasks (int): The number of tasks.
+        n_jobs (int): The number of workers.
+
+    Returns:
+        (tuple[int, int]): The number of workers for tasks,
+            and the number for each task's candidates.
+    """
+    if n_tasks >= n_jobs or n_tasks < 1:
+        return n_jobs, 1
+    return n_tasks, n_jobs // n_tasks
+
+def _timed(fun: Callable, index: int, task) -> tuple[int, float, object]:
+    start = time.perf_counter()
+    result = fun(task)
+    return index, time.perf_counter() - start, result
+
+def run_longest_first(
+        fun: Callable,
+        tasks: Iterable,
+        task_features: Callable,
+        n_jobs: int,
+        cost_model: CostModel = None,
+        chunk_size: int = SCHEDULE_CHUNK,
+        **parallel_kwargs
+    ) -> Iterator:
+    """Run a function over tasks in parallel, dispatching the tasks
+    predicted to take longest first, so that long tasks don't
+    finish alone at the end of a run. The cost model learns from
+    how long the workers took, and the results are yielded in
+    task order.
+
+    Backends that can't return results as they finish, like
+    joblib's multiprocessing backend, return them all at the
+    end of the run instead, and the model learns from them then.
+
+    Args:
+        fun (Callable): The function to run on each task.
+        tasks (Iterable): The tasks.
+        task_features (Callable): A function returning a task's
+            cost features.
+        n_jobs (int): The number of workers.
+        cost_model (CostModel, optional): The cost model. Defaults
+            to a new `CostModel()`.
+        chunk_size (int, optional): The number of tasks sorted
+            together. Defaults to `SCHEDULE_CHUNK`.
+        **parallel_kwargs: Other arguments to `joblib.Parallel`.
+
+    Yields:
+        The result of each task, in task order.
+    """
+    if cost_model is None:
+        cost_model = CostModel()
+    features = {}
+
+    def dispatch():
+        for index, task, x in longest_first(
+            tasks, task_features, cost_model, chunk_size
+        ):
+            features[index] = x
+            yield delayed(_timed)(fun, index, task)
+
+    # results that finished before an earlier task
+    done = {}
+    next_index = 0
+    return_as = "generator" \
+        if supports_generator(parallel_kwargs.get("backend")) \
+        else "list"
+    for index, seconds, result in Parallel(
+        n_jobs = n_jobs,
+        return_as = return_as,
+        **parallel_kwargs
+    )(dispatch()):
+        cost_model.observe(features.pop(index), seconds)
+        done[index] = result
+        while next_index in done:
+            yield done.pop(next_index)
+            next_index += 1
+
+def iter_tasks(
+        fun: Callable,
+        tasks: Iterable,
+        task_features: Callable,
+        parallel: bool = True,
+        run_config = None,
+        n_jobs: int = None,
+        backend: Literal["loky", "multiprocessing", "threading", "serial"] = "loky",
+        batch_size: int|Literal["auto"] = "auto",
+        blas_threads: int = None,
+        polars_threads: int = None,
+        split_candidates: bool = False
+    ) -> Iterator:
+    """Run a pattern's function over its tasks, in parallel with
+    [](`~fasttrackpy.utils.schedule.run_longest_first`) or one
+    after the other, with a progress bar.
+
+    Args:
+        fun (Callable): The function to run on each task.
+        tasks (Iterable): The tasks.
+        task_features (Callable): A function returning a task's
+            cost features.
+        parallel (bool, optional): Whether to run the tasks in
+            parallel. Defaults to True.
+        run_config (RunConfig, optional): The
+            [](`~fasttrackpy.utils.run_config.RunConfig`) of the
+            settings the tasks share, which goes to each worker
+            once. Defaults to None.
+        n_jobs (int, optional): The number of workers. If None, all
+            cores. Defaults to None.
+        backend (Literal["loky", "multiprocessing", "threading", "serial"], optional):
+            The joblib backend. Defaults to "loky".
+        batch_size (int | Literal["auto"], optional): The number of
+            tasks dispatched to a worker at once. Defaults to "auto".
+        blas_threads (int, optional): The number of BLAS threads of
+            each loky worker. Defaults to None.
+        polars_threads (int, optional): The number of polars threads
+            of each loky worker. Defaults to None.
+        split_candidates (bool, optional): Whether, with fewer tasks
+            than workers, to give each task's candidates a share of the
+            spare workers, as an `n_jobs` entry of the task. `tasks`
+            must be a list of dicts. Only loky workers can start the
+            process pools the praat engine needs for this, so it is
+            only done with the loky backend. Defaults to False.
+
+    Yields:
+        The result of each task, in task order.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+    n_jobs = resolve_n_jobs(n_jobs)
+    if not parallel or backend == "serial":
+        n_jobs = 1
+
+    if split_candidates and backend == "loky":
+        n_jobs, candidate_jobs = split_jobs(len(tasks), n_jobs)
+        if candidate_jobs > 1:
+            tasks = [{**task, "n_jobs": candidate_jobs} for task in tasks]
+
+    if n_jobs > 1:
+        # the shared settings go to each worker once
+        pool_kwargs = run_config.pool_kwargs if run_config else {}
+        # the longest tasks go first so they don't finish
+        # alone at the end, and results come back in order.
+        # "auto" batching, the default, groups short tasks into one
+        # dispatch so their IPC overhead doesn't starve the workers.
+        yield from run_longest_first(
+            fun,
+            tqdm(tasks),
+            task_features,
+            n_jobs,
+            backend = get_backend(backend, n_jobs, blas_threads, polars_threads),
+            batch_size = batch_size,
+            **pool_kwargs
+        )
+        return
+
+    for task in tqdm(tasks):
+        yield fun(task)
@@ -0,0 +1,194 @@
+import numpy as np
+import parselmouth as pm
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+import tempfile
+import os
+
+# The number of memory-mapped files each process keeps open.
+OPEN_AUDIO_CACHE = 16
+
+SharedSound = namedtuple(
+    "SharedSound",
+    field_names=["path", "shape", "sampling_frequency", "x1"]
+)
+
+# A window of a shared sound, with samples from start
+# to end. It can extend past either end of the sound,
+# which is read as zeros.
+AudioSlice = namedtuple(
+    "AudioSlice",
+    field_names=["path", "shape", "start", "end", "sampling_frequency"]
+)
+
+def _default_directory() -> str|None:
+    # like joblib, prefer a RAM backed file system
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return str(shm)
+    return None
+
+class SharedAudio:
+    """
+    A store of whole sounds' samples in memory-mapped files, so
+    that worker processes can read token windows from them
+    instead of having the samples pickled into every task.
+
+    Each sound is written once. Tasks carry an
+    [](`~fasttrackpy.utils.shared_audio.AudioSlice`), and workers
+    read its samples with
+    [](`~fasttrackpy.utils.shared_audio.load_slice`) without copying.
+    The files are removed by `close()`, or at the end of a `with` block.
+
+    Args:
+        directory (str | Path, optional): Where to make the temporary
+            directory of files. Defaults to `/dev/shm` where it exists,
+            and the system's temporary directory otherwise.
+
+    Attributes:
+        n_bytes (int): The number of bytes of samples written.
+    """
+    def __init__(
+            self,
+            directory: str|Path = None
+        ):
+        if directory is None:
+            directory = _default_directory()
+        self._dir = tempfile.TemporaryDirectory(
+            prefix = "fasttrack_audio_",
+            dir = directory,
+            ignore_cleanup_errors = True
+        )
+        self._n_sounds = 0
+        self.n_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, sound: pm.Sound) -> SharedSound:
+        """Write a sound's samples to a memory-mapped file.
+
+        Args:
+            sound (pm.Sound): A `parselmouth.Sound`.
+
+        Returns:
+            (SharedSound): The file, shape, sampling frequency
+                and first sample time of the sound.
+        """
+        values = np.asarray(sound.values, dtype=np.float64)
+        path = str(Path(self._dir.name).joinpath(f"{self._n_sounds}.dat"))
+        self._n_sounds += 1
+        mapped = np.memmap(
+            path,
+            dtype = np.float64,
+            mode = "w+",
+            shape = values.shape
+        )
+        mapped[:] = values
+        mapped.flush()
+        del mapped
+        self.n_bytes += values.nbytes
+        return SharedSound(
+            path = path,
+            shape = values.shape,
+            sampling_frequency = sound.sampling_frequency,
+            x1 = sound.x1
+        )
+
+    def remove(self, shared: SharedSound|AudioSlice):
+        """Remove a sound's file once no more tasks will read it.
+
+        Args:
+            shared (SharedSound|AudioSlice): A sound returned by
+                `add()`, or a slice of it.
+        """
+        try:
+            os.remove(shared.path)
+        except OSError:
+            # it's still open somewhere, and will be
+            # removed with the directory.
+            pass
+
+    def close(self):
+        """Remove all the files."""
+        self._dir.cleanup()
+
+def window_slice(
+        shared: SharedSound,
+        from_time: float,
+        to_time: float
+    ) -> AudioSlice:
+    """The slice of a shared sound with the samples that
+    `Sound.extract_part(from_time, to_time)` would return.
+
+    Args:
+        shared (SharedSound): A sound in a `SharedAudio` store.
+        from_time (float): The start time of the window.
+        to_time (float): The end time of the window.
+
+    Returns:
+        (AudioSlice): The window's slice of the sound.
+    """
+    dx = 1 / shared.sampling_frequency
+    # the samples whose centers are in the window
+    start = int(np.ceil((from_time - shared.x1) / dx))
+    end = int(np.floor((to_time - shared.x1) / dx)) + 1
+    return AudioSlice(
+        path = shared.path,
+        shape = shared.shape,
+        start = start,
+        end = end,
+        sampling_frequency = shared.sampling_frequency
+    )
+
+@lru_cache(maxsize = OPEN_AUDIO_CACHE)
+def _open_audio(path: str, shape: tuple[int, int]) -> np.memmap:
+    return np.memmap(path, dtype = np.float64, mode = "r", shape = shape)
+
+def load_slice(audio_slice: AudioSlice) -> np.ndarray:
+    """Read the samples of a slice. Within the sound, they
+    are a read-only view of the memory-mapped file.
+
+    Args:
+        audio_slice (AudioSlice): The slice to read.
+
+    Returns:
+        (np.ndarray): A (channels, samples) array.
+    """
+    mapped = _open_audio(audio_slice.path, tuple(audio_slice.shape))
+    n = audio_slice.shape[1]
+    start = max(audio_slice.start, 0)
+    end = max(min(audio_slice.end, n), start)
+    samples = np.asarray(mapped[:, start:end])
+    if start == audio_slice.start and end == audio_slice.end:
+        return samples
+
+    # the part outside the sound is silence
+    padded = np.zeros((audio_slice.shape[0], audio_slice.end - audio_slice.start))
+    offset = start - audio_slice.start
+    padded[:, offset:offset + samples.shape[1]] = samples
+    return padded
+
+def attach_audio(args_dict: dict) -> dict:
+    """Replace the `"audio"` slice of a task's arguments
+    with the `samples`, `sampling_frequency` and `xmin`
+    arguments of its window, as from `Sound.extract_part()`.
+
+    Args:
+        args_dict (dict): Keyword arguments for `CandidateTracks`.
+
+    Returns:
+        (dict): The arguments with the window's samples.
+    """
+    if "audio" not in args_dict:
+        return args_dict
+    args_dict = dict(args_dict)
+    audio_slice = args_dict.pop("audio")
+    args_dict["samples"] = load_slice(audio_slice)
+    args_dict["sampling_frequency"] = audio_slice.sampling_frequency
+    args_dict["xmin"] = 0.0
+    return args_dict
@@ -0,0 +1,133 @@
+from joblib import cpu_count
+from joblib.parallel import LokyBackend, BACKENDS as JOBLIB_BACKENDS
+from typing import Literal
+
+BACKENDS = ["loky", "multiprocessing", "threading", "serial"]
+
+# The thread pools of the BLAS and OpenMP libraries numpy
+# and scipy may use, as joblib limits them.
+BLAS_THREAD_VARS = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS"
+]
+
+def resolve_n_jobs(n_jobs: int|None = None) -> int:
+    """The number of workers for an `n_jobs` setting.
+
+    Args:
+        n_jobs (int | None, optional): The number of workers.
+            None uses every core, and negative values count
+            back from it, as in joblib, so -1 is every core
+            and -2 is all but one. Defaults to None.
+
+    Returns:
+        (int): The number of workers, at least 1.
+    """
+    if n_jobs is None:
+        return cpu_count()
+    if n_jobs < 0:
+        return max(cpu_count() + 1 + n_jobs, 1)
+    return max(n_jobs, 1)
+
+def worker_env(
+        n_jobs: int,
+        blas_threads: int = None,
+        polars_threads: int = None
+    ) -> dict:
+    """Environment variables that limit the thread pools of
+    each worker process, so that `n_jobs` workers don't each
+    start a thread per core.
+
+    Args:
+        n_jobs (int): The number of workers.
+        blas_threads (int, optional): Threads for numpy and
+            scipy's BLAS and OpenMP libraries. If None, joblib's
+            limit of the cores divided by the workers is used.
+            Defaults to None.
+        polars_threads (int, optional): Threads for polars. If None,
+            the cores divided by the workers. Defaults to None.
+
+    Returns:
+        (dict): The environment variables.
+    """
+    env = {
+        "POLARS_MAX_THREADS": str(
+            polars_threads or max(cpu_count() // n_jobs, 1)
+        )
+    }
+    if blas_threads:
+        env.update({var: str(blas_threads) for var in BLAS_THREAD_VARS})
+    return env
+
+def supports_generator(backend) -> bool:
+    """Whether a `joblib.Parallel` backend can return its results
+    as they finish, with `return_as="generator"`. joblib's
+    multiprocessing backend can't.
+
+    Args:
+        backend (str | ParallelBackendBase | None): The backend, as
+            passed to `joblib.Parallel`.
+
+    Returns:
+        (bool): Whether it supports generators.
+    """
+    if isinstance(backend, str):
+        backend = JOBLIB_BACKENDS.get(backend)
+    return getattr(backend, "supports_return_generator", True) is not False
+
+class CappedLokyBackend(LokyBackend):
+    """
+    joblib's loky backend, which also sets environment variables
+    in its worker processes when they start, like the thread limits
+    of [](`~fasttrackpy.utils.workers.worker_env`).
+
+    Args:
+        worker_env (dict, optional): The environment variables.
+            Defaults to None.
+        **kwargs: Other arguments to joblib's `LokyBackend`.
+    """
+    def __init__(self, worker_env: dict = None, **kwargs):
+        super().__init__(**kwargs)
+        self.worker_env = worker_env or {}
+
+    def _prepare_worker_env(self, n_jobs):
+        env = super()._prepare_worker_env(n_jobs)
+        env.update(self.worker_env)
+        return env
+
+def get_backend(
+        backend: Literal["loky", "multiprocessing", "threading"] = "loky",
+        n_jobs: int = 1,
+        blas_threads: int = None,
+        polars_threads: int = None
+    ) -> str|CappedLokyBackend:
+    """The `joblib.Parallel` backend for a `backend` setting.
+
+    Loky workers are new processes, so they are started with the
+    thread limits. Multiprocessing workers are forked from this
+    process, and threads share its thread pools, so neither can
+    be limited this way.
+
+    Args:
+        backend (Literal["loky", "multiprocessing", "threading"], optional):
+            The backend. Defaults to "loky".
+        n_jobs (int, optional): The number of workers. Defaults to 1.
+        blas_threads (int, optional): Threads for numpy and scipy's BLAS
+            and OpenMP libraries in each worker. Defaults to None.
+        polars_threads (int, optional): Threads for polars in each worker.
+            Defaults to None.
+
+    Returns:
+        (str|CappedLokyBackend): The backend.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+    if backend == "loky":
+        return CappedLokyBackend(
+            worker_env = worker_env(n_jobs, blas_threads, polars_threads)
+        )
+    return backend
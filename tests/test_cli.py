@@ -48,6 +48,38 @@ class TestCLI:
         [x.unlink() for x in out_files]
         out_dir.rmdir()        
 
+    def test_parallel_options(self):
+        out_dir = self.sound_path.parent.joinpath("output")
+        if not out_dir.is_dir():
+            out_dir.mkdir()
+
+        runner = CliRunner()
+        result = runner.invoke(
+            fasttrack,
+            ["audio", 
+             "--dir", self.sound_path.parent,
+             "--dest", out_dir,
+             "--n-jobs", 2,
+             "--backend", "threading",
+             "--batch-size", 1,
+             "--blas-threads", 1,
+             "--polars-threads", 1]
+        )
+
+        assert result.exit_code == 0, result.output
+        out_files = list(out_dir.glob("*"))
+        [x.unlink() for x in out_files]
+        out_dir.rmdir()
+
+        result = runner.invoke(
+            fasttrack,
+            ["audio", 
+             "--file", self.sound_path,
+             "--dest", out_dir,
+             "--batch-size", "some"]
+        )
+        assert result.exit_code != 0
+
     def test_config_file(self):
         config_path = Path("tests", "test_data", "config.yml")
         with config_path.open() as file:
@@ -130,3 +162,79 @@ class TestCLI:
 
         [x.unlink() for x in out_files]
         out_dir.rmdir()
+
+    def test_corpus_resume(self, tmp_path):
+        out_file = tmp_path.joinpath("out.csv")
+        args = ["corpus",
+                "--corpus", self.corpus_path,
+                "--target-labels", "AY1",
+                "--output", out_file,
+                "--backend", "serial",
+                "--cache-dir", tmp_path.joinpath("cache")]
+        runner = CliRunner()
+        result = runner.invoke(fasttrack, args)
+        assert result.exit_code == 0, result.output
+        assert tmp_path.joinpath("out.manifest.json").is_file()
+        assert list(tmp_path.joinpath("cache").glob("*/*.pkl"))
+        written = out_file.read_text()
+
+        # every file is done, so nothing is added
+        result = runner.invoke(fasttrack, args + ["--resume"])
+        assert result.exit_code == 0, result.output
+        assert out_file.read_text() == written
+
+    def test_output_format(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(
+            fasttrack,
+            ["audio",
+             "--file", self.sound_path,
+             "--dest", tmp_path,
+             "--format", "parquet"]
+        )
+        assert result.exit_code == 0, result.output
+        assert tmp_path.joinpath("ay.parquet").is_file()
+
+        args = ["corpus",
+                "--corpus", self.corpus_path,
+                "--target-labels", "AY1",
+                "--dest", tmp_path,
+                "--backend", "serial",
+                "--format", "ipc"]
+        result = runner.invoke(fasttrack, args)
+        assert result.exit_code == 0, result.output
+        assert list(tmp_path.glob("*.arrow"))
+        assert not tmp_path.joinpath("fasttrack_manifest.json").exists()
+
+        result = runner.invoke(fasttrack, args + ["--resume"])
+        assert result.exit_code != 0
+
+    def test_partition_output(self, tmp_path):
+        args = ["corpus",
+                "--corpus", self.corpus_path,
+                "--target-labels", "AY1",
+                "--dest", tmp_path,
+                "--backend", "serial",
+                "--partition-output"]
+        runner = CliRunner()
+        result = runner.invoke(fasttrack, args)
+        assert result.exit_code != 0
+
+        result = runner.invoke(fasttrack, args + ["--format", "parquet"])
+        assert result.exit_code == 0, result.output
+        assert list(tmp_path.glob("file_name=*/group=*/*.parquet"))
+
+    def test_worker_output(self, tmp_path):
+        args = ["corpus",
+                "--corpus", self.corpus_path,
+                "--target-labels", "AY1",
+                "--backend", "serial",
+                "--worker-output"]
+        runner = CliRunner()
+        result = runner.invoke(fasttrack, args + ["--output", tmp_path.joinpath("out.csv")])
+        assert result.exit_code != 0
+
+        result = runner.invoke(fasttrack, args + ["--dest", tmp_path])
+        assert result.exit_code == 0, result.output
+        assert tmp_path.joinpath("fasttrack_parts.json").is_file()
+        assert list(tmp_path.glob("file_name=*/group=*/*.csv"))
@@ -6,6 +6,12 @@ from fasttrackpy.tracks import Track,\
                                Loss, \
                                Agg
 from fasttrackpy.processors.outputs import write_data, \
+    write_data_iter,\
+    FrameSink,\
+    partition_dir,\
+    PartitionWriter,\
+    tracks_to_dataframe,\
+    candidates_to_dataframe,\
     pickle_candidates,\
     unpickle_candidates
 from fasttrackpy.patterns.just_audio import process_audio_file
@@ -44,6 +50,61 @@ class TestDataFrames:
         assert isinstance(log_param_df, pl.DataFrame)                
         assert isinstance(big_log_param_df, pl.DataFrame)
 
+    def test_square_param_df(self):
+        # as many parameters as formants
+        candidates = CandidateTracks(sound = SOUND, smoother = Smoother(order = 4))
+        assert candidates.winner.parameters.shape == (4, 4)
+
+        param_df = candidates.to_df(output = "param")
+        assert np.array_equal(
+            param_df["F1"].to_numpy(),
+            candidates.winner.parameters[0]
+        )
+        assert candidates_to_dataframe([candidates], output = "param")\
+            .equals(param_df)
+
+    @pytest.mark.parametrize("output", ["formants", "param", "log_param"])
+    def test_columnar_df(self, output):
+        candidate_list = [
+            CandidateTracks(sound = SOUND, output = None),
+            CandidateTracks(sound = SOUND, output = None, nstep = 10)
+        ]
+        candidate_list[0].file_name = "ay"
+        candidate_list[1].group = "speaker"
+
+        winner_df = pl.concat(
+            [x.to_df(output = output) for x in candidate_list],
+            how = "diagonal"
+        )
+        assert candidates_to_dataframe(candidate_list, output = output)\
+            .equals(winner_df)
+
+        all_df = pl.concat(
+            [
+                x.with_columns(candidate = idx + 1)
+                for cand in candidate_list
+                for idx, x in enumerate(
+                    [track.to_df(output = output) for track in cand.candidates]
+                )
+            ],
+            how = "diagonal"
+        )
+        columnar_df = candidates_to_dataframe(
+            candidate_list,
+            which = "all",
+            output = output
+        )
+        assert columnar_df.schema == all_df.schema
+        assert columnar_df.equals(all_df)
+        token_df = candidate_list[1].to_df(which = "all", output = output)
+        assert token_df.equals(
+            all_df.filter(pl.col("group") == "speaker").select(token_df.columns)
+        )
+
+        assert tracks_to_dataframe([]).is_empty()
+        with pytest.raises(ValueError):
+            tracks_to_dataframe(candidate_list[0].candidates, output = "x")
+
 
 class TestWrite:
 
@@ -87,6 +148,192 @@ class TestWrite:
         assert file_name.is_file()
         file_name.unlink()
 
+    def test_write_iter(self, tmp_path):
+        sounds = [
+            pm.Sound(str(Path("tests", "test_data", name)))
+            for name in ["ay.wav", "aw.wav"]
+        ]
+        candidate_list = [CandidateTracks(sound = x) for x in sounds]
+        for cand, name in zip(candidate_list, ["ay", "aw"]):
+            cand.file_name = name
+
+        list_file = tmp_path.joinpath("list.csv")
+        iter_file = tmp_path.joinpath("iter.csv")
+        write_data(candidates=candidate_list, file=list_file, which="all")
+        write_data_iter(iter(candidate_list), file=iter_file, which="all")
+
+        assert pl.read_csv(list_file).equals(pl.read_csv(iter_file))
+
+        # a later candidate with more columns isn't cut down
+        candidate_list[1].group = "speaker"
+        with pytest.raises(ValueError):
+            write_data_iter(iter(candidate_list), file=iter_file)
+        candidate_list[1].group = None
+
+        write_data_iter(
+            iter(candidate_list),
+            destination=tmp_path,
+            separate=True
+        )
+        assert tmp_path.joinpath("ay.csv").is_file()
+        assert tmp_path.joinpath("aw.csv").is_file()
+
+    @pytest.mark.parametrize(
+        "format,suffix,read",
+        [("parquet", ".parquet", pl.read_parquet),
+         ("ipc", ".arrow", pl.read_ipc)]
+    )
+    def test_write_format(self, tmp_path, format, suffix, read):
+        sounds = [
+            pm.Sound(str(Path("tests", "test_data", name)))
+            for name in ["ay.wav", "aw.wav"]
+        ]
+        candidate_list = [CandidateTracks(sound = x) for x in sounds]
+        for cand, name in zip(candidate_list, ["ay", "aw"]):
+            cand.file_name = name
+
+        csv_file = tmp_path.joinpath("list.csv")
+        write_data(candidates=candidate_list, file=csv_file, which="all")
+        write_data_iter(
+            iter(candidate_list),
+            destination=tmp_path,
+            which="all",
+            format=format
+        )
+
+        out_file = tmp_path.joinpath("ay").with_suffix(suffix)
+        df = read(out_file)
+        assert df.schema["file_name"] == pl.Categorical()
+        assert df.cast({"file_name": pl.String}).equals(
+            pl.read_csv(csv_file)
+        )
+
+        write_data(
+            candidates=candidate_list,
+            destination=tmp_path,
+            separate=True,
+            format=format
+        )
+        assert tmp_path.joinpath("ay").with_suffix(suffix).is_file()
+        assert tmp_path.joinpath("aw").with_suffix(suffix).is_file()
+
+    def test_write_separate(self, tmp_path):
+        candidate_list = [CandidateTracks(sound = SOUND) for _ in range(3)]
+        for cand, name, group in zip(
+            candidate_list, ["ay", "ay", "aw"], ["s1", "s2", "s1"]
+        ):
+            cand.file_name = name
+            cand.group = group
+
+        write_data(candidates=candidate_list, destination=tmp_path, separate=True)
+        out_files = sorted(x.name for x in tmp_path.glob("*.csv"))
+        assert out_files == ["aw_s1.csv", "ay_s1.csv", "ay_s2.csv"]
+        df = pl.read_csv(tmp_path.joinpath("ay_s2.csv"))
+        assert df["group"].unique().to_list() == ["s2"]
+
+    def test_write_separate_no_group(self, tmp_path):
+        # tokens without groups, like those of audio files alone,
+        # are named after their file
+        candidate_list = [CandidateTracks(sound = SOUND) for _ in range(3)]
+        for cand, name in zip(candidate_list, ["ay", "ay", "aw"]):
+            cand.file_name = name
+
+        list_dir = tmp_path.joinpath("list")
+        iter_dir = tmp_path.joinpath("iter")
+        list_dir.mkdir()
+        iter_dir.mkdir()
+        write_data(candidates=candidate_list, destination=list_dir, separate=True)
+        write_data_iter(candidate_list, destination=iter_dir, separate=True)
+        for out_dir in [list_dir, iter_dir]:
+            out_files = sorted(x.name for x in out_dir.glob("*.csv"))
+            assert out_files == ["aw.csv", "ay.csv"]
+        assert pl.read_csv(list_dir.joinpath("ay.csv"))\
+            .equals(pl.read_csv(iter_dir.joinpath("ay.csv")))
+
+        # and only some of them have a group
+        candidate_list[2].group = "s1"
+        write_data(candidates=candidate_list, destination=list_dir, separate=True)
+        out_files = sorted(x.name for x in list_dir.glob("*.csv"))
+        assert out_files == ["aw.csv", "aw_s1.csv", "ay.csv"]
+
+    @pytest.mark.parametrize("format", ["parquet", "ipc"])
+    def test_write_partition(self, tmp_path, format):
+        candidate_list = [CandidateTracks(sound = SOUND) for _ in range(4)]
+        for cand, name, group in zip(
+            candidate_list,
+            ["a b", "a b", "c", "a b"],
+            ["s1", "s2", None, "s1"]
+        ):
+            cand.file_name = name
+            cand.group = group
+
+        write_data(
+            candidates=candidate_list,
+            destination=tmp_path,
+            format=format,
+            partition=True
+        )
+
+        first = partition_dir(tmp_path, candidate_list[0].to_df())
+        assert first == tmp_path.joinpath("file_name=a%20b", "group=s1")
+        # the partition came back after another file name
+        assert len(list(first.iterdir())) == 2
+
+        scan = pl.scan_parquet if format == "parquet" else pl.scan_ipc
+        df = scan(tmp_path.joinpath("**", "*"), hive_partitioning=True)\
+            .filter(pl.col("file_name") == "a b")\
+            .collect()
+        assert df.height == 3 * candidate_list[0].to_df().height
+        assert sorted(df["group"].unique().cast(pl.String).to_list()) == ["s1", "s2"]
+
+        with pytest.raises(ValueError):
+            write_data(
+                candidates=candidate_list,
+                destination=tmp_path,
+                partition=True
+            )
+
+    def test_partition_writer(self, tmp_path):
+        candidate_list = [CandidateTracks(sound = SOUND) for _ in range(3)]
+        for cand, group in zip(candidate_list, ["s1", "s2", "s1"]):
+            cand.file_name = "ay"
+            cand.group = group
+        dfs = [cand.to_df() for cand in candidate_list]
+
+        writer = PartitionWriter(tmp_path, format = "csv")
+        parts = writer.write(dfs, 3)
+        assert sorted(Path(x["path"]).relative_to(tmp_path).as_posix() for x in parts) == [
+            "file_name=ay/group=s1/00000003.csv",
+            "file_name=ay/group=s2/00000003.csv"
+        ]
+        assert sum(x["rows"] for x in parts) == sum(df.height for df in dfs)
+        assert writer.write([], 4) == []
+
+        writer.save_index(parts)
+        assert writer.index_path.is_file()
+
+    def test_frame_sink(self, tmp_path):
+        path = tmp_path.joinpath("sink.parquet")
+        with FrameSink(path, row_group_size = 2) as sink:
+            sink.write(pl.DataFrame({"file_name": ["a", "a"], "x": [1, 2]}))
+            sink.write(pl.DataFrame({"x": [3.0]}))
+            sink.write(pl.DataFrame({"file_name": ["b"], "x": [4]}))
+            # columns the file doesn't have aren't dropped
+            with pytest.raises(ValueError):
+                sink.write(pl.DataFrame({"x": [5], "y": [1]}))
+
+        df = pl.read_parquet(path)
+        assert df.columns == ["file_name", "x"]
+        assert df.schema["x"] == pl.Int64
+        assert df["file_name"].cast(pl.String).to_list() == ["a", "a", None, "b"]
+        assert df["x"].to_list() == [1, 2, 3, 4]
+
+    def test_write_format_errors(self, tmp_path):
+        with pytest.raises(ValueError):
+            write_data_iter([], file=tmp_path.joinpath("x"), format="xlsx")
+        with pytest.raises(ValueError):
+            FrameSink(tmp_path.joinpath("x"), format="csv")
+
 @pytest.fixture(scope='function')
 def plot_spectrogram():
     def _plot(self):
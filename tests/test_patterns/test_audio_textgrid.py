@@ -14,7 +14,8 @@ from fasttrackpy.processors.heuristic import (
     Rhotic,
     F3_F4_Sep
 )
-from fasttrackpy.patterns.audio_textgrid import process_audio_textgrid
+from fasttrackpy.patterns.audio_textgrid import process_audio_textgrid,\
+                                                iter_audio_textgrid
 from fasttrackpy.processors.outputs import write_data
 from aligned_textgrid import SequenceInterval
 
@@ -22,6 +23,7 @@ import parselmouth as pm
 import polars as pl
 import numpy as np
 from pathlib import Path
+from collections.abc import Iterator
 
 TG_PATH = Path("tests", "test_data", "corpus", "josef-fruehwald_speaker.TextGrid")
 AUDIO_PATH = Path("tests", "test_data", "corpus", "josef-fruehwald_speaker.wav")
@@ -82,4 +84,25 @@ class TestAudioTG:
 
         assert out_file.exists()
 
-        out_file.unlink()
\ No newline at end of file
+        out_file.unlink()
+
+    def test_iter_audio_tg(self):
+        audio_path = Path("tests", "test_data", "corpus", "KY25A_1.wav")
+        tg_path = Path("tests", "test_data", "corpus", "KY25A_1.TextGrid")
+        candidate_iter = iter_audio_textgrid(
+            audio_path=audio_path,
+            textgrid_path=tg_path,
+            target_labels="AY1"
+        )
+        assert isinstance(candidate_iter, Iterator)
+
+        candidate_list = process_audio_textgrid(
+            audio_path=audio_path,
+            textgrid_path=tg_path,
+            target_labels="AY1"
+        )
+        iter_list = list(candidate_iter)
+        assert len(iter_list) == len(candidate_list)
+        for cand, list_cand in zip(iter_list, candidate_list):
+            assert cand.interval.id == list_cand.interval.id
+            assert cand.winner_idx == list_cand.winner_idx
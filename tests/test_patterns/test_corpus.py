@@ -5,12 +5,17 @@ from fasttrackpy.tracks import Track,\
                                Loss, \
                                Agg
 from fasttrackpy.patterns.corpus import process_corpus,\
+    iter_corpus, \
     get_audio_files, \
     get_corpus, \
     read_and_associate_tg, \
     get_target_tiers, \
     get_target_intervals
-from fasttrackpy.processors.outputs import write_data
+from fasttrackpy.processors.outputs import write_data, write_data_iter,\
+    PartitionWriter
+from fasttrackpy.utils.manifest import Manifest
+from fasttrackpy.utils.cache import TokenCache
+import fasttrackpy.patterns.corpus as corpus_module
 from aligned_textgrid import SequenceInterval, \
     AlignedTextGrid, \
     SequenceTier
@@ -19,6 +24,9 @@ import parselmouth as pm
 import polars as pl
 import numpy as np
 from pathlib import Path
+import shutil
+import pytest
+from collections.abc import Iterator
 
 
 class TestHelpers:
@@ -136,4 +144,261 @@ class TestCorpus:
         all_candidates = process_corpus(Path("tests", "test_data", "corpus"))
 
         assert [isinstance(cand, CandidateTracks) for cand in all_candidates]
-        assert len(all_candidates) > 0
\ No newline at end of file
+        assert len(all_candidates) > 0
+    def test_corpus_prepared(self):
+
+        all_candidates = process_corpus(
+            Path("tests", "test_data", "corpus"),
+            target_labels = "AY1",
+            resampler = "polyphase"
+        )
+        token_candidates = process_corpus(
+            Path("tests", "test_data", "corpus"),
+            target_labels = "AY1"
+        )
+
+        assert len(all_candidates) == len(token_candidates)
+        assert len(all_candidates) > 0
+        for cand, token_cand in zip(all_candidates, token_candidates):
+            assert cand.prepared is not None
+            assert token_cand.prepared is None
+            assert cand.interval is token_cand.interval or \
+                cand.interval.id == token_cand.interval.id
+
+    def test_corpus_queue(self, tmp_path):
+        corpus_dir = Path("tests", "test_data", "corpus")
+        for name in ["a", "b"]:
+            for suffix in [".wav", ".TextGrid"]:
+                shutil.copy(
+                    corpus_dir.joinpath("KY25A_1").with_suffix(suffix),
+                    tmp_path.joinpath(name).with_suffix(suffix)
+                )
+
+        all_candidates = process_corpus(
+            tmp_path,
+            target_labels = "AY1"
+        )
+        file_names = [cand.file_name for cand in all_candidates]
+
+        assert set(file_names) == {"a", "b"}
+        assert file_names.count("a") == file_names.count("b")
+        n = file_names.count("a")
+        # tokens of the same file get the same results
+        for cand_a, cand_b in zip(all_candidates[:n], all_candidates[n:]):
+            assert cand_a.interval.start == cand_b.interval.start
+            assert cand_a.winner_idx == cand_b.winner_idx
+
+        serial_candidates = process_corpus(
+            tmp_path,
+            target_labels = "AY1",
+            backend = "serial"
+        )
+        assert [cand.winner_idx for cand in serial_candidates] == \
+            [cand.winner_idx for cand in all_candidates]
+
+    def test_iter_corpus(self):
+        candidate_iter = iter_corpus(
+            Path("tests", "test_data", "corpus"),
+            target_labels = "AY1"
+        )
+        assert isinstance(candidate_iter, Iterator)
+
+        first = next(candidate_iter)
+        assert isinstance(first, CandidateTracks)
+        assert first.file_name == "KY25A_1"
+        assert first.interval.label == "AY1"
+
+        candidate_list = process_corpus(
+            Path("tests", "test_data", "corpus"),
+            target_labels = "AY1"
+        )
+        assert len(list(candidate_iter)) == len(candidate_list) - 1
+
+    def test_corpus_resume(self, tmp_path):
+        corpus_dir = tmp_path.joinpath("corpus")
+        corpus_dir.mkdir()
+        for name in ["a", "b"]:
+            for suffix in [".wav", ".TextGrid"]:
+                shutil.copy(
+                    Path("tests", "test_data", "corpus", "KY25A_1").with_suffix(suffix),
+                    corpus_dir.joinpath(name).with_suffix(suffix)
+                )
+
+        def run(out_file, resume, stop = None):
+            manifest = Manifest(
+                out_file.with_suffix(".manifest.json"), {}, resume = resume
+            )
+            candidates = iter_corpus(
+                corpus_dir,
+                target_labels = "AY1",
+                backend = "serial",
+                manifest = manifest
+            )
+            def interrupted():
+                for idx, cand in enumerate(candidates):
+                    if idx == stop:
+                        raise KeyboardInterrupt
+                    yield cand
+            write_data_iter(interrupted(), file = out_file, manifest = manifest)
+            return manifest
+
+        full_file = tmp_path.joinpath("full.csv")
+        run(full_file, resume = False)
+        full = pl.read_csv(full_file)
+        first = full["file_name"][0]
+        n_first = full.filter(pl.col("file_name") == first)["id"].n_unique()
+
+        out_file = tmp_path.joinpath("out.csv")
+        # stopped partway through the second file
+        with pytest.raises(KeyboardInterrupt):
+            run(out_file, resume = False, stop = n_first + 1)
+        partial = pl.read_csv(out_file)
+        assert partial.equals(full.filter(pl.col("file_name") == first))
+
+        manifest = run(out_file, resume = True)
+        assert len(manifest.files) == 2
+        assert pl.read_csv(out_file).equals(full)
+
+    def test_corpus_cache(self, tmp_path, monkeypatch):
+        cache = TokenCache(tmp_path)
+        all_candidates = process_corpus(
+            Path("tests", "test_data", "corpus"),
+            target_labels = "AY1",
+            backend = "serial",
+            cache = cache
+        )
+        assert cache.size() > 0
+
+        def no_analysis(*args, **kwargs):
+            raise AssertionError("a cached token was analyzed")
+        monkeypatch.setattr(corpus_module, "CandidateTracks", no_analysis)
+        cached_candidates = process_corpus(
+            Path("tests", "test_data", "corpus"),
+            target_labels = "AY1",
+            backend = "serial",
+            cache = cache
+        )
+
+        assert len(cached_candidates) == len(all_candidates)
+        for cand, cached in zip(all_candidates, cached_candidates):
+            assert cached.winner_idx == cand.winner_idx
+            assert cached.to_df().equals(cand.to_df())
+
+    def test_corpus_worker_output(self, tmp_path, monkeypatch):
+        corpus_dir = tmp_path.joinpath("corpus")
+        corpus_dir.mkdir()
+        for name in ["a", "b"]:
+            for suffix in [".wav", ".TextGrid"]:
+                shutil.copy(
+                    Path("tests", "test_data", "corpus", "KY25A_1").with_suffix(suffix),
+                    corpus_dir.joinpath(name).with_suffix(suffix)
+                )
+        monkeypatch.setattr(corpus_module, "PART_TOKENS", 4)
+
+        out_dir = tmp_path.joinpath("out")
+        writer = PartitionWriter(out_dir, format = "parquet")
+        parts = list(iter_corpus(
+            corpus_dir,
+            target_labels = "AY1",
+            n_jobs = 2,
+            writer = writer
+        ))
+        writer.save_index(parts)
+
+        all_candidates = process_corpus(
+            corpus_dir,
+            target_labels = "AY1",
+            backend = "serial"
+        )
+        df = pl.concat([cand.to_df() for cand in all_candidates])
+        n = len(all_candidates) // 2
+        # each file's tokens are split into chunks of 4
+        assert len(list(out_dir.glob("file_name=a/group=*/*"))) >= n // 4
+        assert sum(part["rows"] for part in parts) == df.height
+
+        key = ["file_name", "id", "time"]
+        written = pl.scan_parquet(out_dir.joinpath("**", "*.parquet"))\
+            .collect()\
+            .cast({col: pl.String for col in ["file_name", "group", "label"]})\
+            .select(df.columns)
+        assert written.sort(key).equals(df.sort(key))
+
+        with pytest.raises(ValueError):
+            next(iter_corpus(
+                corpus_dir,
+                writer = writer,
+                manifest = Manifest(tmp_path.joinpath("manifest.json"), {})
+            ))
+
+    def test_failed_preparation(self, tmp_path, monkeypatch):
+        corpus_dir = Path("tests", "test_data", "corpus")
+        tg = read_and_associate_tg(corpus_module.CorpusPair(
+            wav = corpus_dir.joinpath("KY25A_1.wav"),
+            tg = corpus_dir.joinpath("KY25A_1.TextGrid")
+        ))
+        intervals = get_target_intervals(get_target_tiers(tg), "AY1")
+
+        def bad_preparation(*args, **kwargs):
+            raise ValueError("bad sound")
+        monkeypatch.setattr(corpus_module, "get_prepared_windows", bad_preparation)
+        with corpus_module.SharedAudio(directory = tmp_path) as shared_audio:
+            assert corpus_module.get_sound_windows(
+                intervals,
+                0.05,
+                shared_audio
+            ) is None
+            # nothing was left in shared memory
+            assert shared_audio.n_bytes == 0
+            assert not any(tmp_path.glob("*/*.dat"))
+
+    def test_corpus_resume_empty(self, tmp_path, monkeypatch):
+        corpus_dir = tmp_path.joinpath("corpus")
+        corpus_dir.mkdir()
+        for name in ["a", "empty"]:
+            shutil.copy(
+                Path("tests", "test_data", "corpus", "KY25A_1.wav"),
+                corpus_dir.joinpath(f"{name}.wav")
+            )
+        shutil.copy(
+            Path("tests", "test_data", "corpus", "KY25A_1.TextGrid"),
+            corpus_dir.joinpath("a.TextGrid")
+        )
+        # a TextGrid with no target tokens
+        tg = AlignedTextGrid(
+            textgrid_path = str(corpus_dir.joinpath("a.TextGrid")),
+            entry_classes = [SequenceInterval]
+        )
+        empty_tg = pm.TextGrid(tg.xmin, tg.xmax, ["KY25A - words", "KY25A - phones"], [])
+        empty_tg.save(str(corpus_dir.joinpath("empty.TextGrid")))
+
+        out_file = tmp_path.joinpath("out.csv")
+        def run(resume):
+            manifest = Manifest(
+                out_file.with_suffix(".manifest.json"), {}, resume = resume
+            )
+            write_data_iter(
+                iter_corpus(
+                    corpus_dir,
+                    target_labels = "AY1",
+                    backend = "serial",
+                    manifest = manifest
+                ),
+                file = out_file,
+                manifest = manifest
+            )
+            return manifest
+
+        manifest = run(resume = False)
+        full = pl.read_csv(out_file)
+        entries = {x["file_name"]: x for x in manifest.files.values()}
+        assert entries["empty"]["tokens"] == 0
+        assert not entries["empty"]["failed"]
+        assert entries["a"]["tokens"] > 0
+
+        # neither file is read again
+        def no_read(*args, **kwargs):
+            raise AssertionError("a finished file was read")
+        monkeypatch.setattr(corpus_module, "read_and_associate_tg", no_read)
+        manifest = run(resume = True)
+        assert len(manifest.files) == 2
+        assert pl.read_csv(out_file).equals(full)
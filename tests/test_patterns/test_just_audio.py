@@ -5,12 +5,16 @@ from fasttrackpy.tracks import Track,\
                                Loss, \
                                Agg
 from fasttrackpy.patterns.just_audio import process_audio_file,\
-                                            process_directory
+                                            process_directory,\
+                                            iter_directory
+from fasttrackpy.utils.workers import BACKENDS
 
 import parselmouth as pm
 import polars as pl
 import numpy as np
 from pathlib import Path
+from collections.abc import Iterator
+import pytest
 
 SOUND_PATH = Path("tests", "test_data", "ay.wav")
 SOUND_DIR = Path("tests", "test_data")
@@ -35,4 +39,29 @@ class TestProcessDirectory:
         )
 
         assert candidate_list[0].file_name != \
-                candidate_list[1].file_name
\ No newline at end of file
+                candidate_list[1].file_name
+
+    def test_iter_directory(self):
+        candidate_iter = iter_directory(SOUND_DIR)
+        assert isinstance(candidate_iter, Iterator)
+
+        candidate_list = process_directory(SOUND_DIR)
+        for cand, list_cand in zip(candidate_iter, candidate_list):
+            assert isinstance(cand, CandidateTracks)
+            assert cand.file_name == list_cand.file_name
+            assert cand.winner_idx == list_cand.winner_idx
+
+    def test_directory_backends(self):
+        candidate_list = process_directory(SOUND_DIR)
+        for backend in BACKENDS:
+            backend_list = process_directory(
+                SOUND_DIR,
+                n_jobs = 2,
+                backend = backend,
+                batch_size = 1
+            )
+            assert [x.winner_idx for x in backend_list] == \
+                [x.winner_idx for x in candidate_list]
+
+        with pytest.raises(ValueError):
+            process_directory(SOUND_DIR, backend = "dask")
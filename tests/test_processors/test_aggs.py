@@ -29,4 +29,23 @@ class TestAggs:
         this_agg = Agg(method = agg_prod)
         x = np.array([2,2,2])
         out = this_agg.aggregate(x)
-        assert np.isclose(out, 8)
\ No newline at end of file
+        assert np.isclose(out, 8)
+    def test_agg_sum_batch(self):
+        this_agg = Agg(method = "agg_sum")
+        x = np.array([[1, 2, 3], [4, 5, 6]])
+        out = this_agg.aggregate_batch(x)
+
+        assert np.allclose(out, [6, 15])
+
+    def test_custom_agg_batch(self):
+
+        def agg_prod(x, axis = 0):
+            result = np.prod(x, axis=axis)
+            return result
+
+        this_agg = Agg(method = agg_prod)
+        x = np.array([[2, 2, 2], [1, 2, 3]])
+        out = this_agg.aggregate_batch(x)
+
+        assert this_agg.batch_method is None
+        assert np.allclose(out, [8, 6])
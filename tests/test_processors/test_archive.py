@@ -0,0 +1,130 @@
+import json
+import numpy as np
+import parselmouth as pm
+import pytest
+from pathlib import Path
+
+from fasttrackpy import CandidateTracks, F1_Max, F4_Min
+from fasttrackpy.processors.archive import ArchiveWriter,\
+                                           CandidateArchive,\
+                                           write_archive
+
+SOUND = pm.Sound(str(Path("tests", "test_data", "ay.wav")))
+HEURISTICS = [F1_Max, F4_Min]
+
+class TestArchive:
+    candidate_list = [
+        CandidateTracks(sound = SOUND),
+        CandidateTracks(
+            sound = SOUND,
+            output = None,
+            nstep = 10,
+            heuristics = HEURISTICS
+        ),
+        CandidateTracks(
+            sound = SOUND,
+            keep_candidates = "winner",
+            search = "coarse_to_fine"
+        )
+    ]
+    candidate_list[0].file_name = "ay"
+    candidate_list[0].group = "speaker1"
+    candidate_list[1].file_name = "ay"
+    candidate_list[1].label = "AY1"
+    candidate_list[2].group = "speaker2"
+
+    def test_round_trip(self, tmp_path):
+        path = write_archive(self.candidate_list, tmp_path / "archive")
+        archive = CandidateArchive(path)
+
+        assert len(archive) == len(self.candidate_list)
+        assert archive.metadata["file_name"].to_list() == ["ay", "ay", None]
+
+        for idx, candidates in enumerate(self.candidate_list):
+            rebuilt = archive.candidates(
+                idx,
+                heuristics = candidates.heuristics
+            )
+            # not archived without samples=True
+            assert rebuilt.samples is None
+            assert rebuilt.winner_idx == candidates.winner_idx
+            assert rebuilt.profile == candidates.profile
+            for which in ["winner", "all"]:
+                for output in ["formants", "param", "log_param"]:
+                    assert rebuilt.to_df(which = which, output = output)\
+                        .equals(candidates.to_df(which = which, output = output))
+
+        # only the second token has log parameters
+        assert archive[0].log_parameters is None
+        assert archive[1].log_parameters is not None
+        assert archive[-1].kept.size == 1
+
+    def test_select(self, tmp_path):
+        archive = CandidateArchive(
+            write_archive(self.candidate_list, tmp_path / "archive")
+        )
+
+        assert archive.select(file_name = "ay").tolist() == [0, 1]
+        assert archive.select(group = "speaker2").tolist() == [2]
+        assert archive.select(file_name = "ay", label = "AY1").tolist() == [1]
+        assert archive.select(group = "speaker3").size == 0
+
+        with pytest.raises(IndexError):
+            archive.record(3)
+
+    def test_memory_mapped(self, tmp_path):
+        path = write_archive(self.candidate_list, tmp_path / "archive")
+        archive = CandidateArchive(path)
+        formants = archive[1].formants
+
+        assert isinstance(formants.base, np.memmap)
+        # changes aren't written back to the archive
+        formants[:] = 0
+        assert not np.all(CandidateArchive(path)[1].formants == 0)
+
+    def test_samples(self, tmp_path):
+        candidates = self.candidate_list[0]
+        path = write_archive([candidates], tmp_path / "archive", samples = True)
+        rebuilt = CandidateArchive(path).candidates(0)
+
+        assert np.array_equal(rebuilt.samples, candidates.samples)
+
+        with pytest.raises(ValueError):
+            with ArchiveWriter(tmp_path / "records", samples = True) as writer:
+                writer.write(candidates.to_record())
+
+    def test_unfinished(self, tmp_path):
+        path = tmp_path / "archive"
+        writer = ArchiveWriter(path)
+        writer.write(self.candidate_list[0])
+
+        # no index until it is closed
+        with pytest.raises(FileNotFoundError):
+            CandidateArchive(path)
+
+        writer.close()
+        assert len(CandidateArchive(path)) == 1
+
+        index_path = path / "archive.json"
+        index = json.loads(index_path.read_text())
+        index["version"] = 0
+        index_path.write_text(json.dumps(index))
+        with pytest.raises(ValueError):
+            CandidateArchive(path)
+
+    def test_failed_write(self, tmp_path):
+        def tokens():
+            yield self.candidate_list[0]
+            raise RuntimeError("bad token")
+
+        path = tmp_path / "archive"
+        with pytest.raises(RuntimeError):
+            write_archive(tokens(), path)
+        with pytest.raises(FileNotFoundError):
+            CandidateArchive(path)
+
+    def test_empty(self, tmp_path):
+        archive = CandidateArchive(write_archive([], tmp_path / "archive"))
+
+        assert len(archive) == 0
+        assert list(archive) == []
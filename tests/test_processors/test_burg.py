@@ -0,0 +1,76 @@
+from fasttrackpy.processors.burg import burg_formants,\
+                                        burg_formants_batch
+from fasttrackpy.processors.formants import praat_formants,\
+                                            track_formants_batch
+import parselmouth as pm
+import numpy as np
+import pytest
+from pathlib import Path
+
+SOUND_DIR = Path("tests", "test_data")
+MAX_FORMANTS = np.linspace(4000, 7000, 5)
+
+class TestNumbaEngine:
+    sounds = [pm.Sound(str(x)) for x in sorted(SOUND_DIR.glob("*.wav"))]
+
+    def test_agrees_with_praat(self):
+        for sound in self.sounds:
+            numba_results = burg_formants_batch(
+                samples = sound.values,
+                sampling_frequency = sound.sampling_frequency,
+                max_formants = MAX_FORMANTS,
+                xmin = sound.xmin
+            )
+            for max_formant, numba_result in zip(MAX_FORMANTS, numba_results):
+                tracks, bandwidths, time_domain = praat_formants(
+                    samples = sound.values,
+                    sampling_frequency = sound.sampling_frequency,
+                    maximum_formant = max_formant,
+                    xmin = sound.xmin
+                )
+                numba_tracks, numba_bandwidths, numba_time = numba_result
+
+                assert numba_tracks.shape == tracks.shape
+                assert np.allclose(numba_time, time_domain)
+                assert np.array_equal(
+                    np.isnan(numba_tracks),
+                    np.isnan(tracks)
+                )
+
+                # the odd frame can differ in very wide
+                # bandwidth formants
+                rel_diff = np.abs(numba_tracks - tracks)/tracks
+                assert np.nanmedian(rel_diff) < 1e-4
+                assert np.nanmean(rel_diff < 0.01) > 0.99
+
+                rel_b_diff = np.abs(numba_bandwidths - bandwidths)/bandwidths
+                assert np.nanmedian(rel_b_diff) < 1e-3
+
+    def test_single(self):
+        sound = self.sounds[0]
+        tracks, bandwidths, time_domain = burg_formants(
+            samples = sound.values,
+            sampling_frequency = sound.sampling_frequency,
+            maximum_formant = 5000,
+            n_formants = 3
+        )
+        assert tracks.shape == (3, time_domain.size)
+        assert bandwidths.shape == tracks.shape
+
+    def test_engine_dispatch(self):
+        sound = self.sounds[0]
+        results = track_formants_batch(
+            samples = sound.values,
+            sampling_frequency = sound.sampling_frequency,
+            max_formants = MAX_FORMANTS,
+            engine = "numba"
+        )
+        assert len(results) == MAX_FORMANTS.size
+
+        with pytest.raises(ValueError):
+            track_formants_batch(
+                samples = sound.values,
+                sampling_frequency = sound.sampling_frequency,
+                max_formants = MAX_FORMANTS,
+                engine = "other"
+            )
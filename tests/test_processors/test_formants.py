@@ -0,0 +1,77 @@
+from fasttrackpy.processors.formants import formant_arrays,\
+                                            formant_arrays_by_time,\
+                                            candidate_pool
+from joblib import Parallel, delayed
+import parselmouth as pm
+import os
+import numpy as np
+import pytest
+from pathlib import Path
+
+SOUND_DIR = Path("tests", "test_data")
+
+class TestFormantArrays:
+    sounds = [pm.Sound(str(x)) for x in sorted(SOUND_DIR.glob("*.wav"))]
+
+    @pytest.mark.parametrize("maximum_formant", [4000, 5500, 7000])
+    def test_same_as_by_time(self, maximum_formant):
+        for sound in self.sounds:
+            formant_obj = sound.to_formant_burg(
+                time_step = 0.002,
+                max_number_of_formants = 5.5,
+                maximum_formant = maximum_formant,
+                window_length = 0.025
+            )
+            tracks, bandwidths = formant_arrays(formant_obj, n_formants=5)
+            tracks2, bandwidths2 = formant_arrays_by_time(formant_obj, n_formants=5)
+
+            assert tracks.shape == (5, formant_obj.n_frames)
+            assert np.array_equal(np.isnan(tracks), np.isnan(tracks2))
+            assert np.array_equal(np.isnan(bandwidths), np.isnan(bandwidths2))
+            assert np.allclose(tracks, tracks2, equal_nan=True)
+            assert np.allclose(bandwidths, bandwidths2, equal_nan=True)
+
+    def test_missing_formants(self):
+        formant_obj = self.sounds[0].to_formant_burg(
+            maximum_formant = 4000
+        )
+        tracks, bandwidths = formant_arrays(formant_obj, n_formants=7)
+
+        assert tracks.shape[0] == 7
+        assert np.all(np.isnan(tracks[6]))
+        assert np.all(np.isnan(bandwidths[6]))
+
+    def test_no_bandwidths(self):
+        formant_obj = self.sounds[0].to_formant_burg(
+            maximum_formant = 5000
+        )
+        tracks, bandwidths = formant_arrays(formant_obj)
+        tracks2, bandwidths2 = formant_arrays(
+            formant_obj,
+            return_bandwidths = False
+        )
+        tracks3, bandwidths3 = formant_arrays_by_time(
+            formant_obj,
+            return_bandwidths = False
+        )
+
+        assert bandwidths2 is None
+        assert bandwidths3 is None
+        assert np.array_equal(tracks, tracks2, equal_nan=True)
+        assert np.allclose(tracks, tracks3, equal_nan=True)
+
+def candidate_pids(engine):
+    pids = candidate_pool(engine, 2)(
+        delayed(os.getpid)() for _ in range(8)
+    )
+    return os.getpid(), set(pids)
+
+class TestCandidatePool:
+
+    def test_nested_processes(self):
+        # the pools that tasks in loky workers start
+        for engine, separate in [("praat", True), ("numba", False)]:
+            for pid, pids in Parallel(n_jobs = 2)(
+                delayed(candidate_pids)(engine) for _ in range(2)
+            ):
+                assert (pid not in pids) == separate
@@ -1,4 +1,6 @@
-from fasttrackpy.processors.heuristic import MinMaxHeuristic, SpacingHeuristic
+from fasttrackpy.processors.heuristic import MinMaxHeuristic,\
+                                             SpacingHeuristic,\
+                                             eval_heuristics
 import numpy as np
 
 class MockTrack:
@@ -202,4 +204,56 @@ class TestSpacing:
         assert not np.isfinite(cc_check)
         assert cf_check == 0
         assert fc_check == 0
-        assert ff_check == 0
\ No newline at end of file
+        assert ff_check == 0
+
+class TestBatch:
+    rng = np.random.default_rng(1)
+    formants = np.sort(
+        rng.uniform(200, 4000, size = (50, 4)),
+        axis = 1
+    )
+    bandwidths = rng.uniform(50, 800, size = (50, 4))
+    tracks = [
+        MockTrack(formants = f, bandwidths = b)
+        for f, b in zip(formants, bandwidths)
+    ]
+    log_parameters = np.array([x.log_parameters for x in tracks])
+    bandwidth_parameters = np.array(
+        [x.bandwidth_parameters for x in tracks]
+    )
+    heuristics = [
+        MinMaxHeuristic(edge="max", measure="frequency", number=1, boundary=1200),
+        MinMaxHeuristic(edge="min", measure="frequency", number=4, boundary=2900),
+        MinMaxHeuristic(edge="max", measure="bandwidth", number=2, boundary=500),
+        MinMaxHeuristic(edge="max", measure="frequency", number=5, boundary=500),
+        SpacingHeuristic(top=[3], bottom=[1,2], top_diff=2000, bottom_diff=400),
+        SpacingHeuristic(top=[3,4], bottom=[1,2], top_diff=500, bottom_diff=1500)
+    ]
+
+    def test_same_as_eval(self):
+        for heuristic in self.heuristics:
+            batch = heuristic.eval_batch(
+                4,
+                log_parameters = self.log_parameters,
+                bandwidth_parameters = self.bandwidth_parameters
+            )
+            single = np.array([heuristic.eval(x) for x in self.tracks])
+
+            assert np.array_equal(batch, single)
+
+    def test_eval_heuristics(self):
+        errors = eval_heuristics(
+            self.heuristics,
+            4,
+            log_parameters = self.log_parameters,
+            bandwidth_parameters = self.bandwidth_parameters
+        )
+        single = np.array([
+            np.sum([h.eval(x) for h in self.heuristics])
+            for x in self.tracks
+        ])
+
+        assert errors.shape == (50,)
+        assert np.array_equal(errors, single)
+        assert np.any(np.isinf(errors))
+        assert np.any(np.isfinite(errors))
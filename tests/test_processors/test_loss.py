@@ -47,4 +47,52 @@ class TestLoss:
 
         loss = this_loss.calculate_loss(self.formants, self.smoothed)
         
-        assert np.isclose(loss[0], expected)
\ No newline at end of file
+        assert np.isclose(loss[0], expected)
+
+class TestLossBatch:
+    rng = np.random.default_rng(1)
+    formants = rng.uniform(200, 4000, size = (5, 4, 30))
+    smoothed = formants * rng.uniform(0.8, 1.2, size = formants.shape)
+    formants[0, 1, 3] = np.nan
+    n_frames = np.array([30, 30, 25, 20, 30])
+    for idx, n in enumerate(n_frames):
+        formants[idx, :, n:] = np.nan
+        smoothed[idx, :, n:] = np.nan
+
+    def looped(self, loss):
+        return np.array([
+            loss.calculate_loss(f[:, 0:n], s[:, 0:n])
+            for f, s, n in zip(self.formants, self.smoothed, self.n_frames)
+        ])
+
+    def test_builtin_batch(self):
+        for method in ["lmse", "mse"]:
+            this_loss = Loss(method = method)
+            batch = this_loss.calculate_loss_batch(
+                self.formants,
+                self.smoothed
+            )
+
+            assert this_loss.batch_method is not None
+            assert batch.shape == (5, 4)
+            assert np.allclose(batch, self.looped(this_loss))
+
+    def test_custom_fallback(self):
+        def mae(
+                formants,
+                smoothed,
+                axis = 1
+        ):
+            # not NaN aware, so padding has to be dropped
+            return np.mean(np.abs(formants-smoothed), axis = axis)
+
+        this_loss = Loss(method = mae)
+        batch = this_loss.calculate_loss_batch(
+            self.formants[1:],
+            self.smoothed[1:],
+            self.n_frames[1:]
+        )
+
+        assert this_loss.batch_method is None
+        assert np.all(np.isfinite(batch))
+        assert np.allclose(batch, self.looped(this_loss)[1:])
@@ -0,0 +1,130 @@
+import numpy as np
+import parselmouth as pm
+import pytest
+from pathlib import Path
+
+from fasttrackpy import CandidateTracks
+from fasttrackpy.processors.formants import track_formants_batch
+from fasttrackpy.processors.prepare import PreparedWindow,\
+                                           prepare_windows,\
+                                           pre_emphasize
+
+SOUND = pm.Sound(str(Path("tests", "test_data", "ay.wav")))
+MAX_FORMANTS = np.linspace(4000, 7000, 5)
+
+class TestPrepare:
+
+    def test_pre_emphasize(self):
+        samples = np.array([1.0, 1.0, 1.0])
+        emphasized = pre_emphasize(samples, 10000, 50)
+        factor = np.exp(-2 * np.pi * 50 / 10000)
+
+        assert np.allclose(emphasized, [1, 1-factor, 1-factor])
+        assert np.allclose(samples, 1)
+
+    def test_approximates_token(self):
+        windows = prepare_windows(
+            SOUND,
+            windows = [(SOUND.xmin, SOUND.xmax)],
+            max_formants = MAX_FORMANTS
+        )
+
+        assert len(windows) == 1
+        assert isinstance(windows[0], PreparedWindow)
+
+        for engine in ["praat", "numba"]:
+            prepared = windows[0].track_formants(
+                MAX_FORMANTS,
+                engine = engine
+            )
+            token = track_formants_batch(
+                samples = SOUND.values,
+                sampling_frequency = SOUND.sampling_frequency,
+                max_formants = MAX_FORMANTS,
+                engine = engine
+            )
+            for (f1, b1, t1), (f2, b2, t2) in zip(prepared, token):
+                assert f1.shape == f2.shape
+                # offset by less than a sample
+                assert np.allclose(t1, t2, atol = 1 / SOUND.sampling_frequency)
+                # the polyphase filter isn't Praat's
+                assert np.nanmedian(np.abs(f1 - f2) / f2) < 0.01
+
+    def test_windows(self):
+        start = 0.2
+        end = 0.5
+        window, = prepare_windows(
+            SOUND,
+            windows = [(start, end)],
+            max_formants = MAX_FORMANTS
+        )
+        for (samples, sampling_frequency, xmin), max_formant in \
+                zip(window.signals, MAX_FORMANTS):
+            assert np.isclose(sampling_frequency, 2 * max_formant, rtol=1e-5)
+            # the first sample is centered in the window
+            assert -0.5 <= xmin * sampling_frequency < 0.5
+            assert np.isclose(
+                samples.size / sampling_frequency,
+                end - start,
+                atol = 2 / sampling_frequency
+            )
+
+    def test_select(self):
+        window, = prepare_windows(
+            SOUND,
+            windows = [(0.1, 0.6)],
+            max_formants = MAX_FORMANTS
+        )
+        selected = window.select(MAX_FORMANTS[[1, 3]])
+
+        assert np.array_equal(selected.max_formants, MAX_FORMANTS[[1, 3]])
+        assert selected.signals == [window.signals[1], window.signals[3]]
+        with pytest.raises(ValueError):
+            window.select([4321])
+
+    def test_candidates(self):
+        part = SOUND.extract_part(from_time = 0.1, to_time = 0.6)
+        window, = prepare_windows(
+            SOUND,
+            windows = [(0.1, 0.6)],
+            max_formants = np.linspace(4000, 7000, 20)
+        )
+        candidates = CandidateTracks(sound = part, prepared = window)
+        token_candidates = CandidateTracks(sound = part)
+
+        assert candidates.formants.shape == token_candidates.formants.shape
+        assert candidates.winner.prepared is window
+        assert candidates.winner.bandwidths.shape == \
+            candidates.winner.formants.shape
+
+    def test_n_jobs(self):
+        window, = prepare_windows(
+            SOUND,
+            windows = [(0.1, 0.6)],
+            max_formants = MAX_FORMANTS
+        )
+        for engine in ["praat", "numba"]:
+            serial = window.track_formants(MAX_FORMANTS, engine = engine)
+            split = window.track_formants(MAX_FORMANTS, engine = engine, n_jobs = 2)
+
+            assert len(split) == len(serial)
+            for (tracks, _, time), (split_tracks, _, split_time) in zip(serial, split):
+                assert np.array_equal(tracks, split_tracks, equal_nan = True)
+                assert np.array_equal(time, split_time)
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            prepare_windows(
+                SOUND,
+                windows = [(0.1, 0.6)],
+                max_formants = MAX_FORMANTS,
+                resampler = "linear"
+            )
+
+        window, = prepare_windows(
+            SOUND,
+            windows = [(0.1, 0.6)],
+            max_formants = MAX_FORMANTS
+        )
+        with pytest.raises(ValueError):
+            window.track_formants([4321])
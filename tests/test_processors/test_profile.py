@@ -0,0 +1,31 @@
+from fasttrackpy.processors.profile import ComputeProfile,\
+                                           get_profile
+from fasttrackpy.processors.heuristic import F1_Max,\
+                                             B2_Max,\
+                                             Rhotic
+
+class TestProfile:
+
+    def test_outputs(self):
+        assert get_profile("formants") == \
+            ComputeProfile(log_formants = False, bandwidths = True)
+        assert get_profile("param") == \
+            ComputeProfile(log_formants = False, bandwidths = False)
+        assert get_profile("log_param") == \
+            ComputeProfile(log_formants = True, bandwidths = False)
+        assert get_profile(None) == ComputeProfile()
+
+    def test_heuristics(self):
+        assert get_profile("param", [F1_Max]) == \
+            ComputeProfile(log_formants = True, bandwidths = False)
+        assert get_profile("param", [Rhotic]) == \
+            ComputeProfile(log_formants = True, bandwidths = False)
+        assert get_profile("param", [B2_Max]) == \
+            ComputeProfile(log_formants = False, bandwidths = True)
+
+    def test_custom_heuristic(self):
+        class AlwaysPass:
+            def eval(self, track):
+                return 0
+
+        assert get_profile("param", [AlwaysPass()]) == ComputeProfile()
@@ -44,4 +44,99 @@ class TestSmoother:
         smoothed = this_smoother.smooth(self.x)
 
         assert isinstance(smoothed, Smoothed)
-        assert smoothed.smoothed.shape == (self.n,)
\ No newline at end of file
+        assert smoothed.smoothed.shape == (self.n,)
+
+class TestSmoothBatch:
+    order = 5
+    n = 100
+    rng = np.random.default_rng(10)
+    X = idct(
+        rng.normal(size = (3, 4, order)) * 100,
+        n = n,
+        axis = -1
+    ) + 1000
+
+    def test_batch_matches_single(self):
+        X = self.X.copy()
+        X[1, 2, 10:15] = np.nan
+        for method in ["dct_smooth_regression", "dct_smooth"]:
+            this_smoother = Smoother(method = method, order = self.order)
+            batch = this_smoother.smooth_batch(X)
+
+            assert isinstance(batch, Smoothed)
+            assert batch.smoothed.shape == X.shape
+            assert batch.params.shape == X.shape[:-1] + (self.order,)
+
+            for idx in np.ndindex(X.shape[:-1]):
+                single = this_smoother.smooth(X[idx])
+                assert np.allclose(
+                    batch.smoothed[idx],
+                    single.smoothed,
+                    equal_nan=True
+                )
+                assert np.allclose(
+                    batch.params[idx],
+                    single.params,
+                    equal_nan=True
+                )
+
+    def test_batch_mask(self):
+        this_smoother = Smoother(order = self.order)
+        mask = np.zeros(self.X.shape, dtype=bool)
+        mask[0, 0, 0:20] = True
+        masked = this_smoother.smooth_batch(self.X, mask = mask)
+
+        X = self.X.copy()
+        X[0, 0, 0:20] = np.nan
+        nan_masked = this_smoother.smooth_batch(X)
+
+        assert np.allclose(masked.smoothed, nan_masked.smoothed)
+        assert np.all(np.isfinite(masked.smoothed))
+
+    def test_batch_unsolvable(self):
+        this_smoother = Smoother(order = self.order)
+        X = self.X.copy()
+        X[2, 3, :] = np.nan
+        batch = this_smoother.smooth_batch(X)
+
+        assert np.all(np.isnan(batch.smoothed[2, 3]))
+        assert np.all(np.isnan(batch.params[2, 3]))
+        assert np.all(np.isfinite(batch.smoothed[0:2]))
+
+    def test_custom_fallback(self):
+        def mean_smooth(x):
+            mean_value = np.nanmean(x)
+            return Smoothed(
+                smoothed = np.ones(x.shape) * mean_value,
+                params = np.array([mean_value])
+            )
+        
+        this_smoother = Smoother(method = mean_smooth)
+        batch = this_smoother.smooth_batch(self.X)
+
+        assert batch.smoothed.shape == self.X.shape
+        assert batch.params.shape == self.X.shape[:-1] + (1,)
+        assert np.allclose(
+            batch.params[..., 0],
+            self.X.mean(axis = -1)
+        )
+
+    def test_custom_batch(self):
+        calls = []
+        def mean_smooth(x):
+            raise AssertionError("the batch method should be used")
+
+        def mean_smooth_batch(X, mask = None):
+            calls.append(X.shape)
+            mean_value = np.nanmean(X, axis = -1, keepdims = True)
+            return Smoothed(
+                smoothed = np.ones(X.shape) * mean_value,
+                params = mean_value
+            )
+        mean_smooth.batch = mean_smooth_batch
+
+        this_smoother = Smoother(method = mean_smooth)
+        batch = this_smoother.smooth_batch(self.X)
+
+        assert calls == [self.X.shape]
+        assert batch.smoothed.shape == self.X.shape
@@ -4,10 +4,17 @@ from fasttrackpy.tracks import Track,\
                                Smoother,\
                                Loss, \
                                Agg
+from fasttrackpy.processors.heuristic import MinMaxHeuristic,\
+                                             F1_Max,\
+                                             F4_Min,\
+                                             B2_Max,\
+                                             Rhotic
 
 import parselmouth as pm
 import polars as pl
 import numpy as np
+import pytest
+import pickle
 from pathlib import Path
 
 SOUND_PATH = Path("tests", "test_data", "ay.wav")
@@ -27,6 +34,16 @@ class TestTrack:
         assert isinstance(this_track.loss_fun, Loss)
         assert isinstance(this_track.agg_fun, Agg)
 
+    def test_sound_cached(self):
+        this_track = Track(sound=SOUND)
+        sound = this_track.sound
+
+        assert this_track.sound is sound
+
+        this_track.xmin = 1.0
+        assert this_track.sound is not sound
+        assert np.isclose(this_track.sound.xmin, 1.0)
+
 
 class TestOneTrack:
 
@@ -63,6 +80,79 @@ class TestOneTrack:
         assert this_track.formants.shape[0] == 5
         assert this_track.parameters.shape == (5, 6)
 
+    def test_memoized(self):
+        this_track = OneTrack(
+            sound = SOUND,
+            maximum_formant=5000,
+            heuristics = [F1_Max]
+        )
+        error = this_track.smooth_error
+        smoothed = this_track.smoothed_formants
+        df = this_track.to_df()
+
+        assert this_track.smoothed_formants is smoothed
+        assert this_track.to_df() is df
+        assert this_track.heuristic_error == 0
+
+        this_track.file_name = "ay"
+        new_df = this_track.to_df()
+        assert new_df is not df
+        assert new_df["file_name"][0] == "ay"
+
+        this_track.smoother = Smoother(order = 3)
+        assert this_track.parameters.shape == (4, 3)
+        assert this_track.smoothed_formants is not smoothed
+        assert not np.isclose(this_track.smooth_error, error)
+
+        this_track.heuristics = [
+            MinMaxHeuristic(
+                edge = "max",
+                measure = "frequency",
+                number = 1,
+                boundary = 1
+            )
+        ]
+        assert np.isinf(this_track.heuristic_error)
+
+        error = this_track.smooth_error
+        this_track.n_formants = 3
+        assert not np.isclose(this_track.smooth_error, error)
+        assert "F4" not in this_track.to_df().columns
+
+    def test_smoothed_lists(self):
+        this_track = OneTrack(
+            sound = SOUND,
+            maximum_formant = 5000
+        )
+        lists = {
+            "smoothed_list": this_track.smoothed,
+            "smoothed_log_list": this_track.smoothed_log,
+            "smoothed_b_list": this_track.smoothed_b,
+            "smoothed_b_log_list": this_track.smoothed_b_log
+        }
+        for name, batch in lists.items():
+            with pytest.warns(DeprecationWarning):
+                smoothed_list = getattr(this_track, name)
+            assert len(smoothed_list) == this_track.formants.shape[0]
+            assert np.array_equal(
+                [x.smoothed for x in smoothed_list],
+                batch.smoothed,
+                equal_nan = True
+            )
+            assert np.array_equal([x.params for x in smoothed_list], batch.params)
+
+            # the same as smoothing one formant at a time
+            series = {
+                "smoothed_list": this_track.formants,
+                "smoothed_log_list": np.log(this_track.formants),
+                "smoothed_b_list": this_track.bandwidths,
+                "smoothed_b_log_list": np.log(this_track.bandwidths)
+            }[name][0]
+            assert np.allclose(
+                smoothed_list[0].params,
+                this_track.smoother.smooth(series).params
+            )
+
 class TestCandidateTracks:
 
     def test_candidate_tracks_default(self):
@@ -84,6 +174,10 @@ class TestCandidateTracks:
         assert candidates.id == "123"
         assert candidates.winner.id == "123"
 
+        candidates.group = "speaker"
+        assert candidates.winner.group == "speaker"
+        assert candidates.to_df()["group"][0] == "speaker"
+
         df = candidates.winner.to_df()
         assert "id" in df.columns
         assert "file_name" in df.columns
@@ -109,4 +203,225 @@ class TestCandidateTracks:
         assert len(candidates) == 20
 
         one_cand = candidates[0]
-        assert isinstance(one_cand, OneTrack)
\ No newline at end of file
+        assert isinstance(one_cand, OneTrack)
+    def test_numba_engine(self):
+        candidates = CandidateTracks(
+            sound = SOUND,
+            engine = "numba"
+        )
+        praat_candidates = CandidateTracks(
+            sound = SOUND
+        )
+
+        assert len(candidates) == 20
+        assert candidates.winner.engine == "numba"
+        assert candidates.winner_idx == praat_candidates.winner_idx
+
+        one_track = OneTrack(
+            sound = SOUND,
+            maximum_formant = 5000,
+            engine = "numba"
+        )
+        assert one_track.formants.shape == \
+            praat_candidates[0].formants.shape
+
+    def test_profile(self):
+        candidates = CandidateTracks(
+            sound = SOUND,
+            output = "param"
+        )
+        full_candidates = CandidateTracks(
+            sound = SOUND
+        )
+
+        assert not candidates.profile.bandwidths
+        assert candidates.winner._bandwidths is None
+        assert candidates.winner._smoothed_log is None
+        assert candidates.winner_idx == full_candidates.winner_idx
+
+        # bandwidths are still available when asked for
+        assert candidates.to_df(output = "formants").equals(
+            full_candidates.to_df(output = "formants")
+        )
+
+    def test_candidate_arrays(self):
+        candidates = CandidateTracks(
+            sound = SOUND
+        )
+        n_frames = candidates.n_frames.max()
+
+        assert candidates.__dict__ == {}
+        assert candidates.formants.shape == (20, 4, n_frames)
+        assert candidates.smoothed_formants.shape == (20, 4, n_frames)
+        assert candidates.parameters.shape == (20, 4, 5)
+        assert candidates.time_domains.shape == (20, n_frames)
+
+        one_cand = candidates[3]
+        assert np.array_equal(
+            one_cand.formants,
+            candidates.formants[3, :, 0:candidates.n_frames[3]],
+            equal_nan = True
+        )
+        assert np.array_equal(
+            one_cand.parameters,
+            candidates.parameters[3]
+        )
+        assert candidates[candidates.winner_idx] is candidates.winner
+
+    def test_mutation(self):
+        candidates = CandidateTracks(
+            sound = SOUND
+        )
+        formants = candidates.candidates[3].formants * 2
+
+        candidates.candidates[3].label = "edited"
+        candidates.candidates[3].formants = formants
+        candidates.custom = "value"
+        assert candidates.candidates[3].label == "edited"
+        assert np.array_equal(
+            candidates[3].formants,
+            formants,
+            equal_nan = True
+        )
+        assert candidates.custom == "value"
+
+        candidates.winner = candidates.candidates[3]
+        assert candidates.winner is candidates[3]
+        candidates.file_name = "filename"
+        assert candidates.winner.file_name == "filename"
+        assert candidates[0].file_name == "filename"
+
+        rebuilt = pickle.loads(pickle.dumps(candidates))
+        assert rebuilt.custom == "value"
+        assert rebuilt.winner.label == "edited"
+
+    def test_keep_winner(self):
+        candidates = CandidateTracks(
+            sound = SOUND,
+            keep_candidates = "winner"
+        )
+        all_candidates = CandidateTracks(
+            sound = SOUND
+        )
+
+        assert len(candidates) == 1
+        assert candidates.formants.shape[0] == 1
+        assert candidates.smooth_errors.shape == (20,)
+        assert candidates.winner_idx == all_candidates.winner_idx
+        assert candidates[0] is candidates.winner
+        assert candidates.to_df().equals(all_candidates.to_df())
+
+    def test_search(self):
+        grid = CandidateTracks(
+            sound = SOUND
+        )
+        coarse = CandidateTracks(
+            sound = SOUND,
+            search = "coarse_to_fine"
+        )
+        golden = CandidateTracks(
+            sound = SOUND,
+            search = "golden"
+        )
+
+        assert grid.n_analyses == 20
+        assert grid.analyses_saved == 0
+
+        # on this token, both searches find the grid winner
+        for candidates in [coarse, golden]:
+            assert candidates.n_analyses < 20
+            assert candidates.analyses_saved == 20 - candidates.n_analyses
+            assert len(candidates) == candidates.n_analyses
+            assert candidates.winner_idx == grid.winner_idx
+            assert np.isnan(candidates.smooth_errors).sum() == \
+                candidates.analyses_saved
+            assert candidates.to_df().equals(grid.to_df())
+
+    def test_n_jobs(self):
+        # splitting the candidates between workers
+        # gives the same analyses
+        for engine in ["praat", "numba"]:
+            serial = CandidateTracks(sound = SOUND, engine = engine)
+            split = CandidateTracks(sound = SOUND, engine = engine, n_jobs = 3)
+            assert np.array_equal(split.formants, serial.formants, equal_nan = True)
+            assert split.winner_idx == serial.winner_idx
+
+    def test_search_tolerance(self):
+        coarse = CandidateTracks(
+            sound = SOUND,
+            search = "coarse_to_fine"
+        )
+        tolerant = CandidateTracks(
+            sound = SOUND,
+            search = "coarse_to_fine",
+            search_tolerance = 500
+        )
+        assert tolerant.n_analyses < coarse.n_analyses
+
+    def test_bad_search(self):
+        with pytest.raises(ValueError):
+            CandidateTracks(
+                sound = SOUND,
+                search = "random"
+            )
+
+    def test_heuristic_rejection(self):
+        heuristics = [F1_Max, F4_Min, Rhotic, B2_Max]
+        candidates = CandidateTracks(
+            sound = SOUND,
+            heuristics = heuristics
+        )
+        rejected = np.isinf(candidates.heuristic_errors)
+
+        assert np.any(rejected)
+        # rejected candidates are only smoothed when asked for
+        assert np.all(np.isnan(candidates._smooth_errors[rejected]))
+        assert np.all(np.isfinite(candidates.smooth_errors))
+        assert not np.any(candidates._unsmoothed)
+
+        # if every candidate fails, the heuristics are ignored
+        all_fail = MinMaxHeuristic(
+            edge = "max",
+            measure = "frequency",
+            number = 1,
+            boundary = 1
+        )
+        failed = CandidateTracks(
+            sound = SOUND,
+            heuristics = [all_fail]
+        )
+        no_heuristics = CandidateTracks(
+            sound = SOUND
+        )
+        assert failed.winner_idx == no_heuristics.winner_idx
+
+    def test_record(self):
+        heuristics = [F1_Max, F4_Min, Rhotic, B2_Max]
+        candidates = CandidateTracks(
+            sound = SOUND,
+            heuristics = heuristics
+        )
+        candidates.file_name = "ay"
+        record = candidates.to_record()
+
+        # the record doesn't carry the samples
+        assert len(pickle.dumps(record)) < len(pickle.dumps(candidates))
+
+        rebuilt = CandidateTracks.from_record(
+            pickle.loads(pickle.dumps(record)),
+            samples = candidates.samples,
+            heuristics = heuristics
+        )
+        # rejected candidates are still smoothed when asked for
+        assert np.any(rebuilt._unsmoothed)
+        assert rebuilt.winner_idx == candidates.winner_idx
+        assert rebuilt.file_name == "ay"
+        assert rebuilt.to_df(which = "all").equals(
+            candidates.to_df(which = "all")
+        )
+        assert np.array_equal(
+            rebuilt.smooth_errors,
+            candidates.smooth_errors
+        )
+        assert rebuilt.winner.heuristic_error == \
+            candidates.winner.heuristic_error
@@ -1,4 +1,37 @@
 from fasttrackpy.utils.safely import safely, filter_nones
+from fasttrackpy.utils.shared_audio import SharedAudio,\
+                                          window_slice,\
+                                          load_slice,\
+                                          attach_audio
+from fasttrackpy.utils.run_config import RunConfig,\
+                                        attach_config,\
+                                        init_worker
+from fasttrackpy.utils.schedule import CostModel,\
+                                      longest_first,\
+                                      run_longest_first,\
+                                      split_jobs,\
+                                      iter_tasks
+from fasttrackpy.utils.workers import resolve_n_jobs,\
+                                      worker_env,\
+                                      get_backend,\
+                                      CappedLokyBackend
+from fasttrackpy.utils.manifest import Manifest,\
+                                       manifest_path
+from fasttrackpy.utils.cache import TokenCache,\
+                                    describe
+from fasttrackpy.patterns.corpus import CorpusPair
+from fasttrackpy import Smoother
+from fasttrackpy.processors.smoothers import Smoothed
+from joblib import Parallel, delayed, cpu_count
+import os
+import pytest
+import parselmouth as pm
+import numpy as np
+import pickle
+from pathlib import Path
+import time
+
+SOUND = pm.Sound(str(Path("tests", "test_data", "ay.wav")))
 
 class TestSafely:
 
@@ -20,4 +53,356 @@ class TestSafely:
         result, b = filter_nones(result, [result, b])
 
         assert len(result) == len(b) == 3
-        assert not "c" in b
\ No newline at end of file
+        assert not "c" in b
+
+class TestSharedAudio:
+
+    def test_window_slice(self, tmp_path):
+        with SharedAudio(directory = tmp_path) as shared_audio:
+            shared = shared_audio.add(SOUND)
+            assert shared_audio.n_bytes == SOUND.values.nbytes
+            # inside the sound, and past each end of it
+            for from_time, to_time in [
+                (0.1, 0.2),
+                (-0.02, 0.1),
+                (SOUND.xmax - 0.1, SOUND.xmax + 0.02)
+            ]:
+                part = SOUND.extract_part(
+                    from_time = from_time,
+                    to_time = to_time
+                )
+                audio_slice = window_slice(shared, from_time, to_time)
+                assert np.array_equal(load_slice(audio_slice), part.values)
+
+    def test_attach_audio(self, tmp_path):
+        with SharedAudio(directory = tmp_path) as shared_audio:
+            shared = shared_audio.add(SOUND)
+            audio_slice = window_slice(shared, 0.1, 0.2)
+            args = {"audio": audio_slice, "nstep": 20}
+
+            # tasks carry the slice, not the samples
+            assert len(pickle.dumps(args)) < 1000
+            attached = attach_audio(args)
+            assert "audio" not in attached
+            assert attached["samples"].shape[1] == \
+                audio_slice.end - audio_slice.start
+            assert attached["sampling_frequency"] == SOUND.sampling_frequency
+            assert attached["nstep"] == 20
+
+        assert attach_audio({"nstep": 20}) == {"nstep": 20}
+
+    def test_remove(self, tmp_path):
+        shared_audio = SharedAudio(directory = tmp_path)
+        shared = shared_audio.add(SOUND)
+        assert Path(shared.path).is_file()
+        shared_audio.remove(shared)
+        assert not Path(shared.path).exists()
+
+        shared = shared_audio.add(SOUND)
+        shared_audio.close()
+        assert not Path(shared.path).parent.exists()
+
+class TestRunConfig:
+
+    def test_attach_config(self):
+        run_config = RunConfig(nstep = 20, smoother = Smoother())
+        args = {"config": run_config.id, "nstep": 10}
+
+        # tasks carry the id, not the settings
+        assert len(pickle.dumps(args)) < len(pickle.dumps(run_config.settings))
+
+        with run_config:
+            attached = attach_config(args)
+            assert "config" not in attached
+            assert isinstance(attached["smoother"], Smoother)
+            # the task's own arguments win
+            assert attached["nstep"] == 10
+
+        with pytest.raises(KeyError):
+            attach_config(args)
+
+        assert attach_config({"nstep": 20}) == {"nstep": 20}
+
+    def test_init_worker(self):
+        run_config = RunConfig(nstep = 20)
+        kwargs = run_config.pool_kwargs
+        assert kwargs["initializer"] is init_worker
+
+        kwargs["initializer"](*kwargs["initargs"])
+        assert attach_config({"config": run_config.id}) == {"nstep": 20}
+
+class TestSchedule:
+
+    def test_cost_model(self):
+        cost_model = CostModel(min_observations = 4)
+        assert np.array_equal(cost_model.coefs, cost_model.prior)
+
+        true_coefs = np.array([0.01, 2e-5, 1e-7])
+        for duration in [0.05, 0.1, 0.4, 1.0, 2.0]:
+            for sampling_frequency in [16000, 44100]:
+                x = CostModel.features(duration, sampling_frequency)
+                cost_model.observe(x, x @ true_coefs)
+
+        assert np.allclose(cost_model.coefs, true_coefs)
+        x = CostModel.features(0.5, 22050)
+        assert np.isclose(cost_model.predict(x), x @ true_coefs)
+
+    def test_longest_first(self):
+        tasks = [1, 5, 2, 8, 3, 9, 4]
+        features = lambda task: CostModel.features(task, 16000)
+        scheduled = list(longest_first(
+            tasks, features, CostModel(), chunk_size = 4
+        ))
+
+        # sorted within each chunk of upcoming tasks
+        assert [x[1] for x in scheduled] == [8, 5, 2, 1, 9, 4, 3]
+        assert [tasks[x[0]] for x in scheduled] == [x[1] for x in scheduled]
+
+    def test_run_longest_first(self):
+        tasks = [-1, -5, -2, -8, -3, -9, -4]
+        features = lambda task: CostModel.features(-task, 16000)
+        cost_model = CostModel(min_observations = 100)
+        results = list(run_longest_first(
+            abs, tasks, features, n_jobs = 2, cost_model = cost_model,
+            chunk_size = 4
+        ))
+
+        # results come back in task order
+        assert results == [abs(x) for x in tasks]
+        assert len(cost_model._seconds) == len(tasks)
+
+    def test_split_jobs(self):
+        assert split_jobs(100, 8) == (8, 1)
+        assert split_jobs(8, 8) == (8, 1)
+        assert split_jobs(1, 8) == (1, 8)
+        assert split_jobs(3, 8) == (3, 2)
+        assert split_jobs(0, 8) == (8, 1)
+
+    def test_iter_tasks(self):
+        tasks = [{"duration": x} for x in [0.1, 0.3, 0.2]]
+        features = lambda task: CostModel.features(task["duration"], 16000)
+
+        # with fewer tasks than workers, the candidates get the rest
+        assert list(iter_tasks(
+            task_jobs, tasks, features, n_jobs = 8, backend = "loky",
+            split_candidates = True
+        )) == [2, 2, 2]
+        assert list(iter_tasks(
+            task_jobs, tasks, features, n_jobs = 8, backend = "loky"
+        )) == [1, 1, 1]
+        # threads and multiprocessing workers can't start process pools
+        assert list(iter_tasks(
+            task_jobs, tasks, features, n_jobs = 8, backend = "threading",
+            split_candidates = True
+        )) == [1, 1, 1]
+        assert list(iter_tasks(
+            task_jobs, tasks, features, n_jobs = 8, backend = "serial",
+            split_candidates = True
+        )) == [1, 1, 1]
+
+        with pytest.raises(ValueError):
+            next(iter_tasks(task_jobs, tasks, features, backend = "dask"))
+
+def task_jobs(task):
+    return task.get("n_jobs", 1)
+
+def get_env(name):
+    return os.environ.get(name)
+
+class TestWorkers:
+
+    def test_resolve_n_jobs(self):
+        assert resolve_n_jobs(None) == cpu_count()
+        assert resolve_n_jobs(-1) == cpu_count()
+        assert resolve_n_jobs(3) == 3
+        assert resolve_n_jobs(0) == 1
+
+    def test_worker_env(self):
+        env = worker_env(2, blas_threads = 3, polars_threads = 4)
+        assert env["POLARS_MAX_THREADS"] == "4"
+        assert env["OPENBLAS_NUM_THREADS"] == "3"
+
+        env = worker_env(cpu_count() * 2)
+        assert env["POLARS_MAX_THREADS"] == "1"
+        # joblib sets its own BLAS limits
+        assert "OMP_NUM_THREADS" not in env
+
+    def test_get_backend(self):
+        assert get_backend("threading") == "threading"
+        with pytest.raises(ValueError):
+            get_backend("dask")
+
+        backend = get_backend("loky", 2, blas_threads = 1, polars_threads = 1)
+        assert isinstance(backend, CappedLokyBackend)
+        # the limits are set in the workers when they start
+        names = ["POLARS_MAX_THREADS", "OMP_NUM_THREADS"]
+        values = Parallel(n_jobs = 2, backend = backend)(
+            delayed(get_env)(name) for name in names
+        )
+        assert values == ["1", "1"]
+
+def make_pair(tmp_path, name):
+    pair = CorpusPair(
+        tmp_path.joinpath(name).with_suffix(".wav"),
+        tmp_path.joinpath(name).with_suffix(".TextGrid")
+    )
+    pair.wav.write_text("audio")
+    pair.tg.write_text("textgrid")
+    return pair
+
+def write_rows(manifest, path, rows):
+    new = not path.exists()
+    with path.open("a") as file:
+        if new:
+            file.write("F1,file_name\n")
+        file.writelines(rows)
+    manifest.written(path, ["F1", "file_name"])
+
+class TestManifest:
+
+    def test_manifest_path(self, tmp_path):
+        assert manifest_path(file = tmp_path.joinpath("out.csv")) == \
+            tmp_path.joinpath("out.manifest.json")
+        assert manifest_path(destination = tmp_path) == \
+            tmp_path.joinpath("fasttrack_manifest.json")
+        with pytest.raises(ValueError):
+            manifest_path()
+
+    def test_resume(self, tmp_path):
+        path = tmp_path.joinpath("manifest.json")
+        out = tmp_path.joinpath("out.csv")
+        a = make_pair(tmp_path, "a")
+        b = make_pair(tmp_path, "b")
+
+        manifest = Manifest(path, {"nstep": 20})
+        write_rows(manifest, out, ["1,a\n", "2,a\n"])
+        manifest.finish(a, 2)
+        # killed partway through b
+        write_rows(manifest, out, ["3,b\n"])
+
+        resumed = Manifest(path, {"nstep": 20}, resume = True)
+        assert resumed.is_done(a)
+        assert not resumed.is_done(b)
+        # the rows of the unfinished file are removed
+        assert out.read_text() == "F1,file_name\n1,a\n2,a\n"
+
+        other = Manifest(path, {"nstep": 10}, resume = True)
+        assert not other.is_done(a)
+
+    def test_stale(self, tmp_path):
+        path = tmp_path.joinpath("manifest.json")
+        out = tmp_path.joinpath("out.csv")
+        a = make_pair(tmp_path, "a")
+        b = make_pair(tmp_path, "b")
+
+        manifest = Manifest(path, {})
+        write_rows(manifest, out, ["1,a\n"])
+        manifest.finish(a, 1)
+        write_rows(manifest, out, ["2,b\n"])
+        manifest.finish(b, 1)
+
+        time.sleep(0.01)
+        b.tg.write_text("edited textgrid")
+        resumed = Manifest(path, {}, resume = True)
+        assert resumed.is_done(a)
+        assert not resumed.is_done(b)
+        assert out.read_text() == "F1,file_name\n1,a\n"
+
+        a.wav.unlink()
+        resumed = Manifest(path, {}, resume = True)
+        assert not resumed.files
+        assert not out.exists()
+
+def put_record(cache, idx):
+    cache.put(f"{idx:040x}", np.zeros(100))
+
+class TestTokenCache:
+
+    def test_key(self, tmp_path):
+        cache = TokenCache(tmp_path)
+        args = {
+            "samples": SOUND.values,
+            "sampling_frequency": SOUND.sampling_frequency,
+            "nstep": 20,
+            "smoother": Smoother()
+        }
+        key = cache.key(args)
+        assert key == cache.key({**args, "smoother": Smoother(), "n_jobs": 4})
+        assert key != cache.key({**args, "nstep": 10})
+        assert key != cache.key({**args, "smoother": Smoother(order = 6)})
+        assert key != cache.key({**args, "samples": SOUND.values * 2})
+
+        assert describe(Smoother())["class"] == \
+            "fasttrackpy.processors.smoothers.Smoother"
+
+    def test_key_custom_smoothers(self, tmp_path):
+        cache = TokenCache(tmp_path)
+        args = {"samples": SOUND.values, "nstep": 20}
+
+        def mean_smoother(scale):
+            def smooth(x):
+                return Smoothed(np.full_like(x, np.nanmean(x) * scale))
+            return smooth
+
+        lambdas = [
+            lambda x: Smoothed(x),
+            lambda x: Smoothed(x * 2)
+        ]
+        smoothers = [
+            Smoother(method = lambdas[0]),
+            Smoother(method = lambdas[1]),
+            Smoother(method = mean_smoother(1)),
+            Smoother(method = mean_smoother(2))
+        ]
+        keys = [cache.key({**args, "smoother": x}) for x in smoothers]
+        assert len(set(keys)) == len(smoothers)
+
+        # the same function made again has the same key
+        assert keys[2] == cache.key(
+            {**args, "smoother": Smoother(method = mean_smoother(1))}
+        )
+
+    def test_put_get(self, tmp_path):
+        cache = TokenCache(tmp_path)
+        assert cache.get("ab" * 20) is None
+        cache.put("ab" * 20, np.arange(3))
+        assert np.array_equal(cache.get("ab" * 20), np.arange(3))
+
+        cache.clear()
+        assert cache.get("ab" * 20) is None
+        assert cache.size() == 0
+
+    def test_put_again(self, tmp_path):
+        cache = TokenCache(tmp_path)
+        for _ in range(3):
+            put_record(cache, 0)
+        # a record put again replaces it, and isn't counted again
+        assert cache._read_size() == cache.size()
+
+    def test_evict(self, tmp_path):
+        cache = TokenCache(tmp_path)
+        put_record(cache, 0)
+        entry_size = cache.size()
+
+        cache = TokenCache(tmp_path, max_bytes = entry_size * 3)
+        put_record(cache, 1)
+        put_record(cache, 2)
+        time.sleep(0.01)
+        # the first record was used most recently
+        cache.get(f"{0:040x}")
+        put_record(cache, 3)
+
+        assert cache.size() <= cache.max_bytes
+        assert cache.get(f"{0:040x}") is not None
+        assert cache.get(f"{1:040x}") is None
+        assert cache.get(f"{3:040x}") is not None
+
+    def test_concurrent(self, tmp_path):
+        cache = TokenCache(tmp_path)
+        put_record(cache, 0)
+        cache = TokenCache(tmp_path, max_bytes = cache.size() * 10)
+        Parallel(n_jobs = 2)(
+            delayed(put_record)(cache, idx) for idx in range(40)
+        )
+        assert cache.size() <= cache.max_bytes
+        assert cache.get(f"{39:040x}") is not None